@@ -15,14 +15,22 @@ HOW TO USE:
 3. Start chatting!
 """
 
+import functools
 import math
 import os
 import json
+import re
+import time
 from datetime import datetime
 from dotenv import load_dotenv
 from anthropic import Anthropic
 import yfinance as yf  
 
+try:
+    import orjson  # optional: much faster JSON for the task log
+except ImportError:
+    orjson = None
+
 # Load your API key from .env file
 load_dotenv()
 
@@ -30,26 +38,111 @@ load_dotenv()
 client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
 
 # Where we'll store tasks and notes
-TASKS_FILE = "my_tasks.json"
+# Tasks live in an append-only log: one JSON object per line. Completing a task
+# appends a small {"op": "complete", "id": n} line instead of rewriting the file.
+TASKS_FILE = "my_tasks.jsonl"
+LEGACY_TASKS_FILE = "my_tasks.json"  # older single-JSON format, upgraded on first load
 NOTES_FILE = "my_notes.json"
+COMPACT_AFTER = 50  # rewrite the log once this many completion lines pile up
+
+# Parsed tasks kept in memory; reused while the log's (mtime, size) still matches
+_tasks_cache = None
+_tasks_stamp = None
+
+# Tool commands the agent understands, found with one case-insensitive scan of the message.
+# When several match, the earlier name in INTENT_PRIORITY wins.
+INTENT_RE = re.compile(
+    r"(?P<add>add task:\s*(?P<desc>.+))"
+    r"|(?P<list>list task|show task)"
+    r"|(?P<done>complete task\D*(?P<num>\d+)?)"
+    r"|(?P<news>news|headlines)"
+    r"|(?P<market>market|stock)",
+    re.IGNORECASE | re.DOTALL,
+)
+INTENT_PRIORITY = ("add", "list", "done", "news", "market")
+
+# Only the most recent messages are sent to Claude so each turn costs about the same
+HISTORY_WINDOW = 20
 
 
 # ============================================
 # HELPER FUNCTIONS (The tools for your agent)
 # ============================================
 
+def _dump_line(entry):
+    """Encode one task-log entry as a JSON line (bytes)"""
+    if orjson is not None:
+        return orjson.dumps(entry) + b"\n"
+    return (json.dumps(entry) + "\n").encode()
+
+
+def _load_json(data):
+    """Decode JSON from bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _file_stamp():
+    st = os.stat(TASKS_FILE)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _remember_tasks(tasks):
+    """Keep the parsed list in memory, tagged with the log file's current stamp"""
+    global _tasks_cache, _tasks_stamp
+    _tasks_cache = tasks
+    _tasks_stamp = _file_stamp()
+
+
+def _append_task_line(entry):
+    """Append one JSON line to the task log"""
+    with open(TASKS_FILE, 'ab') as f:
+        f.write(_dump_line(entry))
+
+
 def load_tasks():
-    """Load your task list from a file"""
-    if os.path.exists(TASKS_FILE):
-        with open(TASKS_FILE, 'r') as f:
-            return json.load(f)
-    return []
+    """Load your task list (from memory if the log hasn't changed, else by replaying it)"""
+    if _tasks_cache is not None and os.path.exists(TASKS_FILE) and _file_stamp() == _tasks_stamp:
+        return _tasks_cache
+    if not os.path.exists(TASKS_FILE):
+        if os.path.exists(LEGACY_TASKS_FILE):
+            with open(LEGACY_TASKS_FILE, 'rb') as f:
+                tasks = _load_json(f.read())
+            save_tasks(tasks)
+            return tasks
+        return []
+    tasks = []
+    by_id = {}
+    completions = 0
+    with open(TASKS_FILE, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = _load_json(line)
+            if entry.get("op") == "complete":
+                completions += 1
+                task = by_id.get(entry.get("id"))
+                if task:
+                    task["completed"] = True
+            else:
+                tasks.append(entry)
+                by_id[entry["id"]] = entry
+    if completions >= COMPACT_AFTER:
+        save_tasks(tasks)
+    else:
+        _remember_tasks(tasks)
+    return tasks
 
 
 def save_tasks(tasks):
-    """Save your task list to a file"""
-    with open(TASKS_FILE, 'w') as f:
-        json.dump(tasks, f, indent=2)
+    """Rewrite the whole task log, one line per task (compaction)"""
+    tmp_file = TASKS_FILE + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(b"".join(_dump_line(task) for task in tasks))
+    os.replace(tmp_file, TASKS_FILE)
+    _remember_tasks(tasks)
 
 
 def add_task(task_description):
@@ -61,8 +154,9 @@ def add_task(task_description):
         "completed": False,
         "created": datetime.now().strftime("%Y-%m-%d %H:%M")
     }
+    _append_task_line(new_task)
     tasks.append(new_task)
-    save_tasks(tasks)
+    _remember_tasks(tasks)
     return f"✅ Task added: {task_description}"
 
 
@@ -84,8 +178,9 @@ def complete_task(task_id):
     tasks = load_tasks()
     for task in tasks:
         if task["id"] == task_id:
+            _append_task_line({"op": "complete", "id": task_id})
             task["completed"] = True
-            save_tasks(tasks)
+            _remember_tasks(tasks)
             return f"✅ Completed: {task['description']}"
     return f"❌ Task {task_id} not found"
 
@@ -107,29 +202,37 @@ def get_news_headlines():
 """
 
 
-import yfinance as yf
+# Major market indices
+MARKET_SYMBOLS = {
+    '^GSPC': 'S&P 500',
+    '^IXIC': 'NASDAQ',
+    '^DJI': 'Dow Jones'
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _download_market_closes(minute_bucket):
+    """One batched download for all indices. minute_bucket changes every minute, so the cache expires."""
+    return yf.download(
+        list(MARKET_SYMBOLS), period='5d', interval='1d',
+        group_by='ticker', threads=True, progress=False
+    )
+
 
 def get_market_data():
     """Check real-time stock market prices"""
     try:
-        # Major market indices
-        symbols = {
-            '^GSPC': 'S&P 500',
-            '^IXIC': 'NASDAQ',
-            '^DJI': 'Dow Jones'
-        }
+        df = _download_market_closes(int(time.time() // 60))
         
         result = "📈 Market Update (Real-Time):\n\n"
         
-        for symbol, name in symbols.items():
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period='1d')
+        for symbol, name in MARKET_SYMBOLS.items():
+            closes = df[symbol]['Close'].dropna()
             
-            if not data.empty:
-                current_price = float(data['Close'].iloc[-1])
-                prev_close = ticker.info.get('previousClose', current_price)
-                prev_close = float(prev_close) if prev_close is not None else current_price
-                if prev_close and prev_close != 0 and not math.isnan(prev_close):
+            if not closes.empty:
+                current_price = float(closes.iloc[-1])
+                prev_close = float(closes.iloc[-2]) if len(closes) >= 2 else current_price
+                if prev_close and not math.isnan(prev_close):
                     change = current_price - prev_close
                     change_percent = (change / prev_close) * 100
                 else:
@@ -147,14 +250,7 @@ def get_market_data():
 # THE AGENT BRAIN
 # ============================================
 
-def chat_with_agent(user_message, conversation_history):
-    """
-    This is where the magic happens!
-    Claude reads your message, decides what to do, and responds.
-    """
-    
-    # Build the system prompt (tells Claude what it can do)
-    system_prompt = f"""You are a helpful life management assistant. Today is {datetime.now().strftime("%B %d, %Y")}.
+SYSTEM_PROMPT_TEMPLATE = """You are a helpful life management assistant. Today is {today}.
 
 You can help the user with:
 1. Task management (add, list, complete tasks)
@@ -171,6 +267,50 @@ When the user wants to:
 
 Be friendly, helpful, and proactive. If you notice the user needs help organizing something, suggest it!
 """
+_SYSTEM_PROMPT_CACHE = {}
+
+
+def get_system_prompt():
+    """
+    Today's system prompt, built once per day. Keeping the exact same text all day
+    lets Anthropic's prompt cache reuse it between turns.
+    """
+    today = datetime.now().strftime("%B %d, %Y")
+    prompt = _SYSTEM_PROMPT_CACHE.get(today)
+    if prompt is None:
+        _SYSTEM_PROMPT_CACHE.clear()  # only ever keep today's
+        prompt = _SYSTEM_PROMPT_CACHE[today] = SYSTEM_PROMPT_TEMPLATE.format(today=today)
+    return prompt
+
+
+def run_tool_for_message(user_message):
+    """
+    If the message asks for one of the tools, run it and return its output.
+    Returns None when no tool was requested.
+    """
+    matches = list(INTENT_RE.finditer(user_message))
+    if not matches:
+        return None
+    match = min(matches, key=lambda m: INTENT_PRIORITY.index(m.lastgroup))
+    intent = match.lastgroup
+    if intent == "add":
+        return add_task(match.group("desc").strip())
+    if intent == "list":
+        return list_tasks()
+    if intent == "done":
+        if not match.group("num"):
+            return "Please specify which task number to complete"
+        return complete_task(int(match.group("num")))
+    if intent == "news":
+        return get_news_headlines()
+    return get_market_data()
+
+
+def chat_with_agent(user_message, conversation_history):
+    """
+    This is where the magic happens!
+    Claude reads your message, decides what to do, and responds.
+    """
     
     # Add the new message to history
     conversation_history.append({
@@ -178,35 +318,34 @@ Be friendly, helpful, and proactive. If you notice the user needs help organizin
         "content": user_message
     })
     
+    # Tool requests are answered directly - no need to ask Claude first
+    tool_result = run_tool_for_message(user_message)
+    if tool_result is not None:
+        conversation_history.append({
+            "role": "assistant",
+            "content": tool_result
+        })
+        return tool_result, conversation_history
+    
+    # Build the system prompt (tells Claude what it can do)
+    system_prompt = get_system_prompt()
+    
+    # Send a rolling window of recent turns (the full history stays in conversation_history)
+    recent_messages = conversation_history[-HISTORY_WINDOW:]
+    while recent_messages and recent_messages[0]["role"] != "user":
+        recent_messages = recent_messages[1:]  # the API expects the first message to be from the user
+    
     # Ask Claude to respond
     response = client.messages.create(
         model="claude-sonnet-4-20250514",
         max_tokens=1000,
-        system=system_prompt,
-        messages=conversation_history
+        system=[{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
+        messages=recent_messages
     )
     
     # Get Claude's response
     assistant_message = response.content[0].text
     
-    # Check if Claude wants to use any tools
-    if "add task:" in user_message.lower():
-        task_desc = user_message.lower().split("add task:")[-1].strip()
-        tool_result = add_task(task_desc)
-        assistant_message = tool_result
-    elif "list task" in user_message.lower() or "show task" in user_message.lower():
-        assistant_message = list_tasks()
-    elif "complete task" in user_message.lower():
-        try:
-            task_num = int(''.join(filter(str.isdigit, user_message)))
-            assistant_message = complete_task(task_num)
-        except:
-            assistant_message = "Please specify which task number to complete"
-    elif "news" in user_message.lower() or "headlines" in user_message.lower():
-        assistant_message = get_news_headlines()
-    elif "market" in user_message.lower() or "stock" in user_message.lower():
-        assistant_message = get_market_data()
-    
     # Add Claude's response to history
     conversation_history.append({
         "role": "assistant",
@@ -1,57 +1,152 @@
 """
 AI-powered market analysis using Claude. Inline 2-3 sentence reasoning for each ticker.
-Cache analyses for 5 minutes to limit API usage.
+Cache analyses for 5 minutes to limit API usage. Cache entries are keyed by a hash of
+system prompt + model + user prompt and persisted to SQLite so restarts reuse results.
 """
 
+import asyncio
+import atexit
+import hashlib
+import json
 import math
 import os
+import sqlite3
 import time
 import threading
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Callable, Optional
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Iterator, Optional
 
+import httpx
 from dotenv import load_dotenv
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
+
+from database import open_cache_table
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-# Single reusable client at startup to avoid too many open connections
+# Single reusable client at startup to avoid too many open connections.
+# Keep-alive pool sized for the parallel widget fan-out so N calls share a few TLS sessions.
 _key = os.getenv("ANTHROPIC_API_KEY")
-anthropic_client: Optional[Anthropic] = Anthropic(api_key=_key) if _key else None
+_http_client = httpx.Client(
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=300),
+    timeout=30,
+)
+atexit.register(_http_client.close)
+anthropic_client: Optional[Anthropic] = Anthropic(api_key=_key, http_client=_http_client) if _key else None
+
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
 
 SYSTEM_PROMPT = """You are a financial analyst specializing in Silver Lake portfolio companies and market intelligence. Provide concise 2-3 sentence analysis for each stock. For portfolio companies always compare performance to competitors and identify if movement is company-specific or sector-wide. Focus on actionable insights. Output plain text only, 2-3 sentences maximum, no markdown or bullet points."""
 
+# Fixed instruction tails of each per-ticker prompt (the variable quote text goes in front)
+_PORTFOLIO_SUFFIX = "In 2-3 sentences: is this company outperforming or underperforming peers? Is the move company-specific or sector-wide? Any level to watch?"
+_TRENDING_SUFFIX = "Explain why this stock is trending today - volume spike, news catalyst, or sector move. 2 sentences max. Plain text only."
+_GAINER_SUFFIX = "Explain the catalyst for this gain - earnings, upgrade, sector momentum. Is it sustainable? 2 sentences max. Plain text only."
+_LOSER_SUFFIX = "Explain this decline - company-specific or sector-wide. Note support levels. 2 sentences max. Plain text only."
+_VOLUME_SUFFIX = "In 2-3 sentences: why is volume elevated—institutional, retail, news, technical? Does high volume signal strength or distribution?"
+_MOVER_SUFFIX = "In 2-3 sentences: what is the catalyst (earnings, upgrade, sector, short squeeze, news)? Is the move sustainable or likely to reverse? Any level to watch?"
+
 ANALYSIS_CACHE_TTL = 300  # 5 minutes
-_cache: dict[str, tuple[str, float]] = {}
+# L1: in-process LRU (bounded); L2: SQLite file so analyses survive restarts
+_CACHE_MAX = 4096
+_cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
 _cache_lock = threading.Lock()
 
+try:
+    from config import ANALYSIS_CACHE_PATH
+except ImportError:
+    ANALYSIS_CACHE_PATH = Path(__file__).resolve().parent / os.environ.get("ANALYSIS_CACHE_FILE", "analysis_cache.db")
 
-def _cached_key(prefix: str, ticker: str, extra: str = "") -> str:
-    return f"{prefix}:{ticker}:{extra}"
+_disk_cache = open_cache_table(ANALYSIS_CACHE_PATH, "cache", "key TEXT PRIMARY KEY, ts REAL, text TEXT")
+_disk_cache_lock = threading.Lock()
+
+
+def _cached_key(user_text: str, model: str = CLAUDE_MODEL, system: str = SYSTEM_PROMPT) -> str:
+    """Content hash of the full request so identical prompts share one entry."""
+    return hashlib.blake2b(f"{system}|{model}|{user_text}".encode(), digest_size=16).hexdigest()
 
 
 def _get_cached(key: str) -> Optional[str]:
+    now = time.time()
     with _cache_lock:
         entry = _cache.get(key)
         if entry:
             text, ts = entry
-            if time.time() - ts < ANALYSIS_CACHE_TTL:
+            if now - ts < ANALYSIS_CACHE_TTL:
+                _cache.move_to_end(key)
                 return text
-    return None
+            _cache.pop(key, None)
+    if _disk_cache is None:
+        return None
+    try:
+        with _disk_cache_lock:
+            row = _disk_cache.execute(
+                "SELECT text, ts FROM cache WHERE key = ? AND ? - ts < ?",
+                (key, now, ANALYSIS_CACHE_TTL),
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.debug("Analysis disk cache read: %s", e)
+        return None
+    if not row:
+        return None
+    _remember(key, row[0], row[1])
+    return row[0]
+
+
+def _remember(key: str, text: str, ts: float) -> None:
+    """Insert into the L1 LRU, evicting least-recently-used entries past _CACHE_MAX."""
+    with _cache_lock:
+        _cache[key] = (text, ts)
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_MAX:
+            _cache.popitem(last=False)
 
 
 def _set_cached(key: str, text: str) -> None:
+    now = time.time()
+    _remember(key, text, now)
+    if _disk_cache is None:
+        return
+    try:
+        with _disk_cache_lock:
+            _disk_cache.execute("INSERT OR REPLACE INTO cache (key, ts, text) VALUES (?,?,?)", (key, now, text))
+            _disk_cache.commit()
+    except sqlite3.Error as e:
+        logger.debug("Analysis disk cache write: %s", e)
+
+
+# Singleflight: concurrent misses for the same key wait on the first caller's Future
+_inflight: dict[str, Future] = {}
+
+
+def _claim(key: str) -> tuple[Future, bool]:
+    """Return (future, owner). The owner makes the Claude call; everyone else waits on the future."""
     with _cache_lock:
-        _cache[key] = (text, time.time())
+        fut = _inflight.get(key)
+        if fut is not None:
+            return fut, False
+        fut = Future()
+        _inflight[key] = fut
+    return fut, True
+
+
+def _release(key: str, fut: Future, text: str) -> None:
+    with _cache_lock:
+        _inflight.pop(key, None)
+    fut.set_result(text)
 
 
 def _safe_num(x, default=0.0):
     """Return a number or default if None/NaN."""
     if x is None:
         return default
+    if type(x) is float:  # fast path: quote values are almost always floats already
+        return default if x != x else x
     try:
         v = float(x)
         return default if math.isnan(v) else v
@@ -59,52 +154,86 @@ def _safe_num(x, default=0.0):
         return default
 
 
-def _call_claude(user_text: str, max_tokens: int = 300) -> str:
+def _clean_pcts(competitor_data: list[dict]) -> list[float]:
+    """change_pct of each competitor as a float (missing/NaN -> 0.0), coerced once per item."""
+    return [_safe_num(c.get("change_pct")) for c in competitor_data]
+
+
+def _dir(pct: float) -> str:
+    return "up" if pct >= 0 else "down"
+
+
+def _fmt_vol(vol) -> str:
+    """' Volume 12.3M' for a raw volume, or '' when missing, zero, or NaN."""
+    v = int(_safe_num(vol, 0)) if vol is not None else 0
+    return f" Volume {v/1e6:.1f}M" if v else ""
+
+
+def _call_claude_stream(user_text: str, max_tokens: int = 300) -> Iterator[str]:
+    """Yield Claude's reply as text chunks as they are generated."""
     if anthropic_client is None:
         raise ValueError("ANTHROPIC_API_KEY not set")
     try:
-        resp = anthropic_client.messages.create(
-            model="claude-sonnet-4-20250514",
+        with anthropic_client.messages.stream(
+            model=CLAUDE_MODEL,
             max_tokens=max_tokens,
             system=SYSTEM_PROMPT,
             messages=[{"role": "user", "content": user_text}],
-        )
-        return (resp.content[0].text or "").strip()
+        ) as stream:
+            yield from stream.text_stream
     except Exception as e:
         logger.exception("Claude API error: %s", e)
         raise
 
 
+def _call_claude(user_text: str, max_tokens: int = 300) -> str:
+    return "".join(_call_claude_stream(user_text, max_tokens=max_tokens)).strip()
+
+
+def _analyze_cached(user: str, max_tokens: int = 300) -> str:
+    key = _cached_key(user)
+    cached = _get_cached(key)
+    if cached:
+        return cached
+    fut, owner = _claim(key)
+    if not owner:
+        return fut.result()
+    # Re-check: an earlier owner may have filled the cache between our miss and the claim
+    cached = _get_cached(key)
+    if cached:
+        _release(key, fut, cached)
+        return cached
+    out = "Analysis temporarily unavailable."
+    try:
+        out = _call_claude(user, max_tokens=max_tokens)
+        _set_cached(key, out)
+    except Exception:
+        pass
+    finally:
+        _release(key, fut, out)
+    return out
+
+
 def analyze_portfolio_stock(
     ticker: str,
     price_data: dict,
     competitor_data: list[dict],
 ) -> str:
     """2-3 sentence analysis comparing portfolio company to competitors; company-specific vs sector-wide."""
-    key = _cached_key("portfolio", ticker, str(sorted([c.get("ticker") for c in competitor_data])))
-    cached = _get_cached(key)
-    if cached:
-        return cached
-    comp_summary = ", ".join(
-        f"{c.get('ticker', '')} {'up' if _safe_num(c.get('change_pct')) >= 0 else 'down'} {abs(_safe_num(c.get('change_pct'))):.1f}%"
-        for c in competitor_data[:6]
-    )
+    comps = competitor_data[:6]
+    comp_summary = ", ".join([
+        f"{c.get('ticker', '')} {_dir(v)} {abs(v):.1f}%"
+        for c, v in zip(comps, _clean_pcts(comps))
+    ])
     price = _safe_num(price_data.get("price"), 0.0)
     pct = _safe_num(price_data.get("change_pct"), 0.0)
-    vol = price_data.get("volume")
-    vol = int(_safe_num(vol, 0)) if vol is not None else None
-    vol_str = f" Volume {vol/1e6:.1f}M" if vol else ""
+    vol_str = _fmt_vol(price_data.get("volume"))
     user = (
-        f"Portfolio company {ticker}: ${price:.2f} {'up' if pct >= 0 else 'down'} {abs(pct):.1f}%{vol_str}. "
+        f"Portfolio company {ticker}: ${price:.2f} {_dir(pct)} {abs(pct):.1f}%{vol_str}. "
         f"Competitors: {comp_summary}. "
-        "In 2-3 sentences: is this company outperforming or underperforming peers? Is the move company-specific or sector-wide? Any level to watch?"
+        f"{_PORTFOLIO_SUFFIX}"
     )
-    try:
-        out = _call_claude(user)
-        _set_cached(key, out)
-        return out
-    except Exception:
-        return "Analysis temporarily unavailable."
+    return _analyze_cached(user)
 
 
 def analyze_all_stocks_parallel(
@@ -142,174 +271,262 @@ def analyze_all_stocks_parallel(
     return analyses
 
 
-def analyze_market_widgets_parallel(
+def _trending_prompt(ticker: str, price_data: dict) -> str:
+    price = _safe_num(price_data.get("price"), 0.0)
+    pct = _safe_num(price_data.get("change_pct"), 0.0)
+    vol_str = _fmt_vol(price_data.get("volume"))
+    return (
+        f"Trending stock {ticker}: ${price:.2f} {_dir(pct)} {abs(pct):.1f}%{vol_str}. "
+        f"{_TRENDING_SUFFIX}"
+    )
+
+
+def _gainer_prompt(ticker: str, price_data: dict) -> str:
+    price = _safe_num(price_data.get("price"), 0.0)
+    pct = _safe_num(price_data.get("change_pct"), 0.0)
+    return (
+        f"Top gainer {ticker}: ${price:.2f} up {pct:.1f}%. "
+        f"{_GAINER_SUFFIX}"
+    )
+
+
+def _loser_prompt(ticker: str, price_data: dict) -> str:
+    price = _safe_num(price_data.get("price"), 0.0)
+    pct = _safe_num(price_data.get("change_pct"), 0.0)
+    return (
+        f"Top loser {ticker}: ${price:.2f} down {abs(pct):.1f}%. "
+        f"{_LOSER_SUFFIX}"
+    )
+
+
+# Widget kinds: int tags index both the label/prompt table and the result buckets
+TREND, GAIN, LOSS = 0, 1, 2
+_WIDGET_KINDS = (("Trending", _trending_prompt), ("Gainer", _gainer_prompt), ("Loser", _loser_prompt))
+
+
+async def _acall_claude(client: Optional[AsyncAnthropic], user_text: str, max_tokens: int = 300) -> str:
+    """Async counterpart of _call_claude for the widget fan-out."""
+    if client is None:
+        raise ValueError("ANTHROPIC_API_KEY not set")
+    try:
+        resp = await client.messages.create(
+            model=CLAUDE_MODEL,
+            max_tokens=max_tokens,
+            system=SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": user_text}],
+        )
+        return (resp.content[0].text or "").strip()
+    except Exception as e:
+        logger.exception("Claude API error: %s", e)
+        raise
+
+
+async def _aanalyze_cached(client: Optional[AsyncAnthropic], user_text: str, max_tokens: int) -> str:
+    key = _cached_key(user_text)
+    cached = _get_cached(key)
+    if cached:
+        return cached
+    fut, owner = _claim(key)
+    if not owner:
+        return await asyncio.wrap_future(fut)
+    # Re-check: an earlier owner may have filled the cache between our miss and the claim
+    cached = _get_cached(key)
+    if cached:
+        _release(key, fut, cached)
+        return cached
+    out = "Analysis temporarily unavailable."
+    try:
+        out = await _acall_claude(client, user_text, max_tokens=max_tokens)
+        _set_cached(key, out)
+    except Exception:
+        pass
+    finally:
+        _release(key, fut, out)
+    return out
+
+
+# Widget fan-out runs on one long-lived background event loop so the AsyncAnthropic client (and its
+# keep-alive httpx pool) survives across dashboard refreshes instead of being rebuilt per asyncio.run.
+_WIDGET_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=300)
+_widget_loop: Optional[asyncio.AbstractEventLoop] = None
+_widget_client: Optional[AsyncAnthropic] = None
+_widget_loop_lock = threading.Lock()
+
+
+def _close_widget_client() -> None:
+    if _widget_loop is not None and _widget_client is not None:
+        try:
+            asyncio.run_coroutine_threadsafe(_widget_client.close(), _widget_loop).result(timeout=5)
+        except Exception:
+            pass
+
+
+def _get_widget_loop() -> asyncio.AbstractEventLoop:
+    """Start (once) the daemon thread running the widget event loop and its shared client."""
+    global _widget_loop, _widget_client
+    with _widget_loop_lock:
+        if _widget_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="claude-widgets", daemon=True).start()
+            if _key:
+                _widget_client = AsyncAnthropic(
+                    api_key=_key, http_client=httpx.AsyncClient(limits=_WIDGET_HTTP_LIMITS, timeout=30)
+                )
+            _widget_loop = loop
+            atexit.register(_close_widget_client)
+    return _widget_loop
+
+
+async def _widget_fanout(
+    client: Optional[AsyncAnthropic], trending: list[dict], gainers: list[dict], losers: list[dict], max_concurrency: int
+) -> tuple[dict[str, str], dict[str, str], dict[str, str]]:
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def run(kind: int, item: dict) -> tuple[int, str, str]:
+        label, build_prompt = _WIDGET_KINDS[kind]
+        t = item.get("ticker", "")
+        try:
+            async with sem:
+                return (kind, t, await _aanalyze_cached(client, build_prompt(t, item), 150))
+        except Exception as e:
+            logger.warning("%s analysis %s: %s", label, t, e)
+            return (kind, t, "Analysis temporarily unavailable.")
+
+    jobs = [(TREND, item) for item in trending] + [(GAIN, item) for item in gainers] + [(LOSS, item) for item in losers]
+    results = await asyncio.gather(*(run(kind, item) for kind, item in jobs))
+
+    buckets: list[dict[str, str]] = [{}, {}, {}]
+    for kind, ticker, text in results:
+        buckets[kind][ticker] = text
+    return buckets[TREND], buckets[GAIN], buckets[LOSS]
+
+
+async def analyze_market_widgets_async(
     trending: list[dict],
     gainers: list[dict],
     losers: list[dict],
-    max_workers: int = 10,
+    max_concurrency: int = 10,
 ) -> tuple[dict[str, str], dict[str, str], dict[str, str]]:
     """
-    Get Claude analysis for all trending, gainers, and losers in parallel.
+    Get Claude analysis for all trending, gainers, and losers concurrently; max_concurrency caps inflight requests.
+    On the widget loop the long-lived client is reused; from any other loop a client scoped to this call is used
+    (httpx connections can't cross event loops).
     Returns (trending_analyses, gainer_analyses, loser_analyses) each { ticker: analysis }.
     """
-    def trend_task(item: dict) -> tuple[str, str]:
-        t = item.get("ticker", "")
-        try:
-            return (t, analyze_trending_stock(t, item, ""))
-        except Exception as e:
-            logger.warning("Trending analysis %s: %s", t, e)
-            return (t, "Analysis temporarily unavailable.")
-
-    def gainer_task(item: dict) -> tuple[str, str]:
-        t = item.get("ticker", "")
-        try:
-            return (t, analyze_gainer_stock(t, item))
-        except Exception as e:
-            logger.warning("Gainer analysis %s: %s", t, e)
-            return (t, "Analysis temporarily unavailable.")
-
-    def loser_task(item: dict) -> tuple[str, str]:
-        t = item.get("ticker", "")
-        try:
-            return (t, analyze_loser_stock(t, item))
-        except Exception as e:
-            logger.warning("Loser analysis %s: %s", t, e)
-            return (t, "Analysis temporarily unavailable.")
+    if _widget_loop is not None and asyncio.get_running_loop() is _widget_loop:
+        return await _widget_fanout(_widget_client, trending, gainers, losers, max_concurrency)
+    async with httpx.AsyncClient(limits=_WIDGET_HTTP_LIMITS, timeout=30) as http:
+        client = AsyncAnthropic(api_key=_key, http_client=http) if _key else None
+        return await _widget_fanout(client, trending, gainers, losers, max_concurrency)
 
-    trend_analyses: dict[str, str] = {}
-    gainer_analyses: dict[str, str] = {}
-    loser_analyses: dict[str, str] = {}
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = []
-        for item in trending:
-            futures.append(("trend", executor.submit(trend_task, item)))
-        for item in gainers:
-            futures.append(("gain", executor.submit(gainer_task, item)))
-        for item in losers:
-            futures.append(("loss", executor.submit(loser_task, item)))
-        for kind, fut in futures:
-            try:
-                ticker, text = fut.result()
-                if kind == "trend":
-                    trend_analyses[ticker] = text
-                elif kind == "gain":
-                    gainer_analyses[ticker] = text
-                else:
-                    loser_analyses[ticker] = text
-            except Exception as e:
-                logger.warning("Market widget analysis future: %s", e)
-    return trend_analyses, gainer_analyses, loser_analyses
+def analyze_market_widgets_parallel(
+    trending: list[dict],
+    gainers: list[dict],
+    losers: list[dict],
+    max_workers: int = 10,
+) -> tuple[dict[str, str], dict[str, str], dict[str, str]]:
+    """
+    Sync wrapper around analyze_market_widgets_async for existing callers (runs on the shared widget loop).
+    max_workers caps concurrent Claude requests.
+    Returns (trending_analyses, gainer_analyses, loser_analyses) each { ticker: analysis }.
+    """
+    coro = analyze_market_widgets_async(trending, gainers, losers, max_concurrency=max_workers)
+    return asyncio.run_coroutine_threadsafe(coro, _get_widget_loop()).result()
 
 
 def analyze_trending_stock(ticker: str, price_data: dict, trending_context: str = "") -> str:
     """Explain why this stock is trending today - volume spike, news catalyst, or sector move. 2 sentences max."""
-    key = _cached_key("trending", ticker, (trending_context or "")[:80])
-    cached = _get_cached(key)
-    if cached:
-        return cached
-    price = _safe_num(price_data.get("price"), 0.0)
-    pct = _safe_num(price_data.get("change_pct"), 0.0)
-    vol = price_data.get("volume")
-    vol = int(_safe_num(vol, 0)) if vol is not None else None
-    vol_str = f" Volume {vol/1e6:.1f}M" if vol else ""
-    user = (
-        f"Trending stock {ticker}: ${price:.2f} {'up' if pct >= 0 else 'down'} {abs(pct):.1f}%{vol_str}. "
-        "Explain why this stock is trending today - volume spike, news catalyst, or sector move. 2 sentences max. Plain text only."
-    )
-    try:
-        out = _call_claude(user, max_tokens=150)
-        _set_cached(key, out)
-        return out
-    except Exception:
-        return "Analysis temporarily unavailable."
+    return _analyze_cached(_trending_prompt(ticker, price_data), max_tokens=150)
 
 
 def analyze_gainer_stock(ticker: str, price_data: dict) -> str:
     """Explain the catalyst for this gain and whether it is sustainable. 2 sentences max."""
-    key = _cached_key("gainer", ticker, str(_safe_num(price_data.get("change_pct"))))
-    cached = _get_cached(key)
-    if cached:
-        return cached
-    price = _safe_num(price_data.get("price"), 0.0)
-    pct = _safe_num(price_data.get("change_pct"), 0.0)
-    user = (
-        f"Top gainer {ticker}: ${price:.2f} up {pct:.1f}%. "
-        "Explain the catalyst for this gain - earnings, upgrade, sector momentum. Is it sustainable? 2 sentences max. Plain text only."
-    )
-    try:
-        out = _call_claude(user, max_tokens=150)
-        _set_cached(key, out)
-        return out
-    except Exception:
-        return "Analysis temporarily unavailable."
+    return _analyze_cached(_gainer_prompt(ticker, price_data), max_tokens=150)
 
 
 def analyze_loser_stock(ticker: str, price_data: dict) -> str:
     """Explain this decline - company-specific or sector-wide. Note support levels. 2 sentences max."""
-    key = _cached_key("loser", ticker, str(_safe_num(price_data.get("change_pct"))))
-    cached = _get_cached(key)
-    if cached:
-        return cached
-    price = _safe_num(price_data.get("price"), 0.0)
-    pct = _safe_num(price_data.get("change_pct"), 0.0)
-    user = (
-        f"Top loser {ticker}: ${price:.2f} down {abs(pct):.1f}%. "
-        "Explain this decline - company-specific or sector-wide. Note support levels. 2 sentences max. Plain text only."
-    )
-    try:
-        out = _call_claude(user, max_tokens=150)
-        _set_cached(key, out)
-        return out
-    except Exception:
-        return "Analysis temporarily unavailable."
+    return _analyze_cached(_loser_prompt(ticker, price_data), max_tokens=150)
 
 
 def analyze_volume_spike(ticker: str, price_data: dict, volume_data: dict) -> str:
     """Explain reason for elevated volume; strength vs distribution."""
-    key = _cached_key("volume", ticker, str(volume_data.get("volume")))
-    cached = _get_cached(key)
-    if cached:
-        return cached
     price = _safe_num(price_data.get("price"), 0.0)
     pct = _safe_num(price_data.get("change_pct"), 0.0)
     vol = volume_data.get("volume") or price_data.get("volume")
     vol = int(_safe_num(vol, 0)) if vol is not None else 0
     avg = volume_data.get("avg_volume")
     avg = _safe_num(avg, 0) if avg is not None else 0
-    vol_note = f" Volume {vol/1e6:.1f}M" + (f" ({vol/avg:.1f}x average)" if avg and avg > 0 else "") if vol else ""
+    vol_note = _fmt_vol(vol) + (f" ({vol/avg:.1f}x average)" if vol and avg > 0 else "")
     user = (
-        f"Most active {ticker}: ${price:.2f} {'up' if pct >= 0 else 'down'} {abs(pct):.1f}%{vol_note}. "
-        "In 2-3 sentences: why is volume elevated—institutional, retail, news, technical? Does high volume signal strength or distribution?"
+        f"Most active {ticker}: ${price:.2f} {_dir(pct)} {abs(pct):.1f}%{vol_note}. "
+        f"{_VOLUME_SUFFIX}"
     )
-    try:
-        out = _call_claude(user)
-        _set_cached(key, out)
-        return out
-    except Exception:
-        return "Analysis temporarily unavailable."
+    return _analyze_cached(user)
 
 
 def analyze_big_mover(
     ticker: str, price_data: dict, percent_change: float, direction: str
 ) -> str:
     """Explain catalyst for major gain or loss; sustainable or reversal."""
-    key = _cached_key("mover", ticker, f"{direction}_{percent_change:.1f}")
-    cached = _get_cached(key)
-    if cached:
-        return cached
     price = _safe_num(price_data.get("price"), 0.0)
     percent_change = _safe_num(percent_change, 0.0)
     user = (
         f"Biggest {direction} {ticker}: ${price:.2f} {percent_change:+.1f}%. "
-        "In 2-3 sentences: what is the catalyst (earnings, upgrade, sector, short squeeze, news)? Is the move sustainable or likely to reverse? Any level to watch?"
+        f"{_MOVER_SUFFIX}"
     )
+    return _analyze_cached(user)
+
+
+BATCH_CHUNK_SIZE = 10
+
+
+def _parse_batch_answers(text: str, count: int) -> Optional[list[Optional[str]]]:
+    """The JSON array of count strings in Claude's reply (prose or code fences around it ignored); None if absent."""
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end < start:
+        return None
     try:
-        out = _call_claude(user)
-        _set_cached(key, out)
-        return out
-    except Exception:
-        return "Analysis temporarily unavailable."
+        answers = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(answers, list) or len(answers) != count or not all(isinstance(a, str) for a in answers):
+        return None
+    return [a.strip() or None for a in answers]
+
+
+def _call_claude_each(prompts: list[str], max_tokens: int) -> list[Optional[str]]:
+    """One call per prompt, concurrently; None where a call failed."""
+    def task(user: str) -> Optional[str]:
+        try:
+            return _call_claude(user, max_tokens=max_tokens) or None
+        except Exception as e:
+            logger.warning("Claude call failed: %s", e)
+            return None
+
+    with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+        return list(executor.map(task, prompts))
+
+
+def _call_claude_batch(prompts: list[str], max_tokens_per_item: int = 200) -> list[Optional[str]]:
+    """
+    Send several prompts as one message and read the answers back as a JSON array of strings.
+    Returns one entry per prompt, in order. A reply that isn't an array of exactly len(prompts)
+    strings falls back to one call per prompt, so answers never land on the wrong item.
+    """
+    numbered = "\n".join(f"{i}. {p}" for i, p in enumerate(prompts, 1))
+    user = (
+        f"Answer each of the following {len(prompts)} items. Reply with only a JSON array of "
+        f"{len(prompts)} strings, one answer per item in the same order, and nothing else.\n\n"
+        f"{numbered}"
+    )
+    text = _call_claude(user, max_tokens=max_tokens_per_item * len(prompts))
+    answers = _parse_batch_answers(text, len(prompts))
+    if answers is None:
+        logger.info("Batch reply was not a %s-item JSON array; falling back to single calls", len(prompts))
+        return _call_claude_each(prompts, max_tokens_per_item)
+    return answers
 
 
 def batch_analyze_stocks(
@@ -318,20 +535,30 @@ def batch_analyze_stocks(
     build_prompt: Callable[[dict, int], str],
 ) -> list[str]:
     """Efficiently analyze multiple stocks in one Claude call. build_prompt(item, index) -> str per item."""
-    # For simplicity we do one API call per item to keep responses aligned; could batch into single message with numbered items
-    results = []
+    # Cached items skip the batch; the rest go out BATCH_CHUNK_SIZE at a time as numbered prompts
+    results: list[str] = ["Analysis temporarily unavailable."] * len(items)
+    pending: list[tuple[int, str, str]] = []  # (index, cache key, prompt)
     for i, item in enumerate(items):
-        ticker = item.get("ticker") or item.get("symbol", "")
-        key = _cached_key(f"batch_{analysis_type}", ticker, str(i))
+        try:
+            user = build_prompt(item, i)
+        except Exception as e:
+            logger.warning("batch_%s prompt %s: %s", analysis_type, i, e)
+            continue
+        key = _cached_key(user)
         cached = _get_cached(key)
         if cached:
-            results.append(cached)
-            continue
+            results[i] = cached
+        else:
+            pending.append((i, key, user))
+
+    for start in range(0, len(pending), BATCH_CHUNK_SIZE):
+        chunk = pending[start:start + BATCH_CHUNK_SIZE]
         try:
-            user = build_prompt(item, i)
-            out = _call_claude(user, max_tokens=200)
-            _set_cached(key, out)
-            results.append(out)
+            answers = _call_claude_batch([user for _, _, user in chunk])
         except Exception:
-            results.append("Analysis temporarily unavailable.")
+            continue
+        for (i, key, _), out in zip(chunk, answers):
+            if out:
+                _set_cached(key, out)
+                results[i] = out
     return results
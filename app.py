@@ -5,12 +5,18 @@ Portfolio + competitors, trending/gainers/losers, economic calendar, SF apartmen
 Set FLASK_DEBUG=true for dev; PORT and config via environment.
 """
 
-import math
+import hashlib
+import heapq
+import json
 import os
 import time
 import threading
 import logging
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
+from typing import Optional
 try:
     import resource
     try:
@@ -20,12 +26,24 @@ try:
 except ImportError:
     pass
 
-from flask import Flask, render_template, jsonify, request
+import numpy as np
+from flask import Flask, Response, render_template, jsonify, request
 from flask_cors import CORS
+try:
+    import orjson  # optional: faster encoding of the cached dashboard payload
+except ImportError:
+    orjson = None
+try:
+    from numba import njit  # optional: compiles the portfolio stats loop
+except ImportError:
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
 
 import market_data as md
 import agent_brain as brain
-from database import init_db, save_portfolio_snapshot
+from database import init_db, save_portfolio_snapshots_batch
 
 # Ensure DB and api_call_counter table exist before portal_listings (which uses them on import)
 init_db()
@@ -36,14 +54,18 @@ from craigslist_scraper import (
     scrape_stanford_apartments,
     analyze_apartment_deals_cached,
     get_stanford_market_rates,
+    to_columnar,
 )
 from portal_listings import get_portal_listings_sf, get_portal_listings_stanford
 
 try:
-    from config import PORT, FLASK_DEBUG
+    from config import PORT, FLASK_DEBUG, PORTAL_CACHE_TTL, APARTMENT_ANALYSIS_CACHE_TTL, DASHBOARD_REFRESH_INTERVAL
 except ImportError:
     PORT = int(os.environ.get("PORT", "5000"))
     FLASK_DEBUG = os.environ.get("FLASK_DEBUG", "false").strip().lower() in ("1", "true", "yes")
+    PORTAL_CACHE_TTL = int(os.environ.get("PORTAL_CACHE_TTL", "604800"))
+    APARTMENT_ANALYSIS_CACHE_TTL = int(os.environ.get("APARTMENT_ANALYSIS_CACHE_TTL", "3600"))
+    DASHBOARD_REFRESH_INTERVAL = int(os.environ.get("DASHBOARD_REFRESH_INTERVAL", "240"))
 
 logging.basicConfig(
     level=logging.DEBUG if FLASK_DEBUG else logging.INFO,
@@ -60,100 +82,167 @@ app = Flask(
 CORS(app)
 
 # 7 Silver Lake portfolio companies — max 2 competitors each (11 total)
-SILVER_LAKE_PORTFOLIO = [
-    ("DELL", "Dell Technologies", "Enterprise IT infrastructure", ["HPE", "IBM"]),
-    ("MSGS", "MSG Sports", "Madison Square Garden sports and entertainment", ["LYV", "BATRA"]),
-    ("GPN", "Global Payments", "Payment technology and processing", ["PYPL", "FIS"]),
-    ("U", "Unity Software", "Gaming and 3D development platform", ["RBLX", "APP"]),
-    ("FA", "First Advantage", "Employment screening and background checks", []),
-    ("NABL", "N-able", "IT management software for MSPs", []),
-    ("EVCM", "EverCommerce", "Business software for service industries", ["TOST"]),
-]
-
-# All competitor tickers for one parallel fetch
-ALL_COMPETITOR_TICKERS = ["HPE", "IBM", "LYV", "BATRA", "PYPL", "FIS", "RBLX", "APP", "TOST"]
+SILVER_LAKE_PORTFOLIO = (
+    ("DELL", "Dell Technologies", "Enterprise IT infrastructure", ("HPE", "IBM")),
+    ("MSGS", "MSG Sports", "Madison Square Garden sports and entertainment", ("LYV", "BATRA")),
+    ("GPN", "Global Payments", "Payment technology and processing", ("PYPL", "FIS")),
+    ("U", "Unity Software", "Gaming and 3D development platform", ("RBLX", "APP")),
+    ("FA", "First Advantage", "Employment screening and background checks", ()),
+    ("NABL", "N-able", "IT management software for MSPs", ()),
+    ("EVCM", "EverCommerce", "Business software for service industries", ("TOST",)),
+)
+
+# All competitor tickers for one parallel fetch (portfolio order, each once)
+ALL_COMPETITOR_TICKERS = list(dict.fromkeys(c for *_, comps in SILVER_LAKE_PORTFOLIO for c in comps))
+# Benchmarks ride along with the Phase 1 portfolio fetch
+BENCHMARK_TICKER = "SPY"
+_PORTFOLIO_FETCH_TICKERS = tuple(t[0] for t in SILVER_LAKE_PORTFOLIO) + (BENCHMARK_TICKER,)
 
 CACHE_TTL_FULL = 300
-# Economic calendar: 10 min cache so /api/dashboard doesn't block on FRED every load
-ECONOMIC_CALENDAR_TTL = 600
-_cache: dict = {}
-_cache_lock = threading.Lock()
+# Latest refresh result. run_refresh builds a new dict and swaps the reference in one assignment;
+# readers take `snap = _snapshot` once and never lock. Snapshots are never mutated after publish.
+_snapshot: dict = {}
+_refresh_run_lock = threading.Lock()  # serializes writers (concurrent refreshes)
 NO_COMPETITORS_MSG = "No public competitors available"
 
 
-def _safe_num(x, default=0.0):
-    if x is None:
-        return default
-    if isinstance(x, float) and math.isnan(x):
-        return default
+def _safe_num(x, default=0.0, _float=float):
+    """float(x), or default for None/NaN/unparseable. NaN is the only value where v != v."""
     try:
-        return float(x)
+        v = _float(x)
     except (TypeError, ValueError):
         return default
+    return v if v == v else default
 
 
 def _format_competitors(competitor_data: list) -> str:
     if not competitor_data:
         return NO_COMPETITORS_MSG
     parts = []
+    parts_append = parts.append
     for c in competitor_data:
         pct = _safe_num(c.get("change_pct"), None)
         if pct is not None:
-            parts.append(f"{c.get('ticker', '')} {'up' if pct >= 0 else 'down'} {abs(pct):.1f}%")
+            parts_append(f"{c.get('ticker', '')} {'up' if pct >= 0 else 'down'} {abs(pct):.1f}%")
     return ", ".join(parts) if parts else NO_COMPETITORS_MSG
 
 
-def _refresh_all() -> tuple[list, list, list, list, list, list, dict]:
+def _refresh_all() -> tuple[list, list, list, list, list, list, dict, dict, Optional[dict]]:
     """
     Refresh all data in parallel. No delays.
-    Returns (portfolio_list, failed_tickers, trending, gainers, losers, errors, market_fallback).
+    All independent fetches start together; each analysis starts as soon as its inputs land.
+    Returns (portfolio_list, failed_tickers, trending, gainers, losers, errors, market_fallback,
+    economic_calendar, spy_data).
     """
     errors = []
     market_fallback = {"trending": False, "gainers": False, "losers": False}
     portfolio = []
     failed = []
 
-    # Phase 1: Fetch 7 portfolio tickers in parallel
-    portfolio_tickers = [t[0] for t in SILVER_LAKE_PORTFOLIO]
-    try:
-        portfolio_data = md.fetch_all_stocks_parallel(portfolio_tickers)
-    except Exception as e:
-        logger.exception("Portfolio fetch: %s", e)
-        errors.append(f"Portfolio fetch: {e}")
-        portfolio_data = {}
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        fut_port = ex.submit(md.fetch_all_stocks_parallel, _PORTFOLIO_FETCH_TICKERS)
+        fut_comp = ex.submit(md.fetch_all_stocks_parallel, ALL_COMPETITOR_TICKERS)
+        fut_trend = ex.submit(md.get_trending_with_fallback)
+        fut_gain = ex.submit(md.get_gainers_with_fallback, 5)
+        fut_lose = ex.submit(md.get_losers_with_fallback, 5)
+        fut_cal = ex.submit(get_economic_calendar, days_back_recent=30, days_ahead_upcoming=60)
 
-    # Phase 2: Fetch all competitors in parallel
-    try:
-        competitor_data_all = md.fetch_all_stocks_parallel(ALL_COMPETITOR_TICKERS)
-        competitor_by_ticker = {
-            t: {"ticker": t, "price": d["price"], "change_pct": d["change_pct"]}
-            for t, d in competitor_data_all.items()
-        }
-    except Exception as e:
-        logger.warning("Competitor fetch: %s", e)
-        competitor_by_ticker = {}
+        # Phase 1: 7 portfolio tickers + benchmark
+        try:
+            portfolio_data = fut_port.result()
+        except Exception as e:
+            logger.warning("Portfolio fetch: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            errors.append(f"Portfolio fetch: {e}")
+            portfolio_data = {}
 
-    # Phase 3: Claude analyses in parallel for stocks we have data for
-    analysis_items = []
-    for ticker, name, _desc, comp_tickers in SILVER_LAKE_PORTFOLIO:
-        price_data = portfolio_data.get(ticker)
-        if not price_data:
-            failed.append(ticker)
-            continue
-        comp_list = [competitor_by_ticker[t] for t in comp_tickers if t in competitor_by_ticker]
-        analysis_items.append((ticker, price_data, comp_list))
+        # Phase 2: all competitors
+        try:
+            competitor_by_ticker = {
+                t: {"ticker": t, "price": d["price"], "change_pct": d["change_pct"]}
+                for t, d in fut_comp.result().items()
+            }
+        except Exception as e:
+            logger.warning("Competitor fetch: %s", e)
+            competitor_by_ticker = {}
+
+        # Phase 3: Claude analyses for stocks we have data for (runs while widgets finish).
+        # One pass over the config; `pending` is reused to build the portfolio list below.
+        analysis_items = []
+        pending = []
+        for ticker, name, _desc, comp_tickers in SILVER_LAKE_PORTFOLIO:
+            price_data = portfolio_data.get(ticker)
+            if not price_data:
+                failed.append(ticker)
+                pending.append((ticker, name, comp_tickers, None, None))
+                continue
+            comp_list = [competitor_by_ticker[t] for t in comp_tickers if t in competitor_by_ticker]
+            analysis_items.append((ticker, price_data, comp_list))
+            pending.append((ticker, name, comp_tickers, price_data, comp_list))
+        fut_analyses = ex.submit(brain.analyze_all_stocks_parallel, analysis_items, max_workers=7) if analysis_items else None
+
+        # Phase 4: Market widgets with fallback
+        trending = []
+        gainers = []
+        losers = []
+        try:
+            trending, market_fallback["trending"] = fut_trend.result()
+        except Exception as e:
+            logger.warning("Trending: %s", e)
+            errors.append(f"Trending: {e}")
+        try:
+            gainers, market_fallback["gainers"] = fut_gain.result()
+        except Exception as e:
+            logger.warning("Gainers: %s", e)
+            errors.append(f"Gainers: {e}")
+        try:
+            losers, market_fallback["losers"] = fut_lose.result()
+        except Exception as e:
+            logger.warning("Losers: %s", e)
+            errors.append(f"Losers: {e}")
+
+        # Phase 5: AI summaries for trending/gainers/losers
+        fut_widgets = ex.submit(brain.analyze_market_widgets_parallel, trending, gainers, losers, max_workers=10)
+
+        analyses = {}
+        if fut_analyses is not None:
+            try:
+                analyses = fut_analyses.result()
+            except Exception as e:
+                logger.warning("Analyses: %s", e)
+                errors.append(f"Analyses: {e}")
 
-    analyses = {}
-    if analysis_items:
         try:
-            analyses = brain.analyze_all_stocks_parallel(analysis_items, max_workers=7)
+            trend_analyses, gainer_analyses, loser_analyses = fut_widgets.result()
+            for r in trending:
+                r["analysis"] = trend_analyses.get(r.get("ticker"), "")
+            for r in gainers:
+                r["analysis"] = gainer_analyses.get(r.get("ticker"), "")
+            for r in losers:
+                r["analysis"] = loser_analyses.get(r.get("ticker"), "")
         except Exception as e:
-            logger.warning("Analyses: %s", e)
-            errors.append(f"Analyses: {e}")
+            logger.warning("Market widget analyses: %s", e)
+            fallback = "Analysis temporarily unavailable."
+            for r in trending:
+                r["analysis"] = r.get("analysis") or fallback
+            for r in gainers:
+                r["analysis"] = r.get("analysis") or fallback
+            for r in losers:
+                r["analysis"] = r.get("analysis") or fallback
+
+        # Phase 6: Economic calendar (FRED) — fetched here so dashboard reads never hit the network
+        economic_calendar = {"recent_releases": [], "upcoming_releases": []}
+        try:
+            data = fut_cal.result()
+            if isinstance(data, dict):
+                data.setdefault("recent_releases", [])
+                data.setdefault("upcoming_releases", [])
+                economic_calendar = data
+        except Exception as e:
+            logger.warning("Economic calendar failed: %s", e)
 
     # Build portfolio list in SILVER_LAKE order
-    for ticker, name, _desc, comp_tickers in SILVER_LAKE_PORTFOLIO:
-        price_data = portfolio_data.get(ticker)
+    snapshot_rows = []
+    for ticker, name, comp_tickers, price_data, comp_list in pending:
         if not price_data:
             portfolio.append({
                 "ticker": ticker,
@@ -167,16 +256,12 @@ def _refresh_all() -> tuple[list, list, list, list, list, list, dict]:
                 "major_move": False,
             })
             continue
-        comp_list = [competitor_by_ticker[t] for t in comp_tickers if t in competitor_by_ticker]
         comp_summary = _format_competitors(comp_list) if comp_list else NO_COMPETITORS_MSG
         price = _safe_num(price_data.get("price"), None)
         pct = _safe_num(price_data.get("change_pct"), 0.0)
         vol = int(_safe_num(price_data.get("volume"), 0))
         analysis = analyses.get(ticker) or "Analysis temporarily unavailable."
-        try:
-            save_portfolio_snapshot(ticker, price or 0, pct, vol, analysis, comp_summary)
-        except Exception:
-            pass
+        snapshot_rows.append((ticker, price or 0, pct, vol, analysis, comp_summary))
         portfolio.append({
             "ticker": ticker,
             "name": name,
@@ -189,81 +274,72 @@ def _refresh_all() -> tuple[list, list, list, list, list, list, dict]:
             "major_move": abs(pct) > 3,
         })
 
-    # Phase 4: Market widgets with fallback
-    trending = []
-    gainers = []
-    losers = []
-    try:
-        trending, market_fallback["trending"] = md.get_trending_with_fallback()
-    except Exception as e:
-        logger.warning("Trending: %s", e)
-        errors.append(f"Trending: {e}")
-    try:
-        gainers, market_fallback["gainers"] = md.get_gainers_with_fallback(5)
-    except Exception as e:
-        logger.warning("Gainers: %s", e)
-        errors.append(f"Gainers: {e}")
-    try:
-        losers, market_fallback["losers"] = md.get_losers_with_fallback(5)
-    except Exception as e:
-        logger.warning("Losers: %s", e)
-        errors.append(f"Losers: {e}")
-
-    # Phase 5: AI summaries for trending/gainers/losers (parallel)
     try:
-        trend_analyses, gainer_analyses, loser_analyses = brain.analyze_market_widgets_parallel(
-            trending, gainers, losers, max_workers=10
-        )
-        for r in trending:
-            r["analysis"] = trend_analyses.get(r.get("ticker"), "")
-        for r in gainers:
-            r["analysis"] = gainer_analyses.get(r.get("ticker"), "")
-        for r in losers:
-            r["analysis"] = loser_analyses.get(r.get("ticker"), "")
+        save_portfolio_snapshots_batch(snapshot_rows)
     except Exception as e:
-        logger.warning("Market widget analyses: %s", e)
-        fallback = "Analysis temporarily unavailable."
-        for r in trending:
-            r["analysis"] = r.get("analysis") or fallback
-        for r in gainers:
-            r["analysis"] = r.get("analysis") or fallback
-        for r in losers:
-            r["analysis"] = r.get("analysis") or fallback
+        logger.warning("Snapshot save: %s", e)
 
-    return portfolio, failed, trending, gainers, losers, errors, market_fallback
+    spy_data = portfolio_data.get(BENCHMARK_TICKER)
+    return portfolio, failed, trending, gainers, losers, errors, market_fallback, economic_calendar, spy_data
 
 
-def _build_performance_summary(portfolio_list: list) -> dict:
+def _valid_pcts(portfolio_list: list) -> tuple[list, np.ndarray]:
+    """Rows with a change_pct, plus those values as a float64 array (same order)."""
     valid = [p for p in portfolio_list if p.get("change_pct") is not None]
-    if not valid:
+    return valid, np.fromiter((p["change_pct"] for p in valid), dtype=np.float64, count=len(valid))
+
+
+@njit(cache=True)
+def _pct_stats(pcts):
+    """One pass over a non-empty array: (mean, argmax, argmin). First index wins ties."""
+    total = 0.0
+    hi = 0
+    lo = 0
+    for i in range(pcts.shape[0]):
+        v = pcts[i]
+        total += v
+        if v > pcts[hi]:
+            hi = i
+        if v < pcts[lo]:
+            lo = i
+    return total / pcts.shape[0], hi, lo
+
+
+def _portfolio_stats(pcts: np.ndarray) -> Optional[tuple]:
+    """(mean, argmax, argmin) of the valid change_pcts, or None when there are none. Shared by the summary builders."""
+    return _pct_stats(pcts) if len(pcts) else None
+
+
+def _build_performance_summary(valid: list, stats: Optional[tuple]) -> dict:
+    if stats is None:
         return {"avg_change_pct": None, "best": None, "worst": None, "count": 0}
-    avg = sum(p["change_pct"] for p in valid) / len(valid)
-    best = max(valid, key=lambda p: p["change_pct"])
-    worst = min(valid, key=lambda p: p["change_pct"])
+    avg, hi, lo = stats
+    best = valid[hi]
+    worst = valid[lo]
     return {
-        "avg_change_pct": round(avg, 2),
+        "avg_change_pct": round(float(avg), 2),
         "best": {"ticker": best["ticker"], "name": best["name"], "change_pct": best["change_pct"]},
         "worst": {"ticker": worst["ticker"], "name": worst["name"], "change_pct": worst["change_pct"]},
         "count": len(valid),
     }
 
 
-def _build_top_movers(portfolio_list: list) -> dict:
-    valid = [p for p in portfolio_list if p.get("change_pct") is not None]
+def _build_top_movers(valid: list, k: int = 3) -> dict:
     if not valid:
         return {"gainers": [], "losers": []}
-    sorted_by_pct = sorted(valid, key=lambda p: p["change_pct"], reverse=True)
-    gainers = [{"ticker": p["ticker"], "name": p["name"], "change_pct": p["change_pct"], "price": p.get("price")} for p in sorted_by_pct[:3]]
-    losers = [{"ticker": p["ticker"], "name": p["name"], "change_pct": p["change_pct"], "price": p.get("price")} for p in sorted_by_pct[-3:][::-1]]
+    key = itemgetter("change_pct")
+    # reversed(): equal losers come latest-first, matching the old tail of a stable descending sort
+    top = heapq.nlargest(k, valid, key=key)
+    bottom = heapq.nsmallest(k, reversed(valid), key=key)
+    gainers = [{"ticker": p["ticker"], "name": p["name"], "change_pct": p["change_pct"], "price": p.get("price")} for p in top]
+    losers = [{"ticker": p["ticker"], "name": p["name"], "change_pct": p["change_pct"], "price": p.get("price")} for p in bottom]
     return {"gainers": gainers, "losers": losers}
 
 
-def _build_portfolio_vs_market(portfolio_list: list) -> dict:
-    valid = [p for p in portfolio_list if p.get("change_pct") is not None]
-    if not valid:
+def _build_portfolio_vs_market(stats: Optional[tuple], spy_data: Optional[dict]) -> dict:
+    if stats is None:
         return {"portfolio_avg_pct": None, "spy_pct": None, "outperformance": None}
-    portfolio_avg = sum(p["change_pct"] for p in valid) / len(valid)
-    spy_data = md.get_stock_data("SPY")
+    portfolio_avg = float(stats[0])
     spy_pct = _safe_num(spy_data.get("change_pct"), None) if spy_data else None
     outperformance = (portfolio_avg - spy_pct) if spy_pct is not None else None
     return {
@@ -273,72 +349,186 @@ def _build_portfolio_vs_market(portfolio_list: list) -> dict:
     }
 
 
-def run_refresh():
-    """Run full refresh and update cache. Never raises."""
-    logger.info("Refreshing all data (parallel)...")
-    start = time.time()
-    try:
-        portfolio, failed, trending, gainers, losers, errors, market_fallback = _refresh_all()
-        updated = time.time()
-        summary = _build_performance_summary(portfolio)
-        movers = _build_top_movers(portfolio)
-        vs_market = _build_portfolio_vs_market(portfolio)
-        with _cache_lock:
-            _cache["portfolio"] = {"data": portfolio, "updated": updated}
-            _cache["performance_summary"] = {"data": summary, "updated": updated}
-            _cache["top_movers"] = {"data": movers, "updated": updated}
-            _cache["portfolio_vs_market"] = {"data": vs_market, "updated": updated}
-            _cache["trending"] = {"data": trending, "updated": updated}
-            _cache["gainers"] = {"data": gainers, "updated": updated}
-            _cache["losers"] = {"data": losers, "updated": updated}
-            _cache["errors"] = {"data": errors, "updated": updated}
-            _cache["market_fallback"] = {"data": market_fallback, "updated": updated}
-            _cache["last_failed"] = {"data": failed, "updated": updated}
-        logger.info("Refresh complete in %.1fs. Succeeded: %s, Failed: %s", updated - start, len(portfolio) - len(failed), len(failed))
-    except Exception as e:
-        logger.exception("Refresh failed: %s", e)
-        with _cache_lock:
-            portfolio = _cache.get("portfolio", {}).get("data") or []
+def run_refresh(since: Optional[float] = None):
+    """
+    Run full refresh and publish a new snapshot. Never raises.
+    since: caller's start time; if a refresh that was already running published after it, reuse that one.
+    """
+    global _snapshot
+    with _refresh_run_lock:
+        if since is not None and _snapshot.get("updated", 0) > since:
+            logger.info("Refresh skipped: snapshot published while waiting")
+            return
+        logger.info("Refreshing all data (parallel)...")
+        start = time.time()
+        try:
+            (portfolio, failed, trending, gainers, losers, errors, market_fallback,
+             economic_calendar, spy_data) = _refresh_all()
+            updated = time.time()
+            valid, pcts = _valid_pcts(portfolio)
+            stats = _portfolio_stats(pcts)
+            snap = {
+                "portfolio": portfolio,
+                "performance_summary": _build_performance_summary(valid, stats),
+                "top_movers": _build_top_movers(valid),
+                "portfolio_vs_market": _build_portfolio_vs_market(stats, spy_data),
+                "trending": trending,
+                "gainers": gainers,
+                "losers": losers,
+                "errors": errors,
+                "market_fallback": market_fallback,
+                "last_failed": failed,
+                "updated": updated,
+                "economic_calendar": economic_calendar,
+            }
+            body = _encode_json(_dashboard_payload(snap))
+            snap["dashboard_json"] = body
+            snap["dashboard_etag"] = hashlib.blake2b(body, digest_size=16).hexdigest()
+            _snapshot = snap
+            logger.info("Refresh complete in %.1fs. Succeeded: %s, Failed: %s", updated - start, len(portfolio) - len(failed), len(failed))
+        except Exception as e:
+            logger.exception("Refresh failed: %s", e)
+
+
+def _encode_json(payload: dict) -> bytes:
+    """Serialize a response payload once; orjson when installed, stdlib json otherwise."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass
+    return json.dumps(payload, default=str).encode()
+
+
+def _dashboard_payload(snap: dict) -> dict:
+    """Shape a snapshot into the /api/dashboard response body (fills gaps when cold)."""
+    portfolio = snap.get("portfolio") or []
+    valid, pcts = _valid_pcts(portfolio)
+    summary = snap.get("performance_summary")
+    vs_market = snap.get("portfolio_vs_market")
+    if not summary or not vs_market:
+        stats = _portfolio_stats(pcts)
+        summary = summary or _build_performance_summary(valid, stats)
+        vs_market = vs_market or _build_portfolio_vs_market(stats, None)
+    return {
+        "portfolio": portfolio,
+        "performance_summary": summary,
+        "top_movers": snap.get("top_movers") or _build_top_movers(valid),
+        "portfolio_vs_market": vs_market,
+        "trending": snap.get("trending") or [],
+        "gainers": snap.get("gainers") or [],
+        "losers": snap.get("losers") or [],
+        "economic_calendar": snap.get("economic_calendar") or {"recent_releases": [], "upcoming_releases": []},
+        "errors": snap.get("errors") or [],
+        "market_fallback": snap.get("market_fallback") or {},
+        "updated": snap.get("updated", time.time()),
+    }
+
+
+_refresher_started = False
+_refresher_lock = threading.Lock()
+
+
+# Room for a refresh's own duration: cycles must start within the analysis TTL of each other
+# or every background refresh misses the Claude cache and pays for all analyses again.
+_REFRESH_TTL_MARGIN = 60
+
+
+def _refresh_interval() -> int:
+    """DASHBOARD_REFRESH_INTERVAL, capped so consecutive cycles stay inside agent_brain's cache TTL."""
+    cap = max(1, brain.ANALYSIS_CACHE_TTL - _REFRESH_TTL_MARGIN)
+    if DASHBOARD_REFRESH_INTERVAL > cap:
+        logger.warning(
+            "DASHBOARD_REFRESH_INTERVAL=%s exceeds the analysis cache TTL window; using %ss",
+            DASHBOARD_REFRESH_INTERVAL, cap,
+        )
+        return cap
+    return DASHBOARD_REFRESH_INTERVAL
+
+
+def _refresh_loop():
+    """Keep the snapshot warm so no visitor pays for a cold refresh. Fixed rate: run time counts toward the interval."""
+    interval = _refresh_interval()
+    next_run = time.monotonic()
+    while True:
+        try:
+            run_refresh()
+        except Exception:
+            logger.exception("Background refresh")
+        next_run = max(next_run + interval, time.monotonic())  # an overrun starts the next cycle immediately
+        time.sleep(max(0.0, next_run - time.monotonic()))
+
+
+def _ensure_refresher_started():
+    """Start the background refresh thread once per process (dev server or each gunicorn worker)."""
+    global _refresher_started
+    if _refresher_started or DASHBOARD_REFRESH_INTERVAL <= 0:
+        return
+    with _refresher_lock:
+        if _refresher_started:
+            return
+        threading.Thread(target=_refresh_loop, name="dashboard-refresh", daemon=True).start()
+        _refresher_started = True
 
 
 # ---------- Routes ----------
 
+
+@app.before_request
+def _start_refresher_on_first_request():
+    _ensure_refresher_started()
+
+
 @app.route("/", methods=["GET"])
 def index():
     return render_template("dashboard.html"), 200, {"Content-Type": "text/html; charset=utf-8"}
 
 
+_STATIC_PAGES: dict[str, tuple[bytes, str]] = {}  # template name -> (rendered html, etag)
+
+
+def _static_page(name: str) -> Response:
+    """Serve a template with no runtime data; rendered once (first hit has the request context url_for needs)."""
+    page = _STATIC_PAGES.get(name)
+    if page is None:
+        body = render_template(name).encode("utf-8")
+        page = _STATIC_PAGES[name] = (body, hashlib.blake2b(body, digest_size=16).hexdigest())
+    body, etag = page
+    resp = Response(body, mimetype="text/html", headers={"Cache-Control": "public, max-age=3600"})
+    resp.set_etag(etag)
+    return resp.make_conditional(request)
+
+
 @app.route("/about")
 def about():
-    return render_template("about.html")
+    return _static_page("about.html")
 
 
 @app.route("/privacy")
 def privacy():
-    return render_template("privacy.html")
+    return _static_page("privacy.html")
 
 
 @app.route("/contact")
 def contact():
-    return render_template("contact.html")
+    return _static_page("contact.html")
 
 
 @app.route("/terms")
 def terms():
-    return render_template("terms.html")
+    return _static_page("terms.html")
 
 
 @app.route("/api/refresh", methods=["POST"])
 def api_manual_refresh():
     """Trigger manual refresh. Never 500. Returns succeeded/failed and duration."""
     start = time.time()
-    failed = []
     try:
-        run_refresh()
-        updated = time.time()
-        with _cache_lock:
-            portfolio = _cache.get("portfolio", {}).get("data") or []
-            failed = _cache.get("last_failed", {}).get("data") or []
+        run_refresh(since=start)
+        snap = _snapshot
+        updated = snap.get("updated", time.time())
+        portfolio = snap.get("portfolio") or []
+        failed = snap.get("last_failed") or []
         succeeded = len([p for p in portfolio if p.get("price") is not None])
         return jsonify({
             "ok": True,
@@ -351,9 +541,9 @@ def api_manual_refresh():
     except Exception as e:
         logger.exception("Refresh error: %s", e)
         updated = time.time()
-        with _cache_lock:
-            portfolio = _cache.get("portfolio", {}).get("data") or []
-            failed = _cache.get("last_failed", {}).get("data") or []
+        snap = _snapshot
+        portfolio = snap.get("portfolio") or []
+        failed = snap.get("last_failed") or []
         return jsonify({
             "ok": True,
             "updated": updated,
@@ -367,58 +557,27 @@ def api_manual_refresh():
 
 @app.route("/api/dashboard")
 def api_dashboard():
-    with _cache_lock:
-        portfolio = _cache.get("portfolio", {}).get("data") or []
-        summary = _cache.get("performance_summary", {}).get("data") or _build_performance_summary(portfolio)
-        movers = _cache.get("top_movers", {}).get("data") or _build_top_movers(portfolio)
-        vs_market = _cache.get("portfolio_vs_market", {}).get("data") or _build_portfolio_vs_market(portfolio)
-        trending = _cache.get("trending", {}).get("data") or []
-        gainers = _cache.get("gainers", {}).get("data") or []
-        losers = _cache.get("losers", {}).get("data") or []
-        errors = _cache.get("errors", {}).get("data") or []
-        market_fallback = _cache.get("market_fallback", {}).get("data") or {}
-        updated = _cache.get("portfolio", {}).get("updated", time.time())
-        econ_entry = _cache.get("economic_calendar", {})
-        econ_ts = econ_entry.get("updated", 0)
-        economic_calendar = None
-        if time.time() - econ_ts < ECONOMIC_CALENDAR_TTL and isinstance(econ_entry.get("data"), dict):
-            economic_calendar = econ_entry["data"]
-    if economic_calendar is None:
-        try:
-            economic_calendar = get_economic_calendar(days_back_recent=30, days_ahead_upcoming=60)
-        except Exception as e:
-            logger.warning("Economic calendar failed: %s", e)
-            economic_calendar = {"recent_releases": [], "upcoming_releases": []}
-        if not isinstance(economic_calendar, dict):
-            economic_calendar = {"recent_releases": [], "upcoming_releases": []}
-        economic_calendar.setdefault("recent_releases", [])
-        economic_calendar.setdefault("upcoming_releases", [])
-        with _cache_lock:
-            _cache["economic_calendar"] = {"data": economic_calendar, "updated": time.time()}
-    return jsonify({
-        "portfolio": portfolio,
-        "performance_summary": summary,
-        "top_movers": movers,
-        "portfolio_vs_market": vs_market,
-        "trending": trending,
-        "gainers": gainers,
-        "losers": losers,
-        "economic_calendar": economic_calendar,
-        "errors": errors,
-        "market_fallback": market_fallback,
-        "updated": updated,
-    })
+    snap = _snapshot
+    body = snap.get("dashboard_json")
+    if body is None:
+        return jsonify(_dashboard_payload(snap))
+    etag = snap["dashboard_etag"]
+    # no-cache = always revalidate, so the reload right after a manual refresh isn't served stale
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype="application/json", headers=headers)
 
 
 def _register_debug_routes():
     """Register /api/apartments/debug only when FLASK_DEBUG is set."""
     @app.route("/api/apartments/debug")
     def debug_apartments():
-        import requests as req
-        from bs4 import BeautifulSoup as BS
+        from bs4 import BeautifulSoup as BS, SoupStrainer
+        from http_client import HTTP
         debug_info = {"timestamp": datetime.now().isoformat(), "steps": []}
         try:
-            resp = req.get(
+            resp = HTTP.get(
                 "https://sfbay.craigslist.org/search/sfc/apa?min_price=2000&max_price=5000",
                 headers={"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"},
                 timeout=10,
@@ -429,7 +588,8 @@ def _register_debug_routes():
                 "status_code": resp.status_code,
                 "response_length": len(resp.text),
             })
-            soup = BS(resp.text, "html.parser")
+            # Only <li>/<a> are inspected; lxml + strainer skips building the rest of the tree
+            soup = BS(resp.text, "lxml", parse_only=SoupStrainer(["li", "a"]))
             class_counts = {cn: len(soup.find_all("li", class_=cn)) for cn in ("cl-search-result", "result-row", "cl-static-search-result")}
             listing_links = [a for a in soup.find_all("a", href=True) if "/sfc/apa/" in a.get("href", "") or "/apa/" in a.get("href", "")]
             debug_info["steps"].append({
@@ -444,6 +604,10 @@ def _register_debug_routes():
         return jsonify(debug_info)
 
 
+if FLASK_DEBUG:
+    _register_debug_routes()
+
+
 # Portal: full list per location (same API call count: 1 SF + 2 Stanford)
 PORTAL_SF_MAX = 500
 PORTAL_STANFORD_MAX = 1000
@@ -454,9 +618,107 @@ SCRAPE_POOL_SIZE = 400
 # Refresh rate limit: per-IP, generous but prevents credit abuse
 REFRESH_LIMIT_PER_HOUR = 15
 REFRESH_MIN_INTERVAL_SECONDS = 120  # at least 2 min between refreshes
-_refresh_timestamps = {}  # ip -> list of timestamps
+REFRESH_TRACKED_IPS_MAX = 10_000  # LRU cap so an IP scan can't grow the table without bound
+_refresh_timestamps: "OrderedDict[str, deque]" = OrderedDict()  # ip -> ascending timestamps, LRU order
 _refresh_lock = threading.Lock()
 
+# Apartment endpoint results: key -> (apartments, stats, body, cached_at). Refresh endpoints overwrite.
+_apartments_cache: dict[str, tuple[list, dict, bytes, float]] = {}
+_apartments_key_locks: dict[str, threading.Lock] = {}
+_apartments_key_locks_guard = threading.Lock()
+
+
+def _compute_stats(apartments: list) -> dict:
+    """total / excellent_deals / average_price over the listings' numeric columns."""
+    total = len(apartments)
+    cols = to_columnar(apartments, ("price", "deal_score"))
+    return {
+        "total": total,
+        "excellent_deals": int(np.count_nonzero(cols["deal_score"] >= 80)),  # NaN (unscored) compares False
+        "average_price": round(float(np.nansum(cols["price"])) / total) if total > 0 else 0,
+    }
+
+
+def _apartments_entry(key: str, fetcher, ttl: int, force: bool = False) -> tuple[list, dict, bytes, float]:
+    """
+    Cached (apartments, stats, GET body, cached_at) for key. Fresh entries are served lock-free;
+    otherwise one thread per key fetches while the others wait and reuse its result.
+    """
+    requested_at = time.time()
+    entry = _apartments_cache.get(key)
+    if not force and entry and requested_at - entry[3] < ttl:
+        return entry
+    with _apartments_key_locks_guard:
+        lock = _apartments_key_locks.setdefault(key, threading.Lock())
+    with lock:
+        entry = _apartments_cache.get(key)
+        if entry and (entry[3] >= requested_at or (not force and time.time() - entry[3] < ttl)):
+            return entry
+        apartments = fetcher()
+        stats = _compute_stats(apartments)
+        now = time.time()
+        body = _encode_json({
+            "apartments": apartments,
+            "stats": stats,
+            "last_updated": datetime.fromtimestamp(now).isoformat(),
+        })
+        entry = (apartments, stats, body, now)
+        if apartments:  # don't pin an empty (likely failed) fetch for a whole TTL
+            _apartments_cache[key] = entry
+        return entry
+
+
+def _apartments_view(key: str, fetcher, ttl: int, label: str):
+    """GET view: serve the cached JSON bytes for key."""
+    def view():
+        try:
+            body = _apartments_entry(key, fetcher, ttl)[2]
+            return Response(body, mimetype="application/json")
+        except Exception as e:
+            logger.warning("%s: %s", label, e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return jsonify({"error": str(e)}), 500
+    return view
+
+
+def _apartments_refresh_view(key: str, fetcher, ttl: int, label: str):
+    """POST view: rate-limited per IP; refetches key and replaces the cached entry."""
+    def view():
+        ip = _client_ip(request)
+        allowed, retry_after = _check_refresh_rate_limit(ip)
+        if not allowed:
+            return (
+                jsonify({
+                    "success": False,
+                    "error": "refresh_limit",
+                    "message": "Too many refreshes. Wait a bit before trying again.",
+                    "retry_after_seconds": retry_after,
+                }),
+                429,
+                {"Retry-After": str(max(1, retry_after))},
+            )
+        try:
+            apartments, stats, _body, _ts = _apartments_entry(key, fetcher, ttl, force=True)
+            body = _encode_json({"success": True, "apartments": apartments, "stats": stats})
+            return Response(body, mimetype="application/json")
+        except Exception as e:
+            logger.warning("%s: %s", label, e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return jsonify({"success": False, "error": str(e)}), 500
+    return view
+
+
+def _scrape_and_analyze_sf() -> list:
+    """Alternate source: SF apartments in $2K-$5K range."""
+    apartments = scrape_sf_apartments(max_listings=SCRAPE_POOL_SIZE)
+    return analyze_apartment_deals_cached(apartments, max_analyze=AI_TOP_N_PER_TAB)
+
+
+def _scrape_and_analyze_stanford() -> list:
+    """Stanford area (peninsula), student-friendly $1.5K–$6.5K (incl. 2BR)."""
+    apartments = scrape_stanford_apartments(max_listings=SCRAPE_POOL_SIZE)
+    return analyze_apartment_deals_cached(
+        apartments, max_analyze=AI_TOP_N_PER_TAB, get_market_rates=get_stanford_market_rates
+    )
+
 
 def _client_ip(request):
     """Client IP for rate limiting (supports X-Forwarded-For behind proxy)."""
@@ -474,174 +736,47 @@ def _check_refresh_rate_limit(ip):
     now = time.time()
     window_start = now - 3600
     with _refresh_lock:
-        timestamps = _refresh_timestamps.get(ip, [])
-        timestamps = [t for t in timestamps if t > window_start]
+        timestamps = _refresh_timestamps.get(ip)
+        if timestamps is None:
+            timestamps = _refresh_timestamps[ip] = deque(maxlen=REFRESH_LIMIT_PER_HOUR)
+            if len(_refresh_timestamps) > REFRESH_TRACKED_IPS_MAX:
+                _refresh_timestamps.popitem(last=False)
+        else:
+            _refresh_timestamps.move_to_end(ip)
+        while timestamps and timestamps[0] <= window_start:
+            timestamps.popleft()
         if len(timestamps) >= REFRESH_LIMIT_PER_HOUR:
-            oldest_in_window = min(timestamps) if timestamps else now
-            return False, int(3600 - (now - oldest_in_window)) + 1
-        if timestamps and (now - max(timestamps)) < REFRESH_MIN_INTERVAL_SECONDS:
-            return False, REFRESH_MIN_INTERVAL_SECONDS - int(now - max(timestamps))
+            return False, int(3600 - (now - timestamps[0])) + 1
+        if timestamps and (now - timestamps[-1]) < REFRESH_MIN_INTERVAL_SECONDS:
+            return False, REFRESH_MIN_INTERVAL_SECONDS - int(now - timestamps[-1])
         timestamps.append(now)
-        _refresh_timestamps[ip] = timestamps
     return True, 0
 
 
-@app.route("/api/apartments/portal")
-def get_apartments_portal():
-    """Portal (API) listings for SF. Cached; rate-limited. Same response shape as get_apartments."""
-    try:
-        apartments = get_portal_listings_sf(min_price=2000, max_price=5000, max_return=PORTAL_SF_MAX)
-        total = len(apartments)
-        excellent = len([a for a in apartments if (a.get("deal_score") or 0) >= 80])
-        avg_price = round(sum(a["price"] for a in apartments if a.get("price")) / total) if total > 0 else 0
-        return jsonify({
-            "apartments": apartments,
-            "stats": {"total": total, "excellent_deals": excellent, "average_price": avg_price},
-            "last_updated": datetime.now().isoformat(),
-        })
-    except Exception as e:
-        logger.exception("Portal SF endpoint: %s", e)
-        return jsonify({"error": str(e)}), 500
-
-
-@app.route("/api/apartments/portal/stanford")
-def get_apartments_portal_stanford():
-    """Portal (API) listings for Stanford area. Cached; rate-limited."""
-    try:
-        apartments = get_portal_listings_stanford(min_price=1500, max_price=6500, max_return=PORTAL_STANFORD_MAX)
-        total = len(apartments)
-        excellent = len([a for a in apartments if (a.get("deal_score") or 0) >= 80])
-        avg_price = round(sum(a["price"] for a in apartments if a.get("price")) / total) if total > 0 else 0
-        return jsonify({
-            "apartments": apartments,
-            "stats": {"total": total, "excellent_deals": excellent, "average_price": avg_price},
-            "last_updated": datetime.now().isoformat(),
-        })
-    except Exception as e:
-        logger.exception("Portal Stanford endpoint: %s", e)
-        return jsonify({"error": str(e)}), 500
-
-
-@app.route("/api/apartments")
-def get_apartments():
-    """Alternate source: SF apartments in $2K-$5K range. Same response shape."""
-    try:
-        apartments = scrape_sf_apartments(max_listings=SCRAPE_POOL_SIZE)
-        apartments = analyze_apartment_deals_cached(apartments, max_analyze=AI_TOP_N_PER_TAB)
-        total = len(apartments)
-        excellent = len([a for a in apartments if a.get("deal_score", 0) >= 80])
-        avg_price = round(sum(a["price"] for a in apartments if a.get("price")) / total) if total > 0 else 0
-        return jsonify({
-            "apartments": apartments,
-            "stats": {
-                "total": total,
-                "excellent_deals": excellent,
-                "average_price": avg_price,
-            },
-            "last_updated": datetime.now().isoformat(),
-        })
-    except Exception as e:
-        logger.exception("Apartments endpoint: %s", e)
-        return jsonify({"error": str(e)}), 500
-
-
-@app.route("/api/apartments/refresh", methods=["POST"])
-def refresh_apartments():
-    """Manually refresh apartment listings. Returns top 200 by deal score. Rate-limited per IP."""
-    ip = _client_ip(request)
-    allowed, retry_after = _check_refresh_rate_limit(ip)
-    if not allowed:
-        return (
-            jsonify({
-                "success": False,
-                "error": "refresh_limit",
-                "message": "Too many refreshes. Wait a bit before trying again.",
-                "retry_after_seconds": retry_after,
-            }),
-            429,
-            {"Retry-After": str(max(1, retry_after))},
-        )
-    try:
-        apartments = scrape_sf_apartments(max_listings=SCRAPE_POOL_SIZE)
-        apartments = analyze_apartment_deals_cached(apartments, max_analyze=AI_TOP_N_PER_TAB)
-        total = len(apartments)
-        excellent = len([a for a in apartments if a.get("deal_score", 0) >= 80])
-        avg_price = round(sum(a["price"] for a in apartments if a.get("price")) / total) if total > 0 else 0
-        return jsonify({
-            "success": True,
-            "apartments": apartments,
-            "stats": {
-                "total": total,
-                "excellent_deals": excellent,
-                "average_price": avg_price,
-            },
-        })
-    except Exception as e:
-        logger.exception("Apartments refresh: %s", e)
-        return jsonify({"success": False, "error": str(e)}), 500
-
-
-@app.route("/api/apartments/stanford")
-def get_stanford_apartments():
-    """Fetch and analyze Stanford area (peninsula) apartments. Student-friendly $1.5K–$6.5K (incl. 2BR). Returns top 200."""
-    try:
-        apartments = scrape_stanford_apartments(max_listings=SCRAPE_POOL_SIZE)
-        apartments = analyze_apartment_deals_cached(
-            apartments, max_analyze=AI_TOP_N_PER_TAB, get_market_rates=get_stanford_market_rates
-        )
-        total = len(apartments)
-        excellent = len([a for a in apartments if a.get("deal_score", 0) >= 80])
-        avg_price = round(sum(a["price"] for a in apartments if a.get("price")) / total) if total > 0 else 0
-        return jsonify({
-            "apartments": apartments,
-            "stats": {
-                "total": total,
-                "excellent_deals": excellent,
-                "average_price": avg_price,
-            },
-            "last_updated": datetime.now().isoformat(),
-        })
-    except Exception as e:
-        logger.exception("Stanford apartments endpoint: %s", e)
-        return jsonify({"error": str(e)}), 500
-
-
-@app.route("/api/apartments/stanford/refresh", methods=["POST"])
-def refresh_stanford_apartments():
-    """Manually refresh Stanford area listings. Rate-limited per IP (same as SF refresh)."""
-    ip = _client_ip(request)
-    allowed, retry_after = _check_refresh_rate_limit(ip)
-    if not allowed:
-        return (
-            jsonify({
-                "success": False,
-                "error": "refresh_limit",
-                "message": "Too many refreshes. Wait a bit before trying again.",
-                "retry_after_seconds": retry_after,
-            }),
-            429,
-            {"Retry-After": str(max(1, retry_after))},
-        )
-    try:
-        apartments = scrape_stanford_apartments(max_listings=SCRAPE_POOL_SIZE)
-        apartments = analyze_apartment_deals_cached(
-            apartments, max_analyze=AI_TOP_N_PER_TAB, get_market_rates=get_stanford_market_rates
-        )
-        total = len(apartments)
-        excellent = len([a for a in apartments if a.get("deal_score", 0) >= 80])
-        avg_price = round(sum(a["price"] for a in apartments if a.get("price")) / total) if total > 0 else 0
-        return jsonify({
-            "success": True,
-            "apartments": apartments,
-            "stats": {
-                "total": total,
-                "excellent_deals": excellent,
-                "average_price": avg_price,
-            },
-        })
-    except Exception as e:
-        logger.exception("Stanford apartments refresh: %s", e)
-        return jsonify({"success": False, "error": str(e)}), 500
+# (rule, endpoint, cache key, fetcher, ttl, log label). Portal = RentCast API; others = Craigslist.
+_APARTMENT_ROUTES = (
+    ("/api/apartments/portal", "get_apartments_portal", "portal_sf",
+     lambda: get_portal_listings_sf(min_price=2000, max_price=5000, max_return=PORTAL_SF_MAX),
+     PORTAL_CACHE_TTL, "Portal SF endpoint"),
+    ("/api/apartments/portal/stanford", "get_apartments_portal_stanford", "portal_stanford",
+     lambda: get_portal_listings_stanford(min_price=1500, max_price=6500, max_return=PORTAL_STANFORD_MAX),
+     PORTAL_CACHE_TTL, "Portal Stanford endpoint"),
+    ("/api/apartments", "get_apartments", "craigslist_sf",
+     _scrape_and_analyze_sf, APARTMENT_ANALYSIS_CACHE_TTL, "Apartments endpoint"),
+    ("/api/apartments/stanford", "get_stanford_apartments", "craigslist_stanford",
+     _scrape_and_analyze_stanford, APARTMENT_ANALYSIS_CACHE_TTL, "Stanford apartments endpoint"),
+)
+# Manual refresh (POST) for the Craigslist tabs
+_APARTMENT_REFRESH_ROUTES = (
+    ("/api/apartments/refresh", "refresh_apartments", "craigslist_sf",
+     _scrape_and_analyze_sf, APARTMENT_ANALYSIS_CACHE_TTL, "Apartments refresh"),
+    ("/api/apartments/stanford/refresh", "refresh_stanford_apartments", "craigslist_stanford",
+     _scrape_and_analyze_stanford, APARTMENT_ANALYSIS_CACHE_TTL, "Stanford apartments refresh"),
+)
+for _rule, _endpoint, _key, _fetcher, _ttl, _label in _APARTMENT_ROUTES:
+    app.add_url_rule(_rule, _endpoint, _apartments_view(_key, _fetcher, _ttl, _label))
+for _rule, _endpoint, _key, _fetcher, _ttl, _label in _APARTMENT_REFRESH_ROUTES:
+    app.add_url_rule(_rule, _endpoint, _apartments_refresh_view(_key, _fetcher, _ttl, _label), methods=["POST"])
 
 
 @app.route("/test-rentcast")
@@ -656,5 +791,6 @@ def test_rentcast_page():
 
 if __name__ == "__main__":
     init_db()
+    _ensure_refresher_started()
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port, debug=False)
@@ -1,11 +1,19 @@
 """
 Application configuration from environment variables.
 Use .env for local overrides; set env in production.
+Single source of truth: modules import settings from here (with an env fallback if it's missing).
 """
 
 import os
 from pathlib import Path
 
+try:
+    from dotenv import load_dotenv
+    # Load .env here so settings resolve the same no matter which module imports config first
+    load_dotenv()
+except ImportError:
+    pass
+
 # Base paths
 BASE_DIR = Path(__file__).resolve().parent
 
@@ -13,15 +21,29 @@ BASE_DIR = Path(__file__).resolve().parent
 PORT = int(os.environ.get("PORT", "5000"))
 FLASK_DEBUG = os.environ.get("FLASK_DEBUG", "false").strip().lower() in ("1", "true", "yes")
 
+# Dashboard: background refresh interval in seconds (0 disables; manual /api/refresh still works).
+# Kept under the 5-minute Claude analysis cache TTL so each cycle reuses the previous cycle's analyses.
+DASHBOARD_REFRESH_INTERVAL = int(os.environ.get("DASHBOARD_REFRESH_INTERVAL", "240"))
+
 # Scraper
 REQUEST_TIMEOUT = int(os.environ.get("SCRAPER_TIMEOUT", "15"))
 SCRAPER_DEBUG = os.environ.get("SCRAPER_DEBUG", "false").strip().lower() in ("1", "true", "yes")
+# Debug runs only: seconds to keep Craigslist pages in a requests-cache disk cache (0 disables)
+SCRAPER_HTTP_CACHE_TTL = int(os.environ.get("SCRAPER_HTTP_CACHE_TTL", "300"))
 
 # Apartment analysis cache: how long (seconds) to reuse Claude results per listing URL. Default 1 hour.
 APARTMENT_ANALYSIS_CACHE_TTL = int(os.environ.get("APARTMENT_ANALYSIS_CACHE_TTL", "3600"))
+# Send apartment analyses through the Message Batches API (half price; results may take minutes).
+# Listings still pending after the timeout (seconds) fall back to direct calls.
+APARTMENT_AI_BATCH = os.environ.get("APARTMENT_AI_BATCH", "false").strip().lower() in ("1", "true", "yes")
+APARTMENT_AI_BATCH_TIMEOUT = int(os.environ.get("APARTMENT_AI_BATCH_TIMEOUT", "600"))
 
 # Database
 DATABASE_PATH = BASE_DIR / os.environ.get("DATABASE_FILE", "market_dashboard.db")
+# Persistent Claude market-analysis cache (survives restarts)
+ANALYSIS_CACHE_PATH = BASE_DIR / os.environ.get("ANALYSIS_CACHE_FILE", "analysis_cache.db")
+# FRED observations are kept in the same file; seconds before refetching a series (0 disables). Default 6 hours.
+FRED_CACHE_TTL = int(os.environ.get("FRED_CACHE_TTL", "21600"))
 
 # API keys (loaded from .env; never log or expose)
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
@@ -31,6 +53,6 @@ RENTCAST_API_KEY = os.environ.get("RENTCAST_API_KEY", "")
 # Portal (API) listings: minimize API calls
 # Default cache TTL: 7 days so we rarely refetch (50 calls/month budget)
 PORTAL_CACHE_TTL = int(os.environ.get("PORTAL_CACHE_TTL", "604800"))
-PORTAL_MIN_REQUEST_INTERVAL = int(os.environ.get("PORTAL_MIN_REQUEST_INTERVAL", "120"))
+PORTAL_MIN_REQUEST_INTERVAL = int(os.environ.get("PORTAL_MIN_REQUEST_INTERVAL", "5"))
 # Optional: file path for persistent cache (survives restarts; avoids burning calls on deploy)
 PORTAL_CACHE_FILE = os.environ.get("PORTAL_CACHE_FILE", "")
@@ -5,19 +5,48 @@ Scrapes sfbay.craigslist.org/sfc/apa with price filter; parses JSON-LD and HTML
 Set SCRAPER_DEBUG=1 for verbose logs and /tmp HTML dump. Set ANTHROPIC_API_KEY for AI summaries.
 """
 
+import functools
+import heapq
 import json
 import logging
 import os
 import re
+import sqlite3
+import sys
 import threading
 import time
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from types import MappingProxyType
 from typing import Any, Optional
+from urllib.parse import parse_qs, unquote, urlparse
 
+import numpy as np
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 from dotenv import load_dotenv
 
+from database import open_cache_table
+from http_client import HTTP
+
+try:
+    import lxml.html  # optional: C parser + XPath, several times faster than html.parser
+    from lxml import etree
+    HTML_PARSER = "lxml"
+except ImportError:
+    lxml = None
+    HTML_PARSER = "html.parser"
+try:
+    import orjson  # optional: parses the JSON-LD / JSON API bytes directly, faster than json
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+try:
+    from numba import njit  # optional: compiles the apartment scoring loop
+except ImportError:
+    njit = None
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -28,10 +57,28 @@ MAX_PRICE = 5000
 
 # Request timeout and optional debug (dump HTML to /tmp)
 try:
-    from config import REQUEST_TIMEOUT, SCRAPER_DEBUG
+    from config import REQUEST_TIMEOUT, SCRAPER_DEBUG, SCRAPER_HTTP_CACHE_TTL
 except ImportError:
     REQUEST_TIMEOUT = int(os.environ.get("SCRAPER_TIMEOUT", "15"))
     SCRAPER_DEBUG = os.environ.get("SCRAPER_DEBUG", "").strip().lower() in ("1", "true", "yes")
+    SCRAPER_HTTP_CACHE_TTL = int(os.environ.get("SCRAPER_HTTP_CACHE_TTL", "300"))
+
+# Craigslist session. With SCRAPER_DEBUG (and requests-cache installed) repeat runs of the debug helpers
+# and scrapers read pages from a short-lived disk cache; production always goes to the network, since
+# the app caches results itself and refresh endpoints must see fresh pages.
+CL_HTTP = HTTP
+if SCRAPER_DEBUG and SCRAPER_HTTP_CACHE_TTL > 0:
+    try:
+        import requests_cache
+
+        CL_HTTP = requests_cache.CachedSession(
+            "/tmp/craigslist_http_cache", expire_after=SCRAPER_HTTP_CACHE_TTL, allowable_codes=(200,)
+        )
+        CL_HTTP.headers.update(HTTP.headers)
+        for prefix, adapter in HTTP.adapters.items():  # same keep-alive pools and retry policy as production
+            CL_HTTP.mount(prefix, adapter)
+    except ImportError:
+        pass
 
 CL_LISTING_BASE = "https://sfbay.craigslist.org"
 CL_SEARCH_URL = f"{CL_LISTING_BASE}/search/sfc/apa"
@@ -49,11 +96,77 @@ STANFORD_ALLOWED_NEIGHBORHOODS = frozenset([
     "redwood shores", "woodside", "atherton", "portola valley", "los altos", "los altos hills",
 ])
 
+# Regexes used per listing / per page, compiled once
+_AREA_RE = re.compile(r"/search/([a-z]+)/apa")
+_HOOD_CLEAN_RE = re.compile(r"[^\w\s/-]")
+_DOLLAR_RE = re.compile(r"\$\s*([\d,]+)")
+_DOLLAR_OPT_RE = re.compile(r"\$?([\d,]+)")
+_RENT_AMOUNT_RE = re.compile(r"\$\s*([\d,]{4,6})(?!\d)")
+_NON_DIGIT_RE = re.compile(r"[^\d]")
+_PRICE_PUNCT = str.maketrans("", "", "$,. \t")  # the usual "$3,200" noise; anything else takes _NON_DIGIT_RE
+_LEADING_NON_DIGITS_RE = re.compile(r"^([^0-9]+)")
+_BR_HINT_RE = re.compile(r"\d\s*br|\d\s*bed|studio", re.I)
+_PRICE_CLS_RE = re.compile(r"result-price|priceinfo|price", re.I)
+_HOOD_CLS_RE = re.compile(r"hood|supertitle|meta|location", re.I)
+_NEIGHBORHOOD_CLS_RE = re.compile(r"hood|neighborhood|location", re.I)
+_HOUSING_CLS_RE = re.compile(r"housing|attr|posting-details|postingbody", re.I)
+_STUDIO_RE = re.compile(r"\bstudio\b")
+_ZERO_BR_RE = re.compile(r"\b0\s*br\b")
+_BEDROOMS_RE = re.compile(r"(?:^|[\s/\-])(\d+)\s*[-]?\s*(?:br|bed|bedroom|bd)s?\b", re.IGNORECASE)
+_COMPACT_BR_RE = re.compile(r"\b([1-6])br\b")
+_BATHROOMS_RE = re.compile(r"([\d.]+)\s*(?:ba|bath|bathroom)s?")
+_SQFT_RE = re.compile(r"(\d+)\s*(?:sqft|sq\.?\s*ft\.?|sf|ft²)")
+_LAUNDRY_IN_UNIT_RE = re.compile(
+    r"in[- ]?unit\s*(?:w/?d|washer|laundry)|w/?d\s*in\s*unit|washer\s*(?:&|and)\s*dryer\s*in\s*unit|in-unit\s*laundry"
+)
+_LAUNDRY_IN_BUILDING_RE = re.compile(
+    r"laundry\s*(?:in\s*building|on[- ]?site|in\s*building)|in\s*building\s*laundry|on[- ]?site\s*laundry|shared\s*laundry|laundry\s*on\s*site"
+)
+_LAUNDRY_ANY_RE = re.compile(r"washer|dryer|w/d|w&d|laundry")
+_PARKING_RE = re.compile(r"parking|garage|car\s*space|pkg\s*(?:incl|avail)|parking\s*(?:incl|avail|included)")
+_SCORE_RE = re.compile(r"SCORE:\s*(\d+)")
+_ANALYSIS_RE = re.compile(r"ANALYSIS:\s*(.+)", re.DOTALL)
+
+
+# Stanford-area matching: "an allowed name occurs in the neighborhood" is one alternation scan;
+# "the neighborhood is part of an allowed name" is one substring test against all names joined by
+# a separator that _HOOD_CLEAN_RE always strips (so it can never match across two names).
+_STANFORD_RE = re.compile("|".join(re.escape(x) for x in sorted(STANFORD_ALLOWED_NEIGHBORHOODS, key=len, reverse=True)))
+_STANFORD_JOINED = "|".join(sorted(STANFORD_ALLOWED_NEIGHBORHOODS))
+
+
+@functools.lru_cache(maxsize=8)
+def _listing_href_re(area: str) -> "re.Pattern":
+    """Listing page link for one area, e.g. /sfc/apa/d/<slug>/<id>.html."""
+    return re.compile(r"/" + re.escape(area) + r"/apa/(?:d/)?[^/]+/\d+\.html")
+
+
+def _is_listing_href(href: str, area: str) -> bool:
+    """_listing_href_re(area).search(href), with the usual /<area>/apa/[d/]<slug>/<id>.html path checked by string ops."""
+    path = href.partition("?")[0]
+    needle = f"/{area}/apa/"
+    i = path.find(needle)
+    if i == -1 and needle not in href:
+        return False
+    if i != -1:
+        slug, _, tail = path[i + len(needle):].rpartition("/")
+        if slug.startswith("d/"):
+            slug = slug[2:]
+        if slug and "/" not in slug and tail.endswith(".html") and tail[:-5].isdecimal():
+            return True
+    return bool(_listing_href_re(area).search(href))  # unusual shape: let the regex decide
+
+
+@functools.lru_cache(maxsize=8)
+def _detail_href_re(area: str) -> "re.Pattern":
+    return re.compile(r"/" + re.escape(area) + r"/apa/.+\d+\.html")
+
+
+_CL_BASE_SLASH = CL_LISTING_BASE + "/"
+
 
 def _normalize_listing_url(url: Optional[str]) -> str:
     """Ensure listing URL is a direct sfbay.craigslist.org listing link (no redirects)."""
-    from urllib.parse import urlparse, parse_qs, unquote
-
     if not url or not isinstance(url, str):
         return ""
     url = url.strip()
@@ -74,6 +187,13 @@ def _normalize_listing_url(url: Optional[str]) -> str:
                     return _normalize_listing_url(target)
         except Exception:
             pass
+    # Common case: already a direct sfbay link. Same result as the urlparse branch below, without the parse
+    if url.startswith(_CL_BASE_SLASH):
+        path = url[len(CL_LISTING_BASE):].partition("#")[0].partition("?")[0]
+        if ";" not in path and not path[-1].isspace():  # ;params / trailing space: leave to urlparse
+            if "/apa/" in path and (".html" in path or "/d/" in path):
+                return CL_LISTING_BASE + path
+            return url.split("?")[0].split("#")[0] if "/apa/" in url else ""
     # Relative path -> direct sfbay link
     if url.startswith("/"):
         path = url.split("?")[0]
@@ -99,12 +219,39 @@ def _normalize_listing_url(url: Optional[str]) -> str:
         return url.split("?")[0].split("#")[0] if "/apa/" in url else ""
     return ""
 
-# Claude client (optional; falls back to score-only when missing)
-try:
-    from anthropic import Anthropic
-    _anthropic = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY")) if os.getenv("ANTHROPIC_API_KEY") else None
-except Exception:
-    _anthropic = None
+# Claude client (optional; falls back to score-only when missing). The SDK is imported on first use,
+# so importing the scraper without ANTHROPIC_API_KEY never loads it.
+_anthropic = None
+_anthropic_loaded = False
+_anthropic_lock = threading.Lock()
+
+
+def _get_anthropic():
+    """Shared Anthropic client, or None when the key or the package is missing."""
+    global _anthropic, _anthropic_loaded
+    if _anthropic_loaded:
+        return _anthropic
+    with _anthropic_lock:
+        if not _anthropic_loaded:
+            api_key = os.getenv("ANTHROPIC_API_KEY")
+            if api_key:
+                try:
+                    from anthropic import Anthropic
+                    _anthropic = Anthropic(api_key=api_key)
+                except Exception:
+                    _anthropic = None
+            _anthropic_loaded = True
+    return _anthropic
+
+
+def _dump_debug_html(path: str, content: bytes) -> bool:
+    """Write the raw response bytes as received (no decode/re-encode). False if the write failed."""
+    try:
+        with open(path, "wb") as f:
+            f.write(content)
+        return True
+    except OSError:
+        return False
 
 
 def inspect_craigslist_structure():
@@ -113,21 +260,13 @@ def inspect_craigslist_structure():
     Finds and prints all price-related elements to determine correct selectors.
     """
     url = f"{CL_SEARCH_URL}?min_price={MIN_PRICE}&max_price={MAX_PRICE}&availabilityMode=0"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    }
     try:
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        response = CL_HTTP.get(url, timeout=REQUEST_TIMEOUT)
         print(f"Status Code: {response.status_code}")
         print(f"Response Length: {len(response.text)} characters")
-        if SCRAPER_DEBUG:
-            try:
-                with open("/tmp/craigslist_full.html", "w", encoding="utf-8") as f:
-                    f.write(response.text)
-                print("\nSaved full HTML to: /tmp/craigslist_full.html")
-            except OSError:
-                pass
-        soup = BeautifulSoup(response.text, "html.parser")
+        if SCRAPER_DEBUG and _dump_debug_html("/tmp/craigslist_full.html", response.content):
+            print("\nSaved full HTML to: /tmp/craigslist_full.html")
+        soup = BeautifulSoup(response.text, HTML_PARSER)
         print("\n" + "=" * 60)
         print("SEARCHING FOR PRICE ELEMENTS")
         print("=" * 60)
@@ -138,18 +277,22 @@ def inspect_craigslist_structure():
             if elements:
                 print(f"  First example text: {elements[0].get_text().strip()[:50]}")
                 print(f"  First example HTML: {str(elements[0])[:150]}")
-        all_spans = soup.find_all("span")
-        price_spans = [s for s in all_spans if "$" in (s.get_text() or "")]
+        # One walk over spans and divs, partitioned by tag (text bound once per element)
+        price_spans, price_divs = [], []
+        for el in soup.find_all(["span", "div"]):
+            text = el.get_text() or ""
+            if "$" not in text:
+                continue
+            if el.name == "span":
+                price_spans.append((el, text))
+            elif len(text) < 30:
+                price_divs.append((el, text))
         print(f"\n<span> elements with '$': {len(price_spans)} found")
-        if price_spans:
-            for span in price_spans[:3]:
-                print(f"    - Class: {span.get('class')} | Text: {span.get_text().strip()}")
-        all_divs = soup.find_all("div")
-        price_divs = [d for d in all_divs if "$" in (d.get_text() or "") and len(d.get_text() or "") < 30]
+        for span, text in price_spans[:3]:
+            print(f"    - Class: {span.get('class')} | Text: {text.strip()}")
         print(f"\n<div> elements with '$' (short text): {len(price_divs)} found")
-        if price_divs:
-            for div in price_divs[:3]:
-                print(f"    - Class: {div.get('class')} | Text: {(div.get_text() or '').strip()}")
+        for div, text in price_divs[:3]:
+            print(f"    - Class: {div.get('class')} | Text: {text.strip()}")
         print("\n" + "=" * 60)
         print("SEARCHING FOR LISTING CONTAINERS")
         print("=" * 60)
@@ -187,9 +330,8 @@ def debug_first_listing():
     Shows exactly what elements exist and which extraction method works.
     """
     url = f"{CL_SEARCH_URL}?min_price={MIN_PRICE}&max_price={MAX_PRICE}&availabilityMode=0"
-    headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"}
-    response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-    soup = BeautifulSoup(response.text, "html.parser")
+    response = CL_HTTP.get(url, timeout=REQUEST_TIMEOUT)
+    soup = BeautifulSoup(response.text, HTML_PARSER)
     listing = (
         soup.find("li", class_="result-row")
         or soup.find("li", class_="cl-search-result")
@@ -230,10 +372,11 @@ def debug_first_listing():
         print(f"Text: {elem.get_text()}")
     print("\n--- Strategy 6: data-price attribute ---")
     print(f"data-price attribute: {listing.get('data-price')}")
+    listing_text = listing.get_text() or ""
     print("\n--- Strategy 7: All text content (first 300 chars) ---")
-    print((listing.get_text() or "")[:300])
+    print(listing_text[:300])
     print("\n--- Strategy 8: All dollar amounts in text ---")
-    dollar_amounts = re.findall(r"\$\s*([\d,]+)", listing.get_text() or "")
+    dollar_amounts = _DOLLAR_RE.findall(listing_text)
     print(f"Found dollar amounts: {dollar_amounts}")
     print("\n" + "=" * 60)
     print("FULL LISTING HTML")
@@ -243,20 +386,52 @@ def debug_first_listing():
 
 def _area_from_search_url(search_url: str) -> str:
     """Extract area code from search URL e.g. .../search/pen/apa -> pen."""
-    m = re.search(r"/search/([a-z]+)/apa", search_url or "")
+    m = _AREA_RE.search(search_url or "")
     return m.group(1) if m else "sfc"
 
 
-def scrape_sf_apartments(max_listings: int = 50) -> list[dict[str, Any]]:
-    """Fetch SF apartments in price range. Tries JSON API, then HTML; returns sample on failure."""
-    apartments = scrape_via_json_api()
+# JSON API first, HTML as fallback. HTML only starts once the JSON API has failed, come back empty,
+# or run past JSON_HEAD_START seconds, so a normal scrape sends one request to Craigslist.
+_scrape_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cl-scrape")
+JSON_HEAD_START = 2.0
+
+
+def _run_strategy(call, source: str) -> list[dict[str, Any]]:
+    try:
+        return call() or []
+    except Exception as e:
+        logger.debug("%s scrape error: %s", source, e)
+        return []
+
+
+def _scrape_json_then_html(json_call, html_call) -> tuple[list[dict[str, Any]], str]:
+    """
+    Returns (apartments, source): JSON API listings when it finds any, else the HTML result (possibly empty).
+    A slow JSON API gets the HTML scrape started alongside it, but its result still wins when non-empty;
+    the HTML job is then cancelled, or told via html_call(stop) to stop at its next checkpoint.
+    """
+    stop = threading.Event()
+    json_future = _scrape_pool.submit(_run_strategy, json_call, "JSON API")
+    try:
+        apartments = json_future.result(timeout=JSON_HEAD_START)
+        if apartments:
+            return apartments, "JSON API"
+        return _run_strategy(lambda: html_call(stop), "HTML"), "HTML"
+    except FuturesTimeout:
+        html_future = _scrape_pool.submit(_run_strategy, lambda: html_call(stop), "HTML")
+    apartments = json_future.result()  # bounded by REQUEST_TIMEOUT
     if apartments:
-        logger.info("Scraped %s listings via JSON API", len(apartments))
-        return apartments[:max_listings]
+        stop.set()
+        html_future.cancel()  # frees the pool slot if it hasn't started yet
+        return apartments, "JSON API"
+    return html_future.result(), "HTML"
+
 
-    apartments = scrape_via_html(max_listings)
+def scrape_sf_apartments(max_listings: int = 50) -> list[dict[str, Any]]:
+    """Fetch SF apartments in price range. Tries JSON API, then HTML; returns sample on failure."""
+    apartments, source = _scrape_json_then_html(scrape_via_json_api, lambda stop: scrape_via_html(max_listings, stop=stop))
     if apartments:
-        logger.info("Scraped %s listings via HTML", len(apartments))
+        logger.info("Scraped %s listings via %s", len(apartments), source)
         return apartments[:max_listings]
 
     logger.warning("Scrape failed; returning sample data")
@@ -267,32 +442,37 @@ def _is_stanford_area_neighborhood(neighborhood: Optional[str]) -> bool:
     """True if the listing is in an allowed city/area near Stanford (school/hospital)."""
     if not neighborhood or not isinstance(neighborhood, str):
         return False
+    return _stanford_hood_match(neighborhood)
+
+
+@functools.lru_cache(maxsize=1024)
+def _stanford_hood_match(neighborhood: str) -> bool:
+    """Cached by raw string: a search page repeats the same few neighborhood labels."""
     n = neighborhood.lower().strip()
     if not n:
         return False
-    n_clean = re.sub(r"[^\w\s/-]", "", n).strip()
-    for allowed in STANFORD_ALLOWED_NEIGHBORHOODS:
-        if allowed in n_clean or n_clean in allowed:
-            return True
-    if any(term in n for term in ("palo alto", "menlo park", "east palo alto", "stanford", "redwood city", "mountain view", "redwood shores", "los altos", "woodside", "atherton", "portola valley")):
+    if n in STANFORD_ALLOWED_NEIGHBORHOODS:
         return True
-    return False
+    n_clean = _HOOD_CLEAN_RE.sub("", n).strip()
+    # The old core-city list is a subset of the allowed names, and cleaning never splits a match
+    return bool(_STANFORD_RE.search(n_clean)) or n_clean in _STANFORD_JOINED
 
 
 def scrape_stanford_apartments(max_listings: int = 50) -> list[dict[str, Any]]:
     """Fetch peninsula apartments near Stanford (Palo Alto, Menlo Park, etc.). Filter to allowed areas only."""
-    apartments = scrape_via_json_api(CL_SEARCH_URL_PEN, STANFORD_MIN_PRICE, STANFORD_MAX_PRICE)
-    if apartments:
-        apartments = [a for a in apartments if _is_stanford_area_neighborhood(a.get("neighborhood"))]
-        logger.info("Scraped %s Stanford-area listings via JSON API (after neighborhood filter)", len(apartments))
-        return apartments[:max_listings]
-
-    apartments = scrape_via_html(
-        max_listings * 2, search_url=CL_SEARCH_URL_PEN, min_price=STANFORD_MIN_PRICE, max_price=STANFORD_MAX_PRICE
+    apartments, source = _scrape_json_then_html(
+        lambda: scrape_via_json_api(CL_SEARCH_URL_PEN, STANFORD_MIN_PRICE, STANFORD_MAX_PRICE),
+        lambda stop: scrape_via_html(
+            max_listings * 2,
+            search_url=CL_SEARCH_URL_PEN,
+            min_price=STANFORD_MIN_PRICE,
+            max_price=STANFORD_MAX_PRICE,
+            stop=stop,
+        ),
     )
     if apartments:
         apartments = [a for a in apartments if _is_stanford_area_neighborhood(a.get("neighborhood"))]
-        logger.info("Scraped %s Stanford-area listings via HTML (after neighborhood filter)", len(apartments))
+        logger.info("Scraped %s Stanford-area listings via %s (after neighborhood filter)", len(apartments), source)
         return apartments[:max_listings]
 
     logger.warning("Stanford area scrape failed; returning sample data")
@@ -311,16 +491,12 @@ def scrape_via_json_api(
     apartments = []
     try:
         json_url = f"{search_url}?format=json&min_price={min_price}&max_price={max_price}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-            "Accept": "application/json",
-        }
-        response = requests.get(json_url, headers=headers, timeout=REQUEST_TIMEOUT)
+        response = CL_HTTP.get(json_url, headers={"Accept": "application/json"}, timeout=REQUEST_TIMEOUT)
         logger.debug("JSON API status=%s", response.status_code)
         if response.status_code != 200:
             return []
         try:
-            data = response.json()
+            data = _json_loads(response.content)
             items = []
             if isinstance(data, dict):
                 items = data.get("data", {}).get("items", []) or data.get("items", [])
@@ -337,6 +513,7 @@ def scrape_via_json_api(
                         continue
                     headline = item.get("headline", item.get("title", "Apartment"))
                     default_hood = "San Francisco" if "sfc" in search_url else "Palo Alto"
+                    laundry_type, parking = extract_amenities(str(headline))
                     apartments.append({
                         "title": headline,
                         "url": _normalize_listing_url(item.get("url", "")),
@@ -351,8 +528,8 @@ def scrape_via_json_api(
                         "deal_score": None,
                         "deal_analysis": None,
                         "discount_pct": None,
-                        "laundry_type": extract_laundry(str(headline)),
-                        "parking": extract_parking(str(headline)),
+                        "laundry_type": laundry_type,
+                        "parking": parking,
                         "thumbnail_url": None,
                         "latitude": None,
                         "longitude": None,
@@ -383,16 +560,44 @@ def _normalize_image_from_schema(image_field):
     return None
 
 
+def _ldjson_neighborhood(addr) -> str:
+    """Neighborhood label from a schema.org address (PostalAddress dict or plain string); never empty."""
+    hood = addr
+    for _ in range(2):  # address, then a nested addressLocality object
+        if not isinstance(hood, dict):
+            break
+        hood = hood.get("addressLocality") or hood.get("name")
+    return sys.intern(hood) if isinstance(hood, str) and hood else "San Francisco"
+
+
+def _opt_float(value) -> Optional[float]:
+    """float(value), or None when missing or not numeric."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _thumbnail_from_data_ids(raw: str) -> Optional[str]:
+    """Craigslist data-ids e.g. "3:123,3:456" -> https://images.craigslist.org/123_300x300.jpg; None if the first id isn't numeric."""
+    rest = raw
+    while rest:
+        part, _, rest = rest.partition(",")
+        part = part.strip()
+        if part:
+            first = part.replace("3:", "").strip()
+            return f"https://images.craigslist.org/{first}_300x300.jpg" if first.isdigit() else None
+    return None
+
+
 def _extract_thumbnail_from_listing(listing):
     """Extract first thumbnail URL from a listing element (data-ids or img src)."""
-    # Craigslist: data-ids on anchor e.g. "3:123,3:456" -> https://images.craigslist.org/123_300x300.jpg
     for tag in listing.find_all(["a", "span", "div"], attrs={"data-ids": True}):
-        raw = tag.get("data-ids", "")
-        if not raw:
-            continue
-        ids = [p.strip().replace("3:", "").strip() for p in raw.split(",") if p.strip()]
-        if ids and ids[0].isdigit():
-            return f"https://images.craigslist.org/{ids[0]}_300x300.jpg"
+        url = _thumbnail_from_data_ids(tag.get("data-ids") or "")
+        if url:
+            return url
     for img in listing.find_all("img", src=True):
         src = (img.get("src") or "").strip()
         if "craigslist.org" in src or "images.craigslist" in src:
@@ -400,20 +605,55 @@ def _extract_thumbnail_from_listing(listing):
     return None
 
 
-def scrape_via_ldjson(html_text, min_price: Optional[int] = None, max_price: Optional[int] = None):
+_LDJSON_MARKER = b'id="ld_searchpage_results"'
+_SCRIPT_END = b"</script>"
+STREAM_CHUNK = 16384
+
+
+def _read_until_ldjson(chunks, buf: bytearray) -> Optional[bytes]:
+    """
+    Append response chunks to buf until script#ld_searchpage_results has closed; return the script body.
+    None if the page ended without it (buf then holds the whole page).
+    """
+    scan_from = 0
+    for chunk in chunks:
+        buf += chunk
+        start = buf.find(_LDJSON_MARKER, scan_from)
+        if start == -1:
+            scan_from = max(0, len(buf) - len(_LDJSON_MARKER))
+            continue
+        gt = buf.find(b">", start)
+        end = buf.find(_SCRIPT_END, gt) if gt != -1 else -1
+        if end != -1:
+            return bytes(buf[gt + 1:end])
+        scan_from = start
+    return None
+
+
+def scrape_via_ldjson(
+    html_text, min_price: Optional[int] = None, max_price: Optional[int] = None, doc=None, script_text=None
+):
     """
     Parse Craigslist JSON-LD from script#ld_searchpage_results.
     Returns list of apartment dicts in price range, or [] if not found/invalid.
+    doc: optional lxml tree of html_text, so the caller's parse is reused.
+    script_text: the script body (str or bytes) when the caller already cut it out of the page.
     """
     min_price = min_price if min_price is not None else MIN_PRICE
     max_price = max_price if max_price is not None else MAX_PRICE
     apartments = []
     try:
-        soup = BeautifulSoup(html_text, "html.parser")
-        script = soup.find("script", type="application/ld+json", id="ld_searchpage_results")
-        if not script or not script.string:
+        if script_text is None and lxml is not None:
+            if doc is None:
+                doc = lxml.html.fromstring(html_text)
+            script_text = "".join(_LDJSON_XPATH(doc))
+        elif script_text is None:
+            script = BeautifulSoup(html_text, HTML_PARSER).find("script", type="application/ld+json", id="ld_searchpage_results")
+            script_text = script.string if script else None
+        if not script_text or not script_text.strip():
             return []
-        data = json.loads(script.string.strip())
+        raw = script_text if isinstance(script_text, bytes) else script_text.encode("utf-8")
+        data = _json_loads(raw.strip())
         items = data.get("itemListElement") or data.get("itemListElements") or []
         if not isinstance(items, list):
             return []
@@ -443,7 +683,10 @@ def scrape_via_ldjson(html_text, min_price: Optional[int] = None, max_price: Opt
                 if price is not None:
                     try:
                         if isinstance(price, str):
-                            price = int(re.sub(r"[^\d]", "", price)) if re.search(r"\d", price) else None
+                            digits = price.translate(_PRICE_PUNCT)
+                            if not digits.isdecimal():
+                                digits = _NON_DIGIT_RE.sub("", price)
+                            price = int(digits) if digits else None
                         else:
                             price = int(float(price))
                     except (TypeError, ValueError):
@@ -452,7 +695,10 @@ def scrape_via_ldjson(html_text, min_price: Optional[int] = None, max_price: Opt
                     price = extract_price_from_text(name)
                 if not price or not (min_price <= price <= max_price):
                     continue
-                bedrooms = item.get("numberOfRooms")
+                # schema.org Accommodation: numberOfBedrooms is the bedroom count; numberOfRooms is the older field
+                bedrooms = item.get("numberOfBedrooms")
+                if bedrooms is None:
+                    bedrooms = item.get("numberOfRooms")
                 if bedrooms is not None:
                     try:
                         bedrooms = int(float(bedrooms))
@@ -479,26 +725,15 @@ def scrape_via_ldjson(html_text, min_price: Optional[int] = None, max_price: Opt
                             sqft = extract_sqft(name)
                 else:
                     sqft = extract_sqft(name)
-                price_per_sqft = round(price / sqft, 2) if price and sqft else None
-                price_per_bedroom = round(price / bedrooms, 2) if price and bedrooms and bedrooms > 0 else None
-                addr = item.get("address")
-                if isinstance(addr, dict):
-                    neighborhood = addr.get("addressLocality") or addr.get("name") or "San Francisco"
-                else:
-                    neighborhood = addr if isinstance(addr, str) else "San Francisco"
+                price_per_sqft, price_per_bedroom = unit_rates(price, sqft, bedrooms)
+                neighborhood = _ldjson_neighborhood(item.get("address"))
                 thumbnail_url = _normalize_image_from_schema(item.get("image"))
-                lat = item.get("latitude")
-                lon = item.get("longitude")
-                if lat is not None:
-                    try:
-                        lat = float(lat)
-                    except (TypeError, ValueError):
-                        lat = None
-                if lon is not None:
-                    try:
-                        lon = float(lon)
-                    except (TypeError, ValueError):
-                        lon = None
+                lat, lon = item.get("latitude"), item.get("longitude")
+                geo = item.get("geo")
+                if lat is None and lon is None and isinstance(geo, dict):  # schema.org GeoCoordinates
+                    lat, lon = geo.get("latitude"), geo.get("longitude")
+                lat, lon = _opt_float(lat), _opt_float(lon)
+                laundry_type, parking = extract_amenities(name)
                 apartments.append({
                     "title": name,
                     "url": url,
@@ -513,8 +748,8 @@ def scrape_via_ldjson(html_text, min_price: Optional[int] = None, max_price: Opt
                     "deal_score": None,
                     "deal_analysis": None,
                     "discount_pct": None,
-                    "laundry_type": extract_laundry(name),
-                    "parking": extract_parking(name),
+                    "laundry_type": laundry_type,
+                    "parking": parking,
                     "thumbnail_url": thumbnail_url,
                     "latitude": lat,
                     "longitude": lon,
@@ -522,11 +757,6 @@ def scrape_via_ldjson(html_text, min_price: Optional[int] = None, max_price: Opt
             except Exception as e:
                 logger.debug("JSON-LD item parse: %s", e)
                 continue
-        for apt in apartments:
-            if isinstance(apt.get("neighborhood"), dict):
-                apt["neighborhood"] = apt["neighborhood"].get("addressLocality") or apt["neighborhood"].get("name") or "San Francisco"
-            elif not apt.get("neighborhood"):
-                apt["neighborhood"] = "San Francisco"
         logger.debug("JSON-LD parsed %s in range", len(apartments))
     except json.JSONDecodeError as e:
         logger.warning("JSON-LD decode error: %s", e)
@@ -540,37 +770,67 @@ def scrape_via_html(
     search_url: Optional[str] = None,
     min_price: Optional[int] = None,
     max_price: Optional[int] = None,
+    stop: Optional[threading.Event] = None,
 ) -> list[dict[str, Any]]:
-    """Scrape Craigslist HTML search page; try JSON-LD first, then list/link parsing."""
+    """
+    Scrape Craigslist HTML search page; try JSON-LD first, then list/link parsing.
+    stop: when set (another strategy already won), returns [] at the next checkpoint instead of finishing.
+    """
     search_url = search_url or CL_SEARCH_URL
     min_price = min_price if min_price is not None else MIN_PRICE
     max_price = max_price if max_price is not None else MAX_PRICE
     area = _area_from_search_url(search_url)
     apartments = []
     base_url = f"{search_url}?min_price={min_price}&max_price={max_price}&availabilityMode=0"
+    stopped = stop.is_set if stop is not None else (lambda: False)
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        }
-        response = requests.get(base_url, headers=headers, timeout=REQUEST_TIMEOUT)
-        if SCRAPER_DEBUG:
-            try:
-                with open("/tmp/craigslist_debug.html", "w") as f:
-                    f.write(response.text)
-                logger.debug("Wrote /tmp/craigslist_debug.html")
-            except OSError:
-                pass
+        if stopped():
+            return []
+        # Streamed: the JSON-LD script sits in <head>, so a full result set can return before the body arrives
+        response = CL_HTTP.get(base_url, stream=True, timeout=REQUEST_TIMEOUT)
+        if SCRAPER_DEBUG and not response.ok and _dump_debug_html("/tmp/craigslist_debug.html", response.content):
+            logger.debug("Wrote /tmp/craigslist_debug.html (HTTP %s)", response.status_code)
         response.raise_for_status()
+        if stopped():
+            response.close()
+            return []
 
-        apartments = scrape_via_ldjson(response.text, min_price=min_price, max_price=max_price)
-        if len(apartments) >= 20:
-            return apartments[:max_listings]
+        chunks = response.iter_content(chunk_size=STREAM_CHUNK)
+        buf = bytearray()
+        ld_script = _read_until_ldjson(chunks, buf)
+        if ld_script is not None:
+            apartments = scrape_via_ldjson(None, min_price=min_price, max_price=max_price, script_text=ld_script)
+            if len(apartments) >= 20:
+                response.close()
+                # Debug dump holds only the bytes read before the early stop
+                if SCRAPER_DEBUG and _dump_debug_html("/tmp/craigslist_debug.html", buf):
+                    logger.debug("Wrote /tmp/craigslist_debug.html (%s bytes, stopped after JSON-LD)", len(buf))
+                return apartments[:max_listings]
+            if stopped():
+                response.close()
+                return []
+            buf += b"".join(chunks)  # rest of the page for the row parsers
+        if SCRAPER_DEBUG and _dump_debug_html("/tmp/craigslist_debug.html", buf):
+            logger.debug("Wrote /tmp/craigslist_debug.html")
+        if stopped():
+            return []
+        page_text = bytes(buf).decode(response.encoding or "utf-8", errors="replace")
+        doc = lxml.html.fromstring(page_text) if lxml is not None else None
+        if ld_script is None:  # marker not seen verbatim (e.g. different quoting); parse the script from the DOM
+            apartments = scrape_via_ldjson(page_text, min_price=min_price, max_price=max_price, doc=doc)
+            if len(apartments) >= 20:
+                return apartments[:max_listings]
         if apartments:
             logger.debug("JSON-LD returned %s; trying HTML parsing", len(apartments))
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        all_links = soup.find_all("a", href=True)
-        listing_links = [a for a in all_links if f"/{area}/apa/" in a.get("href", "") or "/apa/" in a.get("href", "")]
+        if doc is not None:
+            fast = _parse_rows_lxml(doc, area, max_listings, min_price, max_price)
+            if fast:
+                logger.debug("lxml rows parsed %s in range", len(fast))
+                apartments.extend(fast)
+                return apartments
+
+        soup = BeautifulSoup(page_text, HTML_PARSER)
 
         listings = (
             soup.find_all("li", class_="cl-search-result")
@@ -588,22 +848,23 @@ def scrape_via_html(
             apt_links = soup.select(f'a[href*="/{area}/apa/"]')
             # Dedupe by href; prefer the title link (titlestring/result-title) or the one with most text
             href_to_best_link = {}
+            best_text_len = {}  # h_norm -> stripped text length of the chosen anchor
             for a in apt_links:
                 h = a.get("href", "")
-                if not h or not re.search(r"/" + re.escape(area) + r"/apa/(?:d/)?[^/]+/\d+\.html", h):
+                if not h or not _is_listing_href(h, area):
                     continue
-                h_norm = h.split("?")[0]
+                h_norm = h.partition("?")[0]
                 current = href_to_best_link.get(h_norm)
                 a_cls = (a.get("class") or []) if isinstance(a.get("class"), list) else []
                 a_text_len = len((a.get_text() or "").strip())
                 if not current:
-                    href_to_best_link[h_norm] = a
+                    href_to_best_link[h_norm], best_text_len[h_norm] = a, a_text_len
                 else:
                     cur_cls = (current.get("class") or []) if isinstance(current.get("class"), list) else []
                     if "titlestring" in a_cls or "result-title" in a_cls or "cl-app-anchor" in a_cls:
-                        href_to_best_link[h_norm] = a
-                    elif ("titlestring" not in cur_cls and "result-title" not in cur_cls) and a_text_len > len((current.get_text() or "").strip()):
-                        href_to_best_link[h_norm] = a
+                        href_to_best_link[h_norm], best_text_len[h_norm] = a, a_text_len
+                    elif ("titlestring" not in cur_cls and "result-title" not in cur_cls) and a_text_len > best_text_len[h_norm]:
+                        href_to_best_link[h_norm], best_text_len[h_norm] = a, a_text_len
             unique_links = list(href_to_best_link.values())
             logger.debug("Unique listing links=%s", len(unique_links))
             if unique_links:
@@ -618,19 +879,19 @@ def scrape_via_html(
                         row = _listing_row_ancestor(link)
                         parent = row if row else link.parent
                         combined_text = (parent.get_text() if parent else "") or raw_title
-                        if parent and parent.parent and not re.search(r"\d\s*br|\d\s*bed|studio", combined_text, re.I):
+                        if parent and parent.parent and not _BR_HINT_RE.search(combined_text):
                             combined_text = (parent.parent.get_text() or "") + " " + combined_text
                         price = extract_price_from_text(combined_text) or extract_price_from_text(raw_title)
                         if not price and parent:
-                            price_elem = parent.find(class_=re.compile(r"result-price|priceinfo|price", re.I))
+                            price_elem = parent.find(class_=_PRICE_CLS_RE)
                             if price_elem:
-                                m = re.search(r"\$?([\d,]+)", (price_elem.get_text() or ""))
+                                m = _DOLLAR_OPT_RE.search(price_elem.get_text() or "")
                                 if m:
                                     price = int(m.group(1).replace(",", ""))
                         if not price and link.parent:
-                            price_elem = link.parent.find(class_=re.compile(r"result-price|priceinfo|price", re.I))
+                            price_elem = link.parent.find(class_=_PRICE_CLS_RE)
                             if price_elem:
-                                m = re.search(r"\$?([\d,]+)", (price_elem.get_text() or ""))
+                                m = _DOLLAR_OPT_RE.search(price_elem.get_text() or "")
                                 if m:
                                     price = int(m.group(1).replace(",", ""))
                         if not price or not (min_price <= price <= max_price):
@@ -640,29 +901,31 @@ def scrape_via_html(
                         title = parts[0].strip() if len(parts) > 1 else raw_title
                         neighborhood = "Palo Alto" if area == "pen" else "San Francisco"
                         if parent:
-                            hood_span = parent.find(class_=re.compile(r"hood|supertitle|meta|location", re.I))
+                            hood_span = parent.find(class_=_HOOD_CLS_RE)
                             if hood_span:
-                                neighborhood = (hood_span.get_text() or "").strip("() \n") or neighborhood
+                                neighborhood = sys.intern((hood_span.get_text() or "").strip("() \n")) or neighborhood
+                        laundry_type, parking = extract_amenities(combined_text)
+                        bedrooms, bathrooms, sqft = extract_unit_facts(combined_text, title)
                         apartments.append({
                             "title": title or raw_title[:80],
                             "url": url,
                             "price": price,
                             "neighborhood": neighborhood,
-                            "bedrooms": extract_bedrooms(combined_text) or extract_bedrooms(title),
-                            "bathrooms": extract_bathrooms(combined_text) or extract_bathrooms(title),
-                            "sqft": extract_sqft(combined_text) or extract_sqft(title),
+                            "bedrooms": bedrooms,
+                            "bathrooms": bathrooms,
+                            "sqft": sqft,
                             "price_per_sqft": None,
                             "price_per_bedroom": None,
                             "posted_date": None,
                             "deal_score": None,
                             "deal_analysis": None,
                             "discount_pct": None,
-                        "laundry_type": extract_laundry(combined_text),
-                        "parking": extract_parking(combined_text),
-                        "thumbnail_url": None,
-                        "latitude": None,
-                        "longitude": None,
-                    })
+                            "laundry_type": laundry_type,
+                            "parking": parking,
+                            "thumbnail_url": None,
+                            "latitude": None,
+                            "longitude": None,
+                        })
                     except Exception as e:
                         logger.debug("Link parse error: %s", e)
                 if apartments:
@@ -681,11 +944,20 @@ def scrape_via_html(
             except Exception as e:
                 logger.debug("Error parsing listing: %s", e)
 
-        # If list items didn't parse (wrong DOM), fall back to link-based parsing
-        detail_links = [a for a in listing_links if re.search(r"/" + re.escape(area) + r"/apa/.+\d+\.html", a.get("href", ""))]
-        if not apartments and detail_links:
+        # If list items didn't parse (wrong DOM), fall back to link-based parsing; the extra
+        # whole-document link walk only happens in that case
+        detail_links = []
+        if not apartments:
+            detail_href_re = _detail_href_re(area)
+            detail_needle = f"/{area}/apa/"
+            detail_links = [
+                a for a in soup.find_all("a", href=True)
+                if detail_needle in (h := a.get("href", "")) and ".html" in h and detail_href_re.search(h)
+            ]
+        if detail_links:
             # Prefer title link per URL so price/title match the listing
             href_to_best = {}
+            best_len = {}
             for a in detail_links:
                 h = (a.get("href") or "").split("?")[0]
                 if not h:
@@ -693,8 +965,8 @@ def scrape_via_html(
                 cur = href_to_best.get(h)
                 a_cls = (a.get("class") or []) if isinstance(a.get("class"), list) else []
                 a_len = len((a.get_text() or "").strip())
-                if not cur or "titlestring" in a_cls or "result-title" in a_cls or "cl-app-anchor" in a_cls or a_len > len((cur.get_text() or "").strip()):
-                    href_to_best[h] = a
+                if not cur or "titlestring" in a_cls or "result-title" in a_cls or "cl-app-anchor" in a_cls or a_len > best_len[h]:
+                    href_to_best[h], best_len[h] = a, a_len
             detail_links = list(href_to_best.values())
             logger.debug("0 from list items; link fallback (%s links)", len(detail_links))
             seen = set()
@@ -710,13 +982,13 @@ def scrape_via_html(
                     row = _listing_row_ancestor(link)
                     parent = row if row else link.parent
                     combined_text = (parent.get_text() if parent else "") or raw_title
-                    if parent and parent.parent and not re.search(r"\d\s*br|\d\s*bed|studio", combined_text, re.I):
+                    if parent and parent.parent and not _BR_HINT_RE.search(combined_text):
                         combined_text = (parent.parent.get_text() or "") + " " + combined_text
                     price = extract_price_from_text(combined_text) or extract_price_from_text(raw_title)
                     if not price and parent:
-                        price_elem = parent.find(class_=re.compile(r"result-price|priceinfo|price", re.I))
+                        price_elem = parent.find(class_=_PRICE_CLS_RE)
                         if price_elem:
-                            m = re.search(r"\$?([\d,]+)", (price_elem.get_text() or ""))
+                            m = _DOLLAR_OPT_RE.search(price_elem.get_text() or "")
                             if m:
                                 price = int(m.group(1).replace(",", ""))
                     if not price or not (min_price <= price <= max_price):
@@ -725,25 +997,27 @@ def scrape_via_html(
                     title = (parts[0].strip() if len(parts) > 1 else raw_title) or raw_title[:80]
                     neighborhood = "Palo Alto" if area == "pen" else "San Francisco"
                     if parent:
-                        hood_span = parent.find(class_=re.compile(r"hood|supertitle|meta|location", re.I))
+                        hood_span = parent.find(class_=_HOOD_CLS_RE)
                         if hood_span:
-                            neighborhood = (hood_span.get_text() or "").strip("() \n") or neighborhood
+                            neighborhood = sys.intern((hood_span.get_text() or "").strip("() \n")) or neighborhood
+                    laundry_type, parking = extract_amenities(combined_text)
+                    bedrooms, bathrooms, sqft = extract_unit_facts(combined_text, title)
                     apartments.append({
                         "title": title,
                         "url": url,
                         "price": price,
                         "neighborhood": neighborhood,
-                        "bedrooms": extract_bedrooms(combined_text) or extract_bedrooms(title),
-                        "bathrooms": extract_bathrooms(combined_text) or extract_bathrooms(title),
-                        "sqft": extract_sqft(combined_text) or extract_sqft(title),
+                        "bedrooms": bedrooms,
+                        "bathrooms": bathrooms,
+                        "sqft": sqft,
                         "price_per_sqft": None,
                         "price_per_bedroom": None,
                         "posted_date": None,
                         "deal_score": None,
                         "deal_analysis": None,
                         "discount_pct": None,
-                        "laundry_type": extract_laundry(combined_text),
-                        "parking": extract_parking(combined_text),
+                        "laundry_type": laundry_type,
+                        "parking": parking,
                         "thumbnail_url": None,
                         "latitude": None,
                         "longitude": None,
@@ -764,6 +1038,157 @@ def scrape_via_html(
     return apartments
 
 
+# Compiled once; evaluated in C by libxml2 (only when lxml is installed)
+if lxml is not None:
+    _LDJSON_XPATH = etree.XPath('//script[@id="ld_searchpage_results"][@type="application/ld+json"]/text()')
+    _ROWS_XPATH = etree.XPath(
+        '//li[contains(@class, "cl-search-result") or contains(@class, "result-row")'
+        ' or contains(@class, "cl-static-search-result")]'
+    )
+    # Same fallbacks as the soup.select() chain in scrape_via_html, for pages without <li> result rows
+    _ROWS_FALLBACK_XPATHS = (
+        etree.XPath('//*[contains(concat(" ", normalize-space(@class), " "), " result-row ")]'),
+        etree.XPath('//*[@data-pid]'),
+        etree.XPath('//*[contains(concat(" ", normalize-space(@class), " "), " cl-search-result ")]'),
+    )
+    _ROW_LINKS_XPATH = etree.XPath('.//a[contains(@href, "/apa/")]')
+    _ROW_PRICE_XPATH = etree.XPath('string(.//*[contains(@class, "price")][contains(., "$")][1])')
+    # Same priority as parse_listing: exact span classes first, then any hood/location-ish class
+    _ROW_HOOD_XPATHS = tuple(
+        etree.XPath(f'string(.//span[contains(concat(" ", normalize-space(@class), " "), " {cls} ")][1])')
+        for cls in ("supertitle", "result-hood", "meta", "nearby")
+    ) + (
+        etree.XPath(
+            'string(.//*[contains(translate(@class, "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "hood")'
+            ' or contains(translate(@class, "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "location")][1])'
+        ),
+    )
+    _ROW_HOUSING_XPATH = etree.XPath(
+        'string(.//*[contains(@class, "housing") or contains(@class, "attr") or contains(@class, "posting-details")'
+        ' or contains(@class, "postingbody")][1])'
+    )
+    _ROW_DATA_IDS_XPATH = etree.XPath('.//*[@data-ids]/@data-ids')
+    _ROW_IMG_XPATH = etree.XPath('.//img/@src')
+    _ROW_TIME_XPATH = etree.XPath('.//time')
+
+_TITLE_LINK_CLASSES = ("titlestring", "result-title", "cl-app-anchor", "posting-title")
+_SF_TITLE_HOODS = ("mission", "soma", "nob hill", "marina", "sunset", "richmond", "castro", "haight", "pac heights", "inner sunset", "outer sunset")
+# One C-level scan rules out titles that name no neighborhood (the common case)
+_SF_TITLE_HOODS_RE = re.compile("|".join(map(re.escape, _SF_TITLE_HOODS)))
+_SF_TITLE_HOOD_NAMES = {h: h.title() for h in _SF_TITLE_HOODS}
+
+
+def _title_neighborhood(title: str) -> str:
+    """First _SF_TITLE_HOODS entry (list order wins, substring match) named in the title, else 'San Francisco'."""
+    title_lower = title.lower()
+    if not _SF_TITLE_HOODS_RE.search(title_lower):
+        return "San Francisco"
+    return next(_SF_TITLE_HOOD_NAMES[h] for h in _SF_TITLE_HOODS if h in title_lower)
+
+
+def _parse_row_lxml(row, area_re) -> Optional[dict[str, Any]]:
+    """lxml counterpart of parse_listing for one search-result row (same fields and price bounds)."""
+    title_elem = None
+    title_len = -1
+    for a in _ROW_LINKS_XPATH(row):
+        if not area_re.search(a.get("href") or ""):
+            continue
+        if any(c in _TITLE_LINK_CLASSES for c in (a.get("class") or "").split()):
+            title_elem = a
+            break
+        text_len = len(a.text_content().strip())
+        if text_len > title_len:
+            title_elem, title_len = a, text_len
+    if title_elem is None:
+        return None
+    title = title_elem.text_content().strip()
+    url = _normalize_listing_url(title_elem.get("href", ""))
+    if not url or "/apa/" not in url or ".html" not in url:
+        return None
+
+    row_text = row.text_content() or ""
+    price = None
+    m = _DOLLAR_RE.search(_ROW_PRICE_XPATH(row))
+    if m:
+        price = int(m.group(1).replace(",", ""))
+    if not price and row.get("data-price"):
+        try:
+            price = int(row.get("data-price"))
+        except (TypeError, ValueError):
+            pass
+    has_dollar = "$" in row_text
+    if not price and has_dollar:
+        m = _RENT_AMOUNT_RE.search(row_text)
+        if m and 500 <= (amount := int(m.group(1).replace(",", ""))) <= 15000:
+            price = amount
+    if not price:
+        price = (extract_price_from_text(row_text) if has_dollar else None) or extract_price_from_text(title)
+    if not price or price < 500 or price > 15000:
+        return None
+
+    hood_text = next((t for t in (xp(row).strip("() \n") for xp in _ROW_HOOD_XPATHS) if t), "")
+    if hood_text:
+        hood_match = _LEADING_NON_DIGITS_RE.match(hood_text)
+        # Interned: a page repeats the same few labels, so equal neighborhoods share one string
+        neighborhood = sys.intern(hood_match.group(1).strip() if hood_match else hood_text[:30])
+    else:
+        neighborhood = _title_neighborhood(title)
+
+    search_text = _ROW_HOUSING_XPATH(row) + " " + title
+    full_text = row_text + " " + title
+    bedrooms, bathrooms, sqft = extract_unit_facts(search_text, full_text, title)
+
+    thumbnail_url = next(filter(None, map(_thumbnail_from_data_ids, _ROW_DATA_IDS_XPATH(row))), None)
+    if not thumbnail_url:
+        thumbnail_url = next((src.strip() for src in _ROW_IMG_XPATH(row) if "craigslist.org" in src), None)
+
+    posted_date = None
+    times = _ROW_TIME_XPATH(row)
+    if times:
+        posted_date = times[0].get("datetime") or times[0].text_content().strip()
+
+    price_per_sqft, price_per_bedroom = unit_rates(price, sqft, bedrooms)
+    laundry_type, parking = extract_amenities(full_text)
+    return {
+        "title": title,
+        "url": url,
+        "price": price,
+        "neighborhood": neighborhood,
+        "bedrooms": bedrooms,
+        "bathrooms": bathrooms,
+        "sqft": sqft,
+        "price_per_sqft": price_per_sqft,
+        "price_per_bedroom": price_per_bedroom,
+        "posted_date": posted_date,
+        "deal_score": None,
+        "deal_analysis": None,
+        "discount_pct": None,
+        "laundry_type": laundry_type,
+        "parking": parking,
+        "thumbnail_url": thumbnail_url,
+        "latitude": None,
+        "longitude": None,
+    }
+
+
+def _parse_rows_lxml(doc, area: str, max_listings: int, min_price: int, max_price: int) -> list[dict[str, Any]]:
+    """Fast path for scrape_via_html: XPath over the result rows. [] means fall back to BeautifulSoup."""
+    area_re = _listing_href_re(area)
+    apartments = []
+    rows = _ROWS_XPATH(doc)
+    if not rows:
+        rows = next((found for xp in _ROWS_FALLBACK_XPATHS if (found := xp(doc))), [])
+    for row in rows[:max_listings]:
+        try:
+            apt = _parse_row_lxml(row, area_re)
+        except Exception as e:
+            logger.debug("lxml row parse error: %s", e)
+            continue
+        if apt and min_price <= apt["price"] <= max_price:
+            apartments.append(apt)
+    return apartments
+
+
 def _listing_row_ancestor(elem) -> Optional[Any]:
     """Climb from element to nearest listing row (li.cl-search-result, li.result-row, or [data-pid])."""
     if elem is None:
@@ -780,6 +1205,36 @@ def _listing_row_ancestor(elem) -> Optional[Any]:
     return None
 
 
+_PRICE_SPAN_CLASSES = ("priceinfo", "result-price", "price", "meta")
+
+
+def _price_candidates(listing) -> dict:
+    """
+    One walk over the card for the price strategies: first span.<priceinfo|result-price|price|meta>,
+    first div.price, and first element with a class containing 'price' (any case), keyed by selector.
+    """
+    found = {}
+    for el in listing.descendants:
+        if not isinstance(el, Tag):
+            continue
+        cls = el.get("class")
+        if not cls:
+            continue
+        if isinstance(cls, str):
+            cls = cls.split()
+        if el.name == "span":
+            for name in _PRICE_SPAN_CLASSES:
+                if name in cls and "span." + name not in found:
+                    found["span." + name] = el
+        elif el.name == "div" and "price" in cls and "div.price" not in found:
+            found["div.price"] = el
+        if "price_class" not in found and any("price" in c.lower() for c in cls):
+            found["price_class"] = el
+        if len(found) == 6:
+            break
+    return found
+
+
 def parse_listing(listing, area: str = "sfc"):
     """
     Parse individual Craigslist listing with robust multi-strategy price extraction.
@@ -808,9 +1263,10 @@ def parse_listing(listing, area: str = "sfc"):
             "longitude": None,
         }
         # ----- Title and URL: prefer main listing link for this area (so title/price match the URL) -----
-        area_pattern = re.compile(r"/" + re.escape(area) + r"/apa/(?:d/)?[^/]+/\d+\.html")
+        area_pattern = _listing_href_re(area)
         candidates = listing.find_all("a", href=True)
         title_elem = None
+        title_text = ""  # stripped text of title_elem when it was picked by length
         for a in candidates:
             href = a.get("href") or ""
             if not area_pattern.search(href):
@@ -818,10 +1274,11 @@ def parse_listing(listing, area: str = "sfc"):
             # Prefer the anchor that has the listing title (titlestring/result-title) or has substantial text
             cls = (a.get("class") or []) if isinstance(a.get("class"), list) else []
             if "titlestring" in cls or "result-title" in cls or "cl-app-anchor" in cls or "posting-title" in cls:
-                title_elem = a
+                title_elem, title_text = a, None
                 break
-            if not title_elem or (len((a.get_text() or "").strip()) > len((title_elem.get_text() or "").strip())):
-                title_elem = a
+            a_text = (a.get_text() or "").strip()
+            if not title_elem or len(a_text) > len(title_text):
+                title_elem, title_text = a, a_text
         if not title_elem and candidates:
             for a in candidates:
                 if area_pattern.search(a.get("href") or ""):
@@ -838,59 +1295,33 @@ def parse_listing(listing, area: str = "sfc"):
         if not title_elem:
             logger.debug("Could not find title element for area=%s", area)
             return None
-        apt["title"] = (title_elem.get_text() or "").strip()
+        apt["title"] = title_text if title_text else (title_elem.get_text() or "").strip()
         apt["url"] = _normalize_listing_url(title_elem.get("href", ""))
         if not apt["url"] or "/apa/" not in apt["url"] or ".html" not in apt["url"]:
             return None
 
         # ----- Price: multi-strategy from actual elements first -----
+        listing_text = listing.get_text() or ""  # whole-card text, reused by the text fallbacks below
         price = None
         price_source = None
 
-        # Strategy 1: span.priceinfo
-        if not price:
-            price_elem = listing.find("span", class_="priceinfo")
-            if price_elem:
-                m = re.search(r"\$\s*([\d,]+)", price_elem.get_text() or "")
-                if m:
-                    price = int(m.group(1).replace(",", ""))
-                    price_source = "span.priceinfo"
-
-        # Strategy 2: span.result-price
-        if not price:
-            price_elem = listing.find("span", class_="result-price")
-            if price_elem:
-                m = re.search(r"\$\s*([\d,]+)", price_elem.get_text() or "")
-                if m:
-                    price = int(m.group(1).replace(",", ""))
-                    price_source = "span.result-price"
-
-        # Strategy 3: div.price or span.price
-        if not price:
-            price_elem = listing.find("div", class_="price") or listing.find("span", class_="price")
-            if price_elem and "$" in (price_elem.get_text() or ""):
-                m = re.search(r"\$\s*([\d,]+)", price_elem.get_text() or "")
-                if m:
-                    price = int(m.group(1).replace(",", ""))
-                    price_source = "div/span.price"
-
-        # Strategy 4: span.meta
-        if not price:
-            meta_elem = listing.find("span", class_="meta")
-            if meta_elem and "$" in (meta_elem.get_text() or ""):
-                m = re.search(r"\$\s*([\d,]+)", meta_elem.get_text() or "")
-                if m:
-                    price = int(m.group(1).replace(",", ""))
-                    price_source = "span.meta"
-
-        # Strategy 5: any element with 'price' in class
-        if not price:
-            price_elem = listing.find(class_=lambda x: x and "price" in str(x).lower())
-            if price_elem and "$" in (price_elem.get_text() or ""):
-                m = re.search(r"\$\s*([\d,]+)", price_elem.get_text() or "")
-                if m:
-                    price = int(m.group(1).replace(",", ""))
-                    price_source = "class containing 'price'"
+        # Strategies 1-5: first span.priceinfo, span.result-price, div/span.price, span.meta, any *price* class
+        candidates = _price_candidates(listing)
+        for price_elem, source in (
+            (candidates.get("span.priceinfo"), "span.priceinfo"),
+            (candidates.get("span.result-price"), "span.result-price"),
+            (candidates.get("div.price") or candidates.get("span.price"), "div/span.price"),
+            (candidates.get("span.meta"), "span.meta"),
+            (candidates.get("price_class"), "class containing 'price'"),
+        ):
+            if price_elem is None:
+                continue
+            m = _DOLLAR_RE.search(price_elem.get_text() or "")
+            if m:
+                price = int(m.group(1).replace(",", ""))
+                if price:
+                    price_source = source
+                    break
 
         # Strategy 6: data-price attribute
         if not price:
@@ -903,16 +1334,15 @@ def parse_listing(listing, area: str = "sfc"):
                     pass
 
         # Strategy 7: first reasonable dollar amount in listing text (4–6 digits)
-        if not price:
-            listing_text = listing.get_text() or ""
-            m = re.search(r"\$\s*([\d,]{4,6})(?!\d)", listing_text)
+        if not price and "$" in listing_text:
+            m = _RENT_AMOUNT_RE.search(listing_text)
             if m:
                 extracted = int(m.group(1).replace(",", ""))
                 if 500 <= extracted <= 15000:
                     price = extracted
                     price_source = "text search"
         if not price:
-            price = extract_price_from_text(listing.get_text() or "") or extract_price_from_text(apt["title"] or "")
+            price = extract_price_from_text(listing_text) or extract_price_from_text(apt["title"] or "")
             if price:
                 price_source = "extract_price_from_text"
 
@@ -929,52 +1359,30 @@ def parse_listing(listing, area: str = "sfc"):
         hood_elem = (
             listing.find("span", class_="supertitle")
             or listing.find("span", class_="result-hood")
-            or listing.find("span", class_="meta")
+            or candidates.get("span.meta")
             or listing.find("span", class_="nearby")
-            or listing.find(class_=re.compile(r"hood|neighborhood|location", re.I))
+            or listing.find(class_=_NEIGHBORHOOD_CLS_RE)
         )
         if hood_elem:
             hood_text = (hood_elem.get_text() or "").strip("() \n")
-            hood_match = re.match(r"^([^0-9]+)", hood_text)
-            apt["neighborhood"] = hood_match.group(1).strip() if hood_match else hood_text[:30]
+            hood_match = _LEADING_NON_DIGITS_RE.match(hood_text)
+            apt["neighborhood"] = sys.intern(hood_match.group(1).strip() if hood_match else hood_text[:30])
         else:
-            title_lower = (apt["title"] or "").lower()
-            for hood in ("mission", "soma", "nob hill", "marina", "sunset", "richmond", "castro", "haight", "pac heights", "inner sunset", "outer sunset"):
-                if hood in title_lower:
-                    apt["neighborhood"] = hood.title()
-                    break
-            if not apt["neighborhood"]:
-                apt["neighborhood"] = "San Francisco"
+            apt["neighborhood"] = _title_neighborhood(apt["title"])
 
         # ----- Bedrooms, bathrooms, sqft (try housing span, then any attr-like element, then full listing) -----
         housing_elem = (
             listing.find("span", class_="housing")
-            or listing.find(class_=re.compile(r"housing|attr|posting-details|postingbody", re.I))
+            or listing.find(class_=_HOUSING_CLS_RE)
             or listing.find("span", class_=lambda c: c and "housing" in str(c).lower())
         )
-        listing_full_text = (listing.get_text() or "") + " " + (apt["title"] or "")
+        listing_full_text = listing_text + " " + (apt["title"] or "")
         search_text = (housing_elem.get_text() if housing_elem else "") + " " + (apt["title"] or "")
         # Prefer housing block, then fall back to full listing text (helps peninsula/different DOM)
-        apt["bedrooms"] = (
-            extract_bedrooms(search_text)
-            or extract_bedrooms(listing_full_text)
-            or extract_bedrooms(apt["title"])
-        )
-        apt["bathrooms"] = (
-            extract_bathrooms(search_text)
-            or extract_bathrooms(listing_full_text)
-            or extract_bathrooms(apt["title"])
-        )
-        apt["sqft"] = (
-            extract_sqft(search_text)
-            or extract_sqft(listing_full_text)
-            or extract_sqft(apt["title"])
-        )
+        apt["bedrooms"], apt["bathrooms"], apt["sqft"] = extract_unit_facts(search_text, listing_full_text, apt["title"])
 
         # ----- Laundry, parking, thumbnail -----
-        full_text = (listing.get_text() or "") + " " + (apt["title"] or "")
-        apt["laundry_type"] = extract_laundry(full_text)
-        apt["parking"] = extract_parking(full_text)
+        apt["laundry_type"], apt["parking"] = extract_amenities(listing_full_text)
         apt["thumbnail_url"] = _extract_thumbnail_from_listing(listing)
 
         # ----- Posted date -----
@@ -983,10 +1391,7 @@ def parse_listing(listing, area: str = "sfc"):
             apt["posted_date"] = time_elem.get("datetime") or (time_elem.get_text() or "").strip()
 
         # ----- Derived metrics -----
-        if apt["price"] and apt["sqft"]:
-            apt["price_per_sqft"] = round(apt["price"] / apt["sqft"], 2)
-        if apt["price"] and apt.get("bedrooms") and apt["bedrooms"] > 0:
-            apt["price_per_bedroom"] = round(apt["price"] / apt["bedrooms"], 2)
+        apt["price_per_sqft"], apt["price_per_bedroom"] = unit_rates(apt["price"], apt["sqft"], apt.get("bedrooms"))
 
         return apt
     except Exception as e:
@@ -998,22 +1403,21 @@ def extract_bedrooms(text):
     """Extract bedroom count from listing text. Handles 2br, 2 br, 2-bed, 2 bd, studio, etc."""
     if not text:
         return None
-    text = text.lower()
+    return _bedrooms_from_lower(text.lower())
+
+
+def _bedrooms_from_lower(text: str) -> Optional[int]:
     # Studio / 0 BR
-    if re.search(r"\bstudio\b", text) or re.search(r"\b0\s*br\b", text) or "0br" in text or "0-bed" in text:
+    if _STUDIO_RE.search(text) or _ZERO_BR_RE.search(text) or "0br" in text or "0-bed" in text:
         return 0
     # Explicit N br / N bed / N bedroom (with optional hyphen, optional s)
-    match = re.search(
-        r"(?:^|[\s/\-])(\d+)\s*[-]?\s*(?:br|bed|bedroom|bd)s?\b",
-        text,
-        re.IGNORECASE,
-    )
+    match = _BEDROOMS_RE.search(text)
     if match:
         n = int(match.group(1))
         if 0 <= n <= 6:
             return n
     # Compact form: 1br, 2br, 3br (no space)
-    match = re.search(r"\b([1-6])br\b", text)
+    match = _COMPACT_BR_RE.search(text)
     if match:
         return int(match.group(1))
     return None
@@ -1022,7 +1426,13 @@ def extract_bedrooms(text):
 def extract_bathrooms(text):
     if not text:
         return None
-    match = re.search(r"([\d.]+)\s*(?:ba|bath|bathroom)s?", text.lower())
+    return _bathrooms_from_lower(text.lower())
+
+
+def _bathrooms_from_lower(text: str) -> Optional[float]:
+    if "ba" not in text:  # every bath/bathroom match contains it
+        return None
+    match = _BATHROOMS_RE.search(text)
     if match:
         return float(match.group(1))
     return None
@@ -1031,18 +1441,66 @@ def extract_bathrooms(text):
 def extract_sqft(text):
     if not text:
         return None
-    match = re.search(r"(\d+)\s*(?:sqft|sq\.?\s*ft\.?|sf|ft²)", text.lower())
+    return _sqft_from_lower(text.lower())
+
+
+def _sqft_from_lower(text: str) -> Optional[int]:
+    if "sq" not in text and "sf" not in text and "ft²" not in text:  # one of these is in every match
+        return None
+    match = _SQFT_RE.search(text)
     if match:
         return int(match.group(1))
     return None
 
 
+def extract_unit_facts(*texts) -> tuple:
+    """
+    (bedrooms, bathrooms, sqft) from texts in priority order, each text lowercased once. Same result as
+    extract_bedrooms(a) or extract_bedrooms(b) or ... per field (so a studio's 0 still defers to later texts).
+    """
+    lowered = [t.lower() if t else None for t in texts]
+    facts = []
+    for parse in (_bedrooms_from_lower, _bathrooms_from_lower, _sqft_from_lower):
+        value = None
+        for t in lowered:
+            value = parse(t) if t else None
+            if value:
+                break
+        facts.append(value)
+    return tuple(facts)
+
+
+def unit_rates(price, sqft, bedrooms):
+    """(price_per_sqft, price_per_bedroom) rounded to cents; None where a denominator is missing."""
+    if not price:
+        return None, None
+    return (
+        round(price / sqft, 2) if sqft else None,
+        round(price / bedrooms, 2) if bedrooms and bedrooms > 0 else None,
+    )
+
+
+LISTING_NUMERIC_FIELDS = (
+    "price", "bedrooms", "bathrooms", "sqft", "price_per_sqft", "price_per_bedroom",
+    "deal_score", "discount_pct", "latitude", "longitude",
+)
+
+
+def to_columnar(apartments, fields=LISTING_NUMERIC_FIELDS) -> dict[str, np.ndarray]:
+    """Struct-of-arrays view of numeric listing fields: one float64 column per field, NaN where missing."""
+    nan = float("nan")
+    return {
+        k: np.fromiter((nan if (v := a.get(k)) is None else v for a in apartments), dtype=np.float64, count=len(apartments))
+        for k in fields
+    }
+
+
 def extract_price_from_text(text):
     """Extract first rent-like price ($1,000-$10,000) from text. Returns int or None."""
-    if not text:
+    if not text or "$" not in text:  # substring test is far cheaper than a regex scan that can't match
         return None
     # Match $1,234 or $1234
-    for m in re.finditer(r"\$[\s]*([\d,]+)", text):
+    for m in _DOLLAR_RE.finditer(text):
         try:
             val = int(m.group(1).replace(",", ""))
             if 500 <= val <= 15000:  # plausible rent
@@ -1052,17 +1510,28 @@ def extract_price_from_text(text):
     return None
 
 
+def extract_amenities(text) -> tuple[Optional[str], bool]:
+    """(extract_laundry(text), extract_parking(text)) with the text lowercased once."""
+    if not text:
+        return None, False
+    t = text.lower()
+    return _laundry_from_lower(t), bool(_PARKING_RE.search(t))
+
+
 def extract_laundry(text):
     """Extract laundry: 'in_unit', 'in_building', or None. In-unit is best."""
     if not text:
         return None
-    t = text.lower()
+    return _laundry_from_lower(text.lower())
+
+
+def _laundry_from_lower(t: str) -> Optional[str]:
     # In-unit / W/D in unit / washer dryer in unit
-    if re.search(r"in[- ]?unit\s*(?:w/?d|washer|laundry)|w/?d\s*in\s*unit|washer\s*(?:&|and)\s*dryer\s*in\s*unit|in-unit\s*laundry", t):
+    if _LAUNDRY_IN_UNIT_RE.search(t):
         return "in_unit"
-    if re.search(r"laundry\s*(?:in\s*building|on[- ]?site|in\s*building)|in\s*building\s*laundry|on[- ]?site\s*laundry|shared\s*laundry|laundry\s*on\s*site", t):
+    if _LAUNDRY_IN_BUILDING_RE.search(t):
         return "in_building"
-    if re.search(r"washer|dryer|w/d|w&d|laundry", t):
+    if _LAUNDRY_ANY_RE.search(t):
         # Generic mention: assume in-building if not in-unit
         return "in_building"
     return None
@@ -1073,9 +1542,7 @@ def extract_parking(text):
     if not text:
         return False
     t = text.lower()
-    return bool(
-        re.search(r"parking|garage|car\s*space|pkg\s*(?:incl|avail)|parking\s*(?:incl|avail|included)", t)
-    )
+    return bool(_PARKING_RE.search(t))
 
 
 def get_neighborhood_market_rates():
@@ -1118,9 +1585,16 @@ def get_stanford_market_rates():
 
 # Only run Claude AI summary for the top N by market discount (saves API cost)
 AI_ANALYSIS_TOP_N = 25
-# Parallel workers for scoring pass and for Claude API calls
-SCORE_MAX_WORKERS = 16
+# Parallel workers for Claude API calls (I/O-bound; the scoring pass is pure Python and runs inline)
 AI_MAX_WORKERS = 10
+# Message Batches mode: half-price Claude calls, but results can take minutes, so it is opt-in.
+# Items without a result by the timeout (or a failed batch) fall back to direct parallel calls.
+try:
+    from config import APARTMENT_AI_BATCH, APARTMENT_AI_BATCH_TIMEOUT
+except ImportError:
+    APARTMENT_AI_BATCH = os.environ.get("APARTMENT_AI_BATCH", "false").strip().lower() in ("1", "true", "yes")
+    APARTMENT_AI_BATCH_TIMEOUT = int(os.environ.get("APARTMENT_AI_BATCH_TIMEOUT", "600"))
+APARTMENT_AI_BATCH_POLL = 5  # seconds between batch status checks
 
 # Cache analyzed results to avoid repeated Claude API calls (key=listing url, value=analysis data)
 # TTL in seconds; configurable via APARTMENT_ANALYSIS_CACHE_TTL (default 1 hour)
@@ -1129,9 +1603,25 @@ try:
 except ImportError:
     APARTMENT_ANALYSIS_CACHE_TTL = int(os.environ.get("APARTMENT_ANALYSIS_CACHE_TTL", "3600"))
 
-_analysis_cache: dict[str, dict] = {}
+try:
+    from config import ANALYSIS_CACHE_PATH
+except ImportError:
+    ANALYSIS_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.environ.get("ANALYSIS_CACHE_FILE", "analysis_cache.db"))
+
+# L1: in-process LRU (reads are lock-free dict.get; writes and evictions take the lock);
+# L2: table in the shared analysis SQLite file so Claude results survive restarts
+_ANALYSIS_CACHE_MAX = 4096
+_analysis_cache: OrderedDict[str, dict] = OrderedDict()
 _analysis_cache_lock = threading.Lock()
 
+_analysis_disk = open_cache_table(
+    ANALYSIS_CACHE_PATH,
+    "apartment_analysis",
+    "key TEXT PRIMARY KEY, ts REAL, deal_score INTEGER, deal_analysis TEXT, discount_pct REAL",
+    ttl=APARTMENT_ANALYSIS_CACHE_TTL,
+)
+_analysis_disk_lock = threading.Lock()
+
 
 def _cache_key(url: Optional[str]) -> Optional[str]:
     """Normalize listing URL for cache key (strip fragment)."""
@@ -1146,14 +1636,20 @@ def _get_cached_analysis(url: Optional[str]):
     if not key:
         return None
     now = time.time()
-    with _analysis_cache_lock:
-        entry = _analysis_cache.get(key)
-    if not entry:
-        return None
-    if (now - entry["cached_at"]) > APARTMENT_ANALYSIS_CACHE_TTL:
+    entry = _analysis_cache.get(key)
+    if entry:
+        fresh = (now - entry["cached_at"]) <= APARTMENT_ANALYSIS_CACHE_TTL
         with _analysis_cache_lock:
-            _analysis_cache.pop(key, None)
-        return None
+            if not fresh:
+                _analysis_cache.pop(key, None)
+            elif key in _analysis_cache:
+                _analysis_cache.move_to_end(key)  # LRU: frequently viewed listings stay resident
+        if not fresh:
+            return None
+    else:
+        entry = _load_disk_analysis(key, now)
+        if not entry:
+            return None
     return {
         "deal_score": entry.get("deal_score"),
         "deal_analysis": entry.get("deal_analysis"),
@@ -1161,113 +1657,185 @@ def _get_cached_analysis(url: Optional[str]):
     }
 
 
+def _load_disk_analysis(key: str, now: float) -> Optional[dict]:
+    """L2 lookup for a fresh entry; promotes it into the in-process cache."""
+    if _analysis_disk is None:
+        return None
+    try:
+        with _analysis_disk_lock:
+            row = _analysis_disk.execute(
+                "SELECT deal_score, deal_analysis, discount_pct, ts FROM apartment_analysis WHERE key = ? AND ? - ts <= ?",
+                (key, now, APARTMENT_ANALYSIS_CACHE_TTL),
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.debug("Apartment analysis disk cache read: %s", e)
+        return None
+    if not row:
+        return None
+    entry = {"deal_score": row[0], "deal_analysis": row[1], "discount_pct": row[2], "cached_at": row[3]}
+    with _analysis_cache_lock:
+        _remember_analysis(key, entry)
+    return entry
+
+
+def _remember_analysis(key: str, entry: dict) -> None:
+    """Insert into the L1 LRU, evicting the oldest entries past _ANALYSIS_CACHE_MAX. Caller holds the lock."""
+    _analysis_cache[key] = entry
+    _analysis_cache.move_to_end(key)
+    while len(_analysis_cache) > _ANALYSIS_CACHE_MAX:
+        _analysis_cache.popitem(last=False)
+
+
 def _set_cached_analysis(url: Optional[str], deal_score: Any, deal_analysis: Any, discount_pct: Any) -> None:
     """Store analysis in cache."""
-    key = _cache_key(url)
-    if not key:
-        return
+    _set_cached_analyses([(url, deal_score, deal_analysis, discount_pct)])
+
+
+def _set_cached_analyses(rows) -> None:
+    """Store (url, deal_score, deal_analysis, discount_pct) rows in memory and on disk (one transaction)."""
+    now = time.time()
+    disk_rows = []
     with _analysis_cache_lock:
-        _analysis_cache[key] = {
-            "deal_score": deal_score,
-            "deal_analysis": deal_analysis,
-            "discount_pct": discount_pct,
-            "cached_at": time.time(),
-        }
+        for url, deal_score, deal_analysis, discount_pct in rows:
+            key = _cache_key(url)
+            if not key:
+                continue
+            _remember_analysis(key, {
+                "deal_score": deal_score,
+                "deal_analysis": deal_analysis,
+                "discount_pct": discount_pct,
+                "cached_at": now,
+            })
+            disk_rows.append((key, now, deal_score, deal_analysis, discount_pct))
+    if _analysis_disk is None or not disk_rows:
+        return
+    try:
+        with _analysis_disk_lock:
+            _analysis_disk.executemany(
+                "INSERT OR REPLACE INTO apartment_analysis (key, ts, deal_score, deal_analysis, discount_pct) VALUES (?,?,?,?,?)",
+                disk_rows,
+            )
+            _analysis_disk.commit()
+    except sqlite3.Error as e:
+        logger.debug("Apartment analysis disk cache write: %s", e)
+
+
+@functools.lru_cache(maxsize=512)
+def _canonical_hood(name: str) -> str:
+    """Neighborhood name as a market-rate key: lowercase, hyphens for spaces."""
+    return name.lower().strip().replace(" ", "-")
 
 
-def _compute_discount_and_score(apt, market_rates):
-    """Set discount_pct and deal_score using same logic as portal scoring. Returns True if apt is valid.
+def _market_rate_index(market_rates: dict) -> dict:
+    """Flatten {hood: {bed_key: rate}} to {(canonical_hood, bed_key): rate} with the spaced-name and 1br fallbacks resolved."""
+    bed_keys = {"studio", "1br", "2br", "3br"}.union(*(rates.keys() for rates in market_rates.values()))
+    hoods = {hood: rates for hood, rates in market_rates.items() if " " not in hood}
+    for hood, rates in market_rates.items():
+        if "-" not in hood:
+            hoods.setdefault(hood.replace(" ", "-"), rates)
+    return {(hood, bk): rates.get(bk, rates.get("1br")) for hood, rates in hoods.items() for bk in bed_keys}
+
+
+def _lookup_market_rate(rate_index: dict, neighborhood: Any, bedrooms: int) -> Optional[float]:
+    """Market rate for a neighborhood and bedroom count; unknown neighborhoods use the default row."""
+    hood = _canonical_hood(neighborhood) if isinstance(neighborhood, str) else "default"
+    bed_key = "studio" if bedrooms == 0 else f"{min(bedrooms, 3)}br"
+    rate = rate_index.get((hood, bed_key))
+    if rate is None:
+        rate = rate_index.get(("default", bed_key))
+    if rate is None:  # bed key not in the table: 1br rate, as before
+        rate = rate_index.get((hood, "1br")) or rate_index.get(("default", "1br"))
+    return rate
+
+
+_LAUNDRY_BONUS = {"in_unit": 6, "in_building": 2}
+
+
+def _score_columns_np(discounts, beds, baths, sqft, extras):
+    """deal_score per listing from discount/bed/bath/sqft columns plus laundry+parking bonus (int64)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        has_beds = beds > 0
+        bath_ratio = baths / beds
+        sqft_per_bed = sqft / beds
+    base = 50 + np.trunc(discounts).astype(np.int64) + extras
+    # Bed:bath ratio and sqft bonuses only apply when both values are present (NaN compares False)
+    base += np.where(has_beds & (bath_ratio >= 1.0), 3, np.where(has_beds & (bath_ratio >= 0.75), 1, 0))
+    base += np.where(has_beds & (sqft_per_bed >= 600), 2, np.where(has_beds & (sqft_per_bed >= 500), 1, 0))
+    return np.clip(base, 0, 100)
+
+
+def _score_columns_loop(discounts, beds, baths, sqft, extras):
+    """Same as _score_columns_np as one fused loop; only used when numba can compile it."""
+    out = np.empty(discounts.shape[0], dtype=np.int64)
+    for i in range(discounts.shape[0]):
+        base = 50 + int(discounts[i]) + extras[i]
+        b = beds[i]
+        if b > 0:
+            ratio = baths[i] / b
+            if ratio >= 1.0:
+                base += 3
+            elif ratio >= 0.75:
+                base += 1
+            per_bed = sqft[i] / b
+            if per_bed >= 600:
+                base += 2
+            elif per_bed >= 500:
+                base += 1
+        out[i] = min(100, max(0, base))
+    return out
+
+
+_score_columns = njit(cache=True)(_score_columns_loop) if njit else _score_columns_np
+
+
+def _score_all(apartments, rate_index) -> list:
+    """Set discount_pct and deal_score for every listing (same logic as portal scoring); returns the valid ones.
 
     Semantics: discount_pct = (market_rate - price) / market_rate * 100
     - Positive discount_pct = price BELOW market = good deal
     - Negative discount_pct = price ABOVE market = bad deal (overpriced)
     Uses same bonuses as portal: laundry (+6/+2), parking (+4), bed:bath ratio (+3/+1), sqft (+2/+1)
+    The arithmetic runs column-wise over NumPy arrays built from the valid listings (numba-compiled when installed).
     """
-    if not apt.get("price"):
-        apt["deal_score"] = 0
-        apt["deal_analysis"] = "Price information missing."
-        apt["discount_pct"] = None
-        return False
-    bedrooms = apt.get("bedrooms")
-    if bedrooms is None:
-        apt["deal_score"] = 40
-        apt["deal_analysis"] = "Bedroom count not specified — difficult to evaluate value."
-        apt["discount_pct"] = None
-        return False
-    neighborhood = apt.get("neighborhood") or ""
-    hood_key = neighborhood.lower().strip().replace(" ", "-") if isinstance(neighborhood, str) else "default"
-    if hood_key not in market_rates:
-        hood_key = hood_key.replace("-", " ")
-    hood_rates = market_rates.get(hood_key, market_rates["default"])
-    bed_key = "studio" if bedrooms == 0 else f"{min(bedrooms, 3)}br"
-    market_rate = hood_rates.get(bed_key, hood_rates.get("1br"))
-    # Below market → positive % (good); above market → negative % (bad)
-    discount_pct = round((market_rate - apt["price"]) / market_rate * 100, 1) if market_rate else 0
-    apt["discount_pct"] = discount_pct
-    base = 50 + int(discount_pct)
-    # Same bonuses as portal scoring for consistency
-    if apt.get("laundry_type") == "in_unit":
-        base += 6
-    elif apt.get("laundry_type") == "in_building":
-        base += 2
-    if apt.get("parking"):
-        base += 4
-    # Bed:bath ratio bonus (only if both present)
-    baths = apt.get("bathrooms")
-    if baths is not None and bedrooms is not None and bedrooms > 0:
-        if baths / bedrooms >= 1.0:
-            base += 3
-        elif baths / bedrooms >= 0.75:
-            base += 1
-    # Sqft bonus (only if present)
-    sqft = apt.get("sqft")
-    if sqft and bedrooms and bedrooms > 0:
-        sqft_per_bed = sqft / bedrooms
-        if sqft_per_bed >= 600:
-            base += 2
-        elif sqft_per_bed >= 500:
-            base += 1
-    apt["deal_score"] = min(100, max(0, base))
-    apt["deal_analysis"] = None  # filled by AI for top N, or placeholder for rest
-    return True
-
-
-def _call_claude_for_apartment(apt, market_rate):
-    """Call Claude once for this apartment; set apt['deal_score'] and apt['deal_analysis']."""
-    discount_pct = apt.get("discount_pct", 0)
-    bed_str = "Studio" if apt["bedrooms"] == 0 else f"{apt['bedrooms']} bedroom"
-    bath_str = f"{apt['bathrooms']} bath" if apt.get("bathrooms") else "bath unknown"
-    sqft_str = f"{apt['sqft']} sqft" if apt.get("sqft") else "size unknown"
-    price_sqft_str = f"${apt['price_per_sqft']}/sqft" if apt.get("price_per_sqft") else "N/A"
-    laundry_str = apt.get("laundry_type") == "in_unit" and "In-unit washer/dryer" or (apt.get("laundry_type") == "in_building" and "Laundry in building" or "Laundry not specified")
-    parking_str = "Parking mentioned (incl. or available)" if apt.get("parking") else "Parking not mentioned"
-    context = (
-        f"Apartment: ${apt['price']}/month, {bed_str}, {bath_str}, {sqft_str}\n"
-        f"Location: {apt['neighborhood']}\n"
-        f"Price per sqft: {price_sqft_str}\n"
-        f"Market rate for this unit type: ${market_rate}\n"
-        f"Price vs market: {discount_pct:+.1f}% (positive = below market / good; negative = above market / overpriced)\n"
-        f"Laundry: {laundry_str}. Parking: {parking_str}.\n"
-        f"Title: {apt['title']}"
-    )
-    if not _anthropic:
-        if discount_pct and discount_pct > 0:
-            apt["deal_analysis"] = f"About {discount_pct:.0f}% below market (good). Set ANTHROPIC_API_KEY for AI analysis."
-        elif discount_pct and discount_pct < 0:
-            apt["deal_analysis"] = f"About {abs(discount_pct):.0f}% above market (overpriced). Set ANTHROPIC_API_KEY for AI analysis."
+    valid, rates = [], []
+    for apt in apartments:
+        if not apt.get("price"):
+            apt["deal_score"] = 0
+            apt["deal_analysis"] = "Price information missing."
+            apt["discount_pct"] = None
+        elif apt.get("bedrooms") is None:
+            apt["deal_score"] = 40
+            apt["deal_analysis"] = "Bedroom count not specified — difficult to evaluate value."
+            apt["discount_pct"] = None
         else:
-            apt["deal_analysis"] = "Roughly at market. Set ANTHROPIC_API_KEY for AI analysis."
-        return
-    try:
-        response = _anthropic.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=280,
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"""{context}
+            valid.append(apt)
+            rates.append(_lookup_market_rate(rate_index, apt.get("neighborhood") or "", apt["bedrooms"]) or 0)
+    if not valid:
+        return valid
+    cols = to_columnar(valid, ("price", "bedrooms", "bathrooms", "sqft"))
+    rate = np.array(rates, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw = (rate - cols["price"]) / rate * 100
+    # Python's round() per value keeps discount_pct identical to the scalar formula (np.round differs at ties)
+    discounts = [round(d, 1) if r else 0 for d, r in zip(raw.tolist(), rates)]
+    extras = np.fromiter(
+        (_LAUNDRY_BONUS.get(apt.get("laundry_type"), 0) + (4 if apt.get("parking") else 0) for apt in valid),
+        dtype=np.int64, count=len(valid),
+    )
+    scores = _score_columns(
+        np.array(discounts, dtype=np.float64), cols["bedrooms"], cols["bathrooms"], cols["sqft"], extras
+    ).tolist()
+    for apt, score, discount_pct in zip(valid, scores, discounts):
+        apt["discount_pct"] = discount_pct
+        apt["deal_score"] = score
+        apt["deal_analysis"] = None  # filled by AI for top N, or placeholder for rest
+    return valid
 
-Give a short overview of this apartment and rate it as a deal (0-100). Be specific about why it stands out vs similar listings—or why it doesn't.
+
+_APARTMENT_MODEL = "claude-sonnet-4-20250514"
+_APARTMENT_MAX_TOKENS = 280
+# Constant instructions after the per-apartment context block
+_CLAUDE_PROMPT_TAIL = """Give a short overview of this apartment and rate it as a deal (0-100). Be specific about why it stands out vs similar listings—or why it doesn't.
 
 What to consider:
 - Price vs market: below market = better deal; above = overpriced.
@@ -1289,24 +1857,120 @@ In your analysis, say concretely what makes this a better or worse deal than oth
 
 Format your response as:
 SCORE: [number 0-100]
-ANALYSIS: [2-3 sentences: brief overview of the unit, then specific reasons it's a better or worse deal than similar listings]""",
-                }
-            ],
-        )
-        text = response.content[0].text
-        score_match = re.search(r"SCORE:\s*(\d+)", text)
-        analysis_match = re.search(r"ANALYSIS:\s*(.+)", text, re.DOTALL)
-        apt["deal_score"] = int(score_match.group(1)) if score_match else apt.get("deal_score", 50)
-        if analysis_match:
-            analysis_text = analysis_match.group(1).strip()
-            sentences = [s.strip() for s in analysis_text.split(".") if s.strip()][:3]
-            apt["deal_analysis"] = ". ".join(sentences).strip() + ("." if sentences else "")
+ANALYSIS: [2-3 sentences: brief overview of the unit, then specific reasons it's a better or worse deal than similar listings]"""
+_LAUNDRY_LABELS = {"in_unit": "In-unit washer/dryer", "in_building": "Laundry in building"}
+
+
+def _apartment_prompt(apt, market_rate) -> str:
+    """User prompt asking Claude to score one apartment."""
+    discount_pct = apt.get("discount_pct", 0)
+    bed_str = "Studio" if apt["bedrooms"] == 0 else f"{apt['bedrooms']} bedroom"
+    bath_str = f"{apt['bathrooms']} bath" if apt.get("bathrooms") else "bath unknown"
+    sqft_str = f"{apt['sqft']} sqft" if apt.get("sqft") else "size unknown"
+    price_sqft_str = f"${apt['price_per_sqft']}/sqft" if apt.get("price_per_sqft") else "N/A"
+    laundry_str = _LAUNDRY_LABELS.get(apt.get("laundry_type"), "Laundry not specified")
+    parking_str = "Parking mentioned (incl. or available)" if apt.get("parking") else "Parking not mentioned"
+    return "\n".join((
+        f"Apartment: ${apt['price']}/month, {bed_str}, {bath_str}, {sqft_str}",
+        f"Location: {apt['neighborhood']}",
+        f"Price per sqft: {price_sqft_str}",
+        f"Market rate for this unit type: ${market_rate}",
+        f"Price vs market: {discount_pct:+.1f}% (positive = below market / good; negative = above market / overpriced)",
+        f"Laundry: {laundry_str}. Parking: {parking_str}.",
+        f"Title: {apt['title']}",
+        "",
+        _CLAUDE_PROMPT_TAIL,
+    ))
+
+
+def _apply_claude_text(apt, text: str) -> None:
+    """Parse a SCORE:/ANALYSIS: reply into apt['deal_score'] and apt['deal_analysis']."""
+    score_match = _SCORE_RE.search(text)
+    analysis_match = _ANALYSIS_RE.search(text)
+    apt["deal_score"] = int(score_match.group(1)) if score_match else apt.get("deal_score", 50)
+    if analysis_match:
+        analysis_text = analysis_match.group(1).strip()
+        sentences = [s.strip() for s in analysis_text.split(".") if s.strip()][:3]
+        apt["deal_analysis"] = ". ".join(sentences).strip() + ("." if sentences else "")
+    else:
+        apt["deal_analysis"] = "Reasonable option in this price range."
+
+
+def _mark_claude_failed(apt) -> None:
+    """Placeholder analysis when a Claude call fails."""
+    apt["deal_analysis"] = "AI analysis unavailable — manual review recommended."
+    apt["deal_score"] = apt.get("deal_score", 50)
+
+
+def _call_claude_for_apartment(apt, market_rate):
+    """Call Claude once for this apartment; set apt['deal_score'] and apt['deal_analysis']."""
+    client = _get_anthropic()
+    if not client:
+        discount_pct = apt.get("discount_pct", 0)
+        if discount_pct and discount_pct > 0:
+            apt["deal_analysis"] = f"About {discount_pct:.0f}% below market (good). Set ANTHROPIC_API_KEY for AI analysis."
+        elif discount_pct and discount_pct < 0:
+            apt["deal_analysis"] = f"About {abs(discount_pct):.0f}% above market (overpriced). Set ANTHROPIC_API_KEY for AI analysis."
         else:
-            apt["deal_analysis"] = "Reasonable option in this price range."
+            apt["deal_analysis"] = "Roughly at market. Set ANTHROPIC_API_KEY for AI analysis."
+        return
+    try:
+        response = client.messages.create(
+            model=_APARTMENT_MODEL,
+            max_tokens=_APARTMENT_MAX_TOKENS,
+            messages=[{"role": "user", "content": _apartment_prompt(apt, market_rate)}],
+        )
+        _apply_claude_text(apt, response.content[0].text)
     except Exception as e:
         logger.warning("Claude analysis failed: %s", e)
-        apt["deal_analysis"] = "AI analysis unavailable — manual review recommended."
-        apt["deal_score"] = apt.get("deal_score", 50)
+        _mark_claude_failed(apt)
+
+
+def _run_claude_batch(client, jobs) -> list:
+    """
+    Analyze (apt, market_rate) jobs through one Message Batches request (half the per-token price).
+    Waits up to APARTMENT_AI_BATCH_TIMEOUT; returns the jobs that got no result so the caller can
+    fall back to direct calls (everything if the batch could not be created).
+    """
+    try:
+        batch = client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": f"apt-{i}",
+                    "params": {
+                        "model": _APARTMENT_MODEL,
+                        "max_tokens": _APARTMENT_MAX_TOKENS,
+                        "messages": [{"role": "user", "content": _apartment_prompt(apt, rate)}],
+                    },
+                }
+                for i, (apt, rate) in enumerate(jobs)
+            ]
+        )
+    except Exception as e:
+        logger.warning("Claude batch create failed, using direct calls: %s", e)
+        return list(jobs)
+    deadline = time.monotonic() + APARTMENT_AI_BATCH_TIMEOUT
+    pending = dict(enumerate(jobs))  # popped as results arrive; whatever is left falls back
+    try:
+        while batch.processing_status != "ended":
+            if time.monotonic() >= deadline:
+                logger.warning("Claude batch %s still %s after %ss; cancelling", batch.id, batch.processing_status, APARTMENT_AI_BATCH_TIMEOUT)
+                client.messages.batches.cancel(batch.id)
+                return list(pending.values())
+            time.sleep(APARTMENT_AI_BATCH_POLL)
+            batch = client.messages.batches.retrieve(batch.id)
+        for result in client.messages.batches.results(batch.id):
+            idx = int(result.custom_id.rpartition("-")[2])
+            apt = pending.pop(idx)[0]
+            if result.result.type == "succeeded":
+                _apply_claude_text(apt, result.result.message.content[0].text)
+            else:
+                logger.warning("Claude batch item %s: %s", apt.get("url"), result.result.type)
+                _mark_claude_failed(apt)
+    except Exception as e:
+        logger.warning("Claude batch %s failed, using direct calls for %s unfinished: %s", batch.id, len(pending), e)
+        return list(pending.values())
+    return list(pending.values())
 
 
 def analyze_apartment_deals(apartments, max_analyze=None, get_market_rates=None):
@@ -1318,44 +1982,44 @@ def analyze_apartment_deals(apartments, max_analyze=None, get_market_rates=None)
     if not apartments:
         return []
     top_n = max_analyze if max_analyze is not None else AI_ANALYSIS_TOP_N
-    market_rates = (get_market_rates or get_neighborhood_market_rates)()
-
-    # First pass (parallel): set discount_pct and simple score for everyone (no API calls)
-    def _score_one(args):
-        apt, rates = args
-        return (apt, _compute_discount_and_score(apt, rates))
+    rate_index = _market_rate_index((get_market_rates or get_neighborhood_market_rates)())
 
-    with ThreadPoolExecutor(max_workers=SCORE_MAX_WORKERS) as executor:
-        scored = list(executor.map(_score_one, [(apt, market_rates) for apt in apartments]))
-    valid = [apt for apt, ok in scored if ok]
+    # First pass: set discount_pct and simple score for everyone (no API calls; threads would only add GIL contention)
+    valid = _score_all(apartments, rate_index)
 
-    # Sort by deal_score, then by discount for AI selection
-    valid.sort(key=lambda x: (x.get("deal_score", 0), (x.get("discount_pct") or -999)), reverse=True)
-    top_for_ai = valid[:top_n]
+    # Best by deal_score, then discount, for AI selection (partial selection; one full sort at the end)
+    rank_key = lambda x: (x.get("deal_score", 0), (x.get("discount_pct") or -999))
+    top_for_ai = heapq.nlargest(top_n, valid, key=rank_key) if top_n > 0 else []
 
     # Run Claude only for top N (cost control)
     def _market_rate_for(apt):
-        hood_key = apt["neighborhood"].lower().strip().replace(" ", "-")
-        if hood_key not in market_rates:
-            hood_key = hood_key.replace("-", " ")
-        hood_rates = market_rates.get(hood_key, market_rates["default"])
-        bed_key = "studio" if apt["bedrooms"] == 0 else f"{min(apt['bedrooms'], 3)}br"
-        return hood_rates.get(bed_key, hood_rates.get("1br"))
-
-    def _call_claude_task(args):
-        apt, rate = args
-        _call_claude_for_apartment(apt, rate)
-
-    with ThreadPoolExecutor(max_workers=AI_MAX_WORKERS) as executor:
-        tasks = [(apt, _market_rate_for(apt)) for apt in top_for_ai]
-        list(executor.map(_call_claude_task, tasks))
+        return _lookup_market_rate(rate_index, apt.get("neighborhood") or "", apt["bedrooms"])
+
+    client = _get_anthropic()
+    jobs = [(apt, _market_rate_for(apt)) for apt in top_for_ai]
+    if client and jobs and APARTMENT_AI_BATCH:
+        jobs = _run_claude_batch(client, jobs)
+    if client and jobs:
+        with ThreadPoolExecutor(max_workers=min(AI_MAX_WORKERS, len(jobs))) as executor:
+            futures = {executor.submit(_call_claude_for_apartment, apt, rate): apt for apt, rate in jobs}
+            for fut in as_completed(futures):
+                try:
+                    fut.result()
+                except Exception as e:
+                    logger.warning("Claude analysis task failed for %s: %s", futures[fut].get("url"), e)
+    else:
+        for apt, rate in jobs:  # no API key: local placeholder text only
+            _call_claude_for_apartment(apt, rate)
 
     # Rest get a short placeholder (no AI call)
-    for apt in valid[top_n:]:
-        apt["deal_analysis"] = f"Not in top {top_n} — no AI summary. See price vs market % above."
-
-    # Final order by deal_score
-    valid.sort(key=lambda x: x.get("deal_score", 0), reverse=True)
+    if len(top_for_ai) < len(valid):
+        picked = {id(apt) for apt in top_for_ai}
+        for apt in valid:
+            if id(apt) not in picked:
+                apt["deal_analysis"] = f"Not in top {top_n} — no AI summary. See price vs market % above."
+
+    # Final order by deal_score (discount breaks ties, as in the selection above)
+    valid.sort(key=rank_key, reverse=True)
     return valid
 
 
@@ -1382,13 +2046,10 @@ def analyze_apartment_deals_cached(
 
     if uncached:
         analyzed = analyze_apartment_deals(uncached, max_analyze=top_n, get_market_rates=get_market_rates)
-        for apt in analyzed:
-            _set_cached_analysis(
-                apt.get("url"),
-                apt.get("deal_score"),
-                apt.get("deal_analysis"),
-                apt.get("discount_pct"),
-            )
+        _set_cached_analyses(
+            (apt.get("url"), apt.get("deal_score"), apt.get("deal_analysis"), apt.get("discount_pct"))
+            for apt in analyzed
+        )
         logger.info("Analyzed %s uncached listings (Claude used for top %s of those); %s served from cache", len(uncached), top_n, len(apartments) - len(uncached))
     else:
         logger.info("All %s listings served from cache (no Claude calls)", len(apartments))
@@ -1398,106 +2059,112 @@ def analyze_apartment_deals_cached(
     return apartments_sorted
 
 
+_SF_SAMPLE_APARTMENTS = (
+    MappingProxyType({
+        "title": "Spacious 2BR in Mission - Newly Renovated, Hardwood Floors",
+        "url": f"{CL_LISTING_BASE}/sfc/apa/",
+        "price": 3400,
+        "neighborhood": "Mission",
+        "bedrooms": 2,
+        "bathrooms": 1.0,
+        "sqft": 950,
+        "price_per_sqft": 3.58,
+        "price_per_bedroom": 1700,
+        "posted_date": "2026-02-16",
+        "deal_score": None,
+        "deal_analysis": None,
+        "discount_pct": None,
+    }),
+    MappingProxyType({
+        "title": "Charming Studio near Golden Gate Park - Perfect for Singles",
+        "url": f"{CL_LISTING_BASE}/sfc/apa/",
+        "price": 2100,
+        "neighborhood": "Inner Sunset",
+        "bedrooms": 0,
+        "bathrooms": 1.0,
+        "sqft": 450,
+        "price_per_sqft": 4.67,
+        "price_per_bedroom": None,
+        "posted_date": "2026-02-15",
+        "deal_score": None,
+        "deal_analysis": None,
+        "discount_pct": None,
+    }),
+    MappingProxyType({
+        "title": "Modern 1BR in SoMa - Walk to Tech Companies",
+        "url": f"{CL_LISTING_BASE}/sfc/apa/",
+        "price": 2950,
+        "neighborhood": "SoMa",
+        "bedrooms": 1,
+        "bathrooms": 1.0,
+        "sqft": 700,
+        "price_per_sqft": 4.21,
+        "price_per_bedroom": 2950,
+        "posted_date": "2026-02-14",
+        "deal_score": None,
+        "deal_analysis": None,
+        "discount_pct": None,
+    }),
+)
+
+
 def get_sample_apartments():
-    """Sample data when scraping fails or for demo."""
-    return [
-        {
-            "title": "Spacious 2BR in Mission - Newly Renovated, Hardwood Floors",
-            "url": f"{CL_LISTING_BASE}/sfc/apa/",
-            "price": 3400,
-            "neighborhood": "Mission",
-            "bedrooms": 2,
-            "bathrooms": 1.0,
-            "sqft": 950,
-            "price_per_sqft": 3.58,
-            "price_per_bedroom": 1700,
-            "posted_date": "2026-02-16",
-            "deal_score": None,
-            "deal_analysis": None,
-            "discount_pct": None,
-        },
-        {
-            "title": "Charming Studio near Golden Gate Park - Perfect for Singles",
-            "url": f"{CL_LISTING_BASE}/sfc/apa/",
-            "price": 2100,
-            "neighborhood": "Inner Sunset",
-            "bedrooms": 0,
-            "bathrooms": 1.0,
-            "sqft": 450,
-            "price_per_sqft": 4.67,
-            "price_per_bedroom": None,
-            "posted_date": "2026-02-15",
-            "deal_score": None,
-            "deal_analysis": None,
-            "discount_pct": None,
-        },
-        {
-            "title": "Modern 1BR in SoMa - Walk to Tech Companies",
-            "url": f"{CL_LISTING_BASE}/sfc/apa/",
-            "price": 2950,
-            "neighborhood": "SoMa",
-            "bedrooms": 1,
-            "bathrooms": 1.0,
-            "sqft": 700,
-            "price_per_sqft": 4.21,
-            "price_per_bedroom": 2950,
-            "posted_date": "2026-02-14",
-            "deal_score": None,
-            "deal_analysis": None,
-            "discount_pct": None,
-        },
-    ]
+    """Sample data when scraping fails or for demo. Fresh dicts each call: callers score them in place."""
+    return [dict(row) for row in _SF_SAMPLE_APARTMENTS]
+
+
+_STANFORD_SAMPLE_APARTMENTS = (
+    MappingProxyType({
+        "title": "Studio near Stanford - Walk to Campus",
+        "url": f"{CL_LISTING_BASE}/pen/apa/",
+        "price": 1950,
+        "neighborhood": "Palo Alto",
+        "bedrooms": 0,
+        "bathrooms": 1.0,
+        "sqft": 450,
+        "price_per_sqft": 4.33,
+        "price_per_bedroom": None,
+        "posted_date": None,
+        "deal_score": None,
+        "deal_analysis": None,
+        "discount_pct": None,
+    }),
+    MappingProxyType({
+        "title": "1BR in Menlo Park - Near Caltrain",
+        "url": f"{CL_LISTING_BASE}/pen/apa/",
+        "price": 2400,
+        "neighborhood": "Menlo Park",
+        "bedrooms": 1,
+        "bathrooms": 1.0,
+        "sqft": 650,
+        "price_per_sqft": 3.69,
+        "price_per_bedroom": 2400,
+        "posted_date": None,
+        "deal_score": None,
+        "deal_analysis": None,
+        "discount_pct": None,
+    }),
+    MappingProxyType({
+        "title": "2BR Shared - Redwood City, Student Friendly",
+        "url": f"{CL_LISTING_BASE}/pen/apa/",
+        "price": 3200,
+        "neighborhood": "Redwood City",
+        "bedrooms": 2,
+        "bathrooms": 2.0,
+        "sqft": 950,
+        "price_per_sqft": 3.37,
+        "price_per_bedroom": 1600,
+        "posted_date": None,
+        "deal_score": None,
+        "deal_analysis": None,
+        "discount_pct": None,
+    }),
+)
 
 
 def get_sample_apartments_stanford():
-    """Sample peninsula listings when Stanford area scrape fails."""
-    return [
-        {
-            "title": "Studio near Stanford - Walk to Campus",
-            "url": f"{CL_LISTING_BASE}/pen/apa/",
-            "price": 1950,
-            "neighborhood": "Palo Alto",
-            "bedrooms": 0,
-            "bathrooms": 1.0,
-            "sqft": 450,
-            "price_per_sqft": 4.33,
-            "price_per_bedroom": None,
-            "posted_date": None,
-            "deal_score": None,
-            "deal_analysis": None,
-            "discount_pct": None,
-        },
-        {
-            "title": "1BR in Menlo Park - Near Caltrain",
-            "url": f"{CL_LISTING_BASE}/pen/apa/",
-            "price": 2400,
-            "neighborhood": "Menlo Park",
-            "bedrooms": 1,
-            "bathrooms": 1.0,
-            "sqft": 650,
-            "price_per_sqft": 3.69,
-            "price_per_bedroom": 2400,
-            "posted_date": None,
-            "deal_score": None,
-            "deal_analysis": None,
-            "discount_pct": None,
-        },
-        {
-            "title": "2BR Shared - Redwood City, Student Friendly",
-            "url": f"{CL_LISTING_BASE}/pen/apa/",
-            "price": 3200,
-            "neighborhood": "Redwood City",
-            "bedrooms": 2,
-            "bathrooms": 2.0,
-            "sqft": 950,
-            "price_per_sqft": 3.37,
-            "price_per_bedroom": 1600,
-            "posted_date": None,
-            "deal_score": None,
-            "deal_analysis": None,
-            "discount_pct": None,
-        },
-    ]
+    """Sample peninsula listings when Stanford area scrape fails. Fresh dicts each call: callers score them in place."""
+    return [dict(row) for row in _STANFORD_SAMPLE_APARTMENTS]
 
 
 if __name__ == "__main__":
@@ -8,8 +8,10 @@ import logging
 import math
 import sqlite3
 import threading
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,7 @@ except ImportError:
     DB_PATH = Path(__file__).resolve().parent / "market_dashboard.db"
 
 _lock = threading.Lock()
+_tls = threading.local()  # one open connection per thread, reused for the thread's lifetime
 
 
 def _num(x, default=0.0):
@@ -33,13 +36,45 @@ def _num(x, default=0.0):
 
 
 def get_conn():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    """
+    This thread's connection, opened on first use and kept open (no connect/close per call).
+    synchronous is per-connection; NORMAL under WAL stays corruption-safe without an fsync per commit.
+    Writers use `with conn:` so a failed statement rolls back instead of leaving a transaction open.
+    """
+    conn = getattr(_tls, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=5.0)  # timeout = busy_timeout
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _tls.conn = conn
+    return conn
+
+
+def open_cache_table(path, table: str, columns: str, ttl: Optional[float] = None) -> Optional[sqlite3.Connection]:
+    """
+    Open a persistent cache table once at import: one shared connection (callers serialize with their own lock),
+    WAL + synchronous=NORMAL, rows older than ttl seconds pruned via the table's ts column.
+    Returns None when the file can't be opened; callers then run memory-only / uncached.
+    """
+    try:
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+        if ttl is not None:
+            conn.execute(f"DELETE FROM {table} WHERE ts < ?", (time.time() - ttl,))
+        conn.commit()
+        return conn
+    except sqlite3.Error as e:
+        logger.warning("Cache table %s unavailable at %s: %s", table, path, e)
+        return None
 
 
 def init_db():
     with _lock:
         conn = get_conn()
-        try:
+        # WAL: readers don't block the refresh writer; persists in the DB file
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
             conn.executescript("""
                 CREATE TABLE IF NOT EXISTS portfolio_snapshots (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -76,42 +111,50 @@ def init_db():
                     last_reset TEXT NOT NULL
                 );
             """)
-            conn.commit()
-        finally:
-            conn.close()
 
 
 def save_portfolio_snapshot(ticker: str, price: float, change_percent: float, volume: int, analysis: str, competitor_context: str):
+    save_portfolio_snapshots_batch([(ticker, price, change_percent, volume, analysis, competitor_context)])
+
+
+def save_portfolio_snapshots_batch(rows: list[tuple]):
+    """Insert many (ticker, price, change_percent, volume, analysis, competitor_context) rows in one transaction."""
+    if not rows:
+        return
     ts = datetime.utcnow().isoformat() + "Z"
-    price = _num(price, 0.0)
-    change_percent = _num(change_percent, 0.0)
-    volume = int(_num(volume, 0))
+    params = [
+        (ticker, _num(price, 0.0), _num(change_percent, 0.0), int(_num(volume, 0)), analysis or "", competitor_context or "", ts)
+        for ticker, price, change_percent, volume, analysis, competitor_context in rows
+    ]
     with _lock:
         conn = get_conn()
-        try:
-            conn.execute(
+        with conn:
+            conn.executemany(
                 "INSERT INTO portfolio_snapshots (ticker, price, change_percent, volume, analysis, competitor_context, timestamp) VALUES (?,?,?,?,?,?,?)",
-                (ticker, price, change_percent, volume, analysis or "", competitor_context or "", ts),
+                params,
             )
-            conn.commit()
-        finally:
-            conn.close()
 
 
 def save_trending_snapshot(ticker: str, price: float, change_percent: float, trend_reason: str, analysis: str):
+    save_trending_snapshots_batch([(ticker, price, change_percent, trend_reason, analysis)])
+
+
+def save_trending_snapshots_batch(rows: list[tuple]):
+    """Insert many (ticker, price, change_percent, trend_reason, analysis) rows in one transaction."""
+    if not rows:
+        return
     ts = datetime.utcnow().isoformat() + "Z"
-    price = _num(price, 0.0)
-    change_percent = _num(change_percent, 0.0)
+    params = [
+        (ticker, _num(price, 0.0), _num(change_percent, 0.0), trend_reason or "", analysis or "", ts)
+        for ticker, price, change_percent, trend_reason, analysis in rows
+    ]
     with _lock:
         conn = get_conn()
-        try:
-            conn.execute(
+        with conn:
+            conn.executemany(
                 "INSERT INTO trending_snapshots (ticker, price, change_percent, trend_reason, analysis, timestamp) VALUES (?,?,?,?,?,?)",
-                (ticker, price, change_percent, trend_reason or "", analysis or "", ts),
+                params,
             )
-            conn.commit()
-        finally:
-            conn.close()
 
 
 def get_monthly_api_call_count() -> int:
@@ -119,53 +162,36 @@ def get_monthly_api_call_count() -> int:
     from datetime import datetime
     month_year = datetime.now().strftime("%Y-%m")
     with _lock:
-        conn = get_conn()
-        try:
-            row = conn.execute(
-                "SELECT call_count FROM api_call_counter WHERE month_year = ?",
-                (month_year,)
-            ).fetchone()
-            return int(row[0]) if row else 0
-        finally:
-            conn.close()
+        row = get_conn().execute(
+            "SELECT call_count FROM api_call_counter WHERE month_year = ?",
+            (month_year,)
+        ).fetchone()
+        return int(row[0]) if row else 0
 
 
 def increment_api_call_count() -> bool:
     """
     Increment API call count for current month. Returns True if successful.
     If count >= 50, returns False and does not increment.
-    Uses atomic UPDATE with WHERE clause to prevent going over limit.
+    One UPSERT (SQLite 3.35+ for RETURNING): inserts the month at 1 or increments while under the limit.
     """
     from datetime import datetime
     month_year = datetime.now().strftime("%Y-%m")
     now_iso = datetime.utcnow().isoformat() + "Z"
     with _lock:
         conn = get_conn()
-        try:
-            # First, ensure record exists
-            conn.execute(
-                "INSERT OR IGNORE INTO api_call_counter (month_year, call_count, last_reset) VALUES (?, 0, ?)",
+        with conn:
+            row = conn.execute(
+                "INSERT INTO api_call_counter (month_year, call_count, last_reset) VALUES (?, 1, ?) "
+                "ON CONFLICT(month_year) DO UPDATE SET call_count = call_count + 1 WHERE call_count < 50 "
+                "RETURNING call_count",
                 (month_year, now_iso)
-            )
-            # Atomic increment only if count < 50
-            cursor = conn.execute(
-                "UPDATE api_call_counter SET call_count = call_count + 1 WHERE month_year = ? AND call_count < 50",
-                (month_year,)
-            )
-            conn.commit()
-            # If rows_affected > 0, increment succeeded
-            success = cursor.rowcount > 0
-            if not success:
-                # Check if we're at limit
-                row = conn.execute(
-                    "SELECT call_count FROM api_call_counter WHERE month_year = ?",
-                    (month_year,)
-                ).fetchone()
-                if row and int(row[0]) >= 50:
-                    logger.warning(f"API call limit reached: {int(row[0])}/50 for {month_year}")
-            return success
-        finally:
-            conn.close()
+            ).fetchone()
+    # No row returned: the month's count was already at the limit and was left unchanged
+    if row is None:
+        logger.warning("API call limit reached (50/month) for %s", month_year)
+        return False
+    return True
 
 
 def reset_monthly_api_counter_if_needed():
@@ -175,15 +201,12 @@ def reset_monthly_api_counter_if_needed():
     now_iso = datetime.utcnow().isoformat() + "Z"
     with _lock:
         conn = get_conn()
-        try:
-            # Check if we need to reset (new month)
-            row = conn.execute(
-                "SELECT month_year FROM api_call_counter WHERE month_year != ?",
-                (month_year,)
-            ).fetchone()
-            if row:
-                # Delete old month records
+        # Check if we need to reset (new month)
+        row = conn.execute(
+            "SELECT month_year FROM api_call_counter WHERE month_year != ?",
+            (month_year,)
+        ).fetchone()
+        if row:
+            # Delete old month records
+            with conn:
                 conn.execute("DELETE FROM api_call_counter WHERE month_year != ?", (month_year,))
-                conn.commit()
-        finally:
-            conn.close()
@@ -3,19 +3,31 @@ Economic calendar: hybrid real data (FRED) + hardcoded 2026 schedule.
 Recent releases: FRED API actuals. Upcoming: hardcoded FOMC, Jobs, CPI, etc. with countdown timers.
 """
 
+import json
 import logging
 import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 
-import requests
 from dotenv import load_dotenv
 
+from database import open_cache_table
+from http_client import HTTP
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-FRED_API_KEY = os.getenv("FRED_API_KEY")
+try:
+    from config import ANALYSIS_CACHE_PATH, FRED_API_KEY, FRED_CACHE_TTL
+except ImportError:
+    FRED_API_KEY = os.getenv("FRED_API_KEY")
+    FRED_CACHE_TTL = int(os.getenv("FRED_CACHE_TTL", "21600"))
+    ANALYSIS_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.getenv("ANALYSIS_CACHE_FILE", "analysis_cache.db"))
 
 # Eastern time: use ZoneInfo when available (Python 3.9+, tzdata on Linux); else fixed UTC-5
 try:
@@ -97,15 +109,55 @@ def _release_ts(date_str: str, time_str: str) -> int:
         return 0
 
 
+_fred_cache = (
+    open_cache_table(ANALYSIS_CACHE_PATH, "fred_observations", "key TEXT PRIMARY KEY, ts REAL, obs TEXT", ttl=FRED_CACHE_TTL)
+    if FRED_CACHE_TTL > 0
+    else None
+)
+_fred_cache_lock = threading.Lock()
+
+
+def _get_cached_fred(key: str):
+    if _fred_cache is None:
+        return None
+    try:
+        with _fred_cache_lock:
+            row = _fred_cache.execute("SELECT ts, obs FROM fred_observations WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error as e:
+        logger.warning("FRED disk cache read failed: %s", e)
+        return None
+    if row and time.time() - row[0] < FRED_CACHE_TTL:
+        return json.loads(row[1])
+    return None
+
+
+def _set_cached_fred(key: str, obs: list[dict]) -> None:
+    if _fred_cache is None:
+        return
+    try:
+        with _fred_cache_lock, _fred_cache:
+            _fred_cache.execute(
+                "INSERT OR REPLACE INTO fred_observations (key, ts, obs) VALUES (?, ?, ?)",
+                (key, time.time(), json.dumps(obs)),
+            )
+    except sqlite3.Error as e:
+        logger.warning("FRED disk cache write failed: %s", e)
+
+
 def _fetch_fred_observations(series_id: str, days_back: int = 60) -> list[dict]:
-    """Fetch FRED observations (date, value) for the last days_back days. Returns list sorted by date desc."""
+    """Fetch FRED observations (date, value) for the last days_back days. Returns list sorted by date desc.
+    Successful responses are reused from the disk cache for FRED_CACHE_TTL seconds."""
     if not FRED_API_KEY:
         return []
+    cache_key = f"{series_id}:{days_back}"
+    cached = _get_cached_fred(cache_key)
+    if cached is not None:
+        return cached
     url = "https://api.stlouisfed.org/fred/series/observations"
     end = datetime.now().date()
     start = end - timedelta(days=days_back)
     try:
-        r = requests.get(
+        r = HTTP.get(
             url,
             params={
                 "series_id": series_id,
@@ -129,6 +181,7 @@ def _fetch_fred_observations(series_id: str, days_back: int = 60) -> list[dict]:
                     out.append({"date": o["date"], "value": float(val)})
                 except (TypeError, ValueError):
                     pass
+        _set_cached_fred(cache_key, out)
         return out
     except Exception as e:
         logger.warning("FRED %s: %s", series_id, e)
@@ -154,6 +207,10 @@ def _format_value(value: float, series_id: str) -> str:
 _LOWER_IS_BETTER = {"CPIAUCSL", "CPILFESL", "UNRATE"}
 
 
+# One long-lived pool for the per-series FRED requests (HTTP already reuses keep-alive connections)
+_fred_pool = ThreadPoolExecutor(max_workers=len(FRED_SERIES), thread_name_prefix="fred")
+
+
 def get_recent_releases(days_back: int = 95, max_per_series: int = 3) -> list[dict]:
     """
     Fetch FRED actuals. HIGH impact only, no jobless claims.
@@ -166,15 +223,14 @@ def get_recent_releases(days_back: int = 95, max_per_series: int = 3) -> list[di
         return []
     days = max(days_back, 95)
     obs_by_series: dict[str, list[dict]] = {}
-    with ThreadPoolExecutor(max_workers=min(5, len(high_impact))) as ex:
-        futures = {ex.submit(_fetch_fred_observations, series_id, days): series_id for series_id, _ in high_impact}
-        for fut in as_completed(futures, timeout=15):
-            series_id = futures[fut]
-            try:
-                obs_by_series[series_id] = fut.result()[: max_per_series + 1]
-            except Exception as e:
-                logger.warning("FRED %s: %s", series_id, e)
-                obs_by_series[series_id] = []
+    futures = {_fred_pool.submit(_fetch_fred_observations, series_id, days): series_id for series_id, _ in high_impact}
+    for fut in as_completed(futures, timeout=15):
+        series_id = futures[fut]
+        try:
+            obs_by_series[series_id] = fut.result()[: max_per_series + 1]
+        except Exception as e:
+            logger.warning("FRED %s: %s", series_id, e)
+            obs_by_series[series_id] = []
     out = []
     for series_id, cfg in high_impact:
         obs = obs_by_series.get(series_id, [])
@@ -216,20 +272,58 @@ def get_recent_releases(days_back: int = 95, max_per_series: int = 3) -> list[di
     return out[:3]  # Only last 3 major events
 
 
+def _build_upcoming_schedule() -> tuple:
+    """(date, event template) for every hardcoded 2026 release, parsed once and sorted by date."""
+    specs = (
+        [(date_str, time_str, name, "5.25–5.50%", "fomc") for date_str, time_str, name in FOMC_2026]
+        + [(date_str, "8:30 AM ET", "Jobs Report", "—", "jobs") for date_str in JOBS_2026]
+        + [(date_str, "8:30 AM ET", name, "—", "inflation") for date_str in CPI_2026 for name in ("CPI", "Core CPI")]
+        + [(date_str, "8:30 AM ET", "GDP", "—", "gdp") for date_str in GDP_2026]
+    )
+    rows = []
+    for date_str, time_str, name, previous, icon in specs:
+        try:
+            d = datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            continue
+        forecast = PLACEHOLDER_FORECASTS.get(name, "—")
+        template = {
+            "event": name,
+            "date": date_str,
+            "time": time_str,
+            "release_ts": _release_ts(date_str, time_str),
+            "forecast": forecast,
+            "previous": previous,
+            "impact": "High",
+            "icon": icon,
+        }
+        if template["release_ts"] > 0:
+            # Static display fields; only the countdown depends on the current time
+            template["name"] = name
+            template["forecast_summary"] = f"Est: {forecast}"
+        rows.append((d, template))
+    rows.sort(key=lambda row: (row[0], row[1]["release_ts"], row[1]["event"]))
+    return tuple(rows)
+
+
+_UPCOMING_SCHEDULE = _build_upcoming_schedule()
+_UPCOMING_DATES = [d for d, _ in _UPCOMING_SCHEDULE]  # bisect index into _UPCOMING_SCHEDULE
+
+
 def _upcoming_events_next_60_days() -> list[dict]:
     """Build upcoming HIGH impact events (FOMC, Jobs, CPI, Core CPI, GDP). No jobless claims, no PPI."""
-    today = datetime.now(ET).date()
+    now = datetime.now(ET)
+    today = now.date()
     end = today + timedelta(days=60)
-    now_ts = datetime.now(ET).timestamp()
-    events = []
+    now_ts = now.timestamp()
 
     def add_upcoming(event: dict) -> None:
         release_ts = event["release_ts"]
         if release_ts <= 0:
             return
-        sec_until = release_ts - now_ts
-        days_until = int(sec_until // 86400)
-        hours_until = int((sec_until % 86400) // 3600)
+        days, rem = divmod(release_ts - now_ts, 86400)
+        days_until = int(days)
+        hours_until = int(rem // 3600)
         if days_until == 0:
             countdown_text = "TODAY" if hours_until > 0 else "NOW"
         elif days_until == 1:
@@ -244,91 +338,18 @@ def _upcoming_events_next_60_days() -> list[dict]:
             urgency = "high"
         else:
             urgency = "critical" if hours_until > 0 else "high"
-        event["name"] = event["event"]
         event["days_until"] = days_until
         event["hours_until"] = hours_until
         event["countdown_text"] = countdown_text
         event["urgency"] = urgency
-        event["forecast_summary"] = f"Est: {event.get('forecast', '—')}"
 
-    for date_str, time_str, name in FOMC_2026:
-        try:
-            d = datetime.strptime(date_str, "%Y-%m-%d").date()
-            if today <= d <= end:
-                e = {
-                    "event": name,
-                    "date": date_str,
-                    "time": time_str,
-                    "release_ts": _release_ts(date_str, time_str),
-                    "forecast": PLACEHOLDER_FORECASTS.get(name, "—"),
-                    "previous": "5.25–5.50%",
-                    "impact": "High",
-                    "icon": "fomc",
-                }
-                add_upcoming(e)
-                events.append(e)
-        except ValueError:
-            pass
-
-    for date_str in JOBS_2026:
-        try:
-            d = datetime.strptime(date_str, "%Y-%m-%d").date()
-            if today <= d <= end:
-                e = {
-                    "event": "Jobs Report",
-                    "date": date_str,
-                    "time": "8:30 AM ET",
-                    "release_ts": _release_ts(date_str, "8:30 AM ET"),
-                    "forecast": PLACEHOLDER_FORECASTS.get("Jobs Report", "—"),
-                    "previous": "—",
-                    "impact": "High",
-                    "icon": "jobs",
-                }
-                add_upcoming(e)
-                events.append(e)
-        except ValueError:
-            pass
-
-    for date_str in CPI_2026:
-        try:
-            d = datetime.strptime(date_str, "%Y-%m-%d").date()
-            if today <= d <= end:
-                for ev_name, fkey in (("CPI", "CPI"), ("Core CPI", "Core CPI")):
-                    e = {
-                        "event": ev_name,
-                        "date": date_str,
-                        "time": "8:30 AM ET",
-                        "release_ts": _release_ts(date_str, "8:30 AM ET"),
-                        "forecast": PLACEHOLDER_FORECASTS.get(fkey, "—"),
-                        "previous": "—",
-                        "impact": "High",
-                        "icon": "inflation",
-                    }
-                    add_upcoming(e)
-                    events.append(e)
-        except ValueError:
-            pass
-
-    for date_str in GDP_2026:
-        try:
-            d = datetime.strptime(date_str, "%Y-%m-%d").date()
-            if today <= d <= end:
-                e = {
-                    "event": "GDP",
-                    "date": date_str,
-                    "time": "8:30 AM ET",
-                    "release_ts": _release_ts(date_str, "8:30 AM ET"),
-                    "forecast": PLACEHOLDER_FORECASTS.get("GDP", "—"),
-                    "previous": "—",
-                    "impact": "High",
-                    "icon": "gdp",
-                }
-                add_upcoming(e)
-                events.append(e)
-        except ValueError:
-            pass
+    lo = bisect_left(_UPCOMING_DATES, today)
+    hi = bisect_right(_UPCOMING_DATES, end, lo)
+    events = [dict(template) for _, template in _UPCOMING_SCHEDULE[lo:hi]]
+    events.sort(key=lambda x: (x["release_ts"], x["event"]))  # a handful of rows
+    for e in events:
+        add_upcoming(e)
 
-    events.sort(key=lambda x: (x["release_ts"], x["event"]))
     seen = set()
     unique = []
     for e in events:
@@ -0,0 +1,52 @@
+"""
+Shared outbound HTTP session (FRED, RentCast, Craigslist).
+
+One requests.Session with pooled keep-alive connections per host, so repeated calls skip the
+TCP+TLS handshake. GETs retry twice on connection errors / 5xx; RentCast never retries (each
+call counts against the monthly budget). Responses are requested compressed (brotli when installed).
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import brotli  # noqa: F401 -- optional: lets urllib3 decode "br" responses
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_TIMEOUT = 15
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+class _TimeoutSession(requests.Session):
+    """Session that applies DEFAULT_TIMEOUT when the caller doesn't pass one."""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+def _build_session() -> requests.Session:
+    session = _TimeoutSession()
+    retry = Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # Longest prefix wins: metered API gets its own pool with no retries
+    session.mount("https://api.rentcast.io/", HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=0))
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING, "Connection": "keep-alive"})
+    return session
+
+
+HTTP = _build_session()
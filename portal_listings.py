@@ -13,9 +13,13 @@ from pathlib import Path
 from typing import Any
 from urllib.parse import quote_plus
 
-import requests
+try:
+    import orjson  # optional: faster load/save of the persistent cache file
+except ImportError:
+    orjson = None
 
 from database import get_monthly_api_call_count, increment_api_call_count, reset_monthly_api_counter_if_needed
+from http_client import HTTP
 
 try:
     from craigslist_scraper import get_neighborhood_market_rates, get_stanford_market_rates
@@ -25,17 +29,23 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-API_KEY = os.environ.get("RENTCAST_API_KEY", "").strip()
+# 7-day default cache to minimize API calls (50/month budget); min interval reduced from 120s to 5s
+try:
+    from config import RENTCAST_API_KEY, PORTAL_CACHE_TTL as CACHE_TTL, PORTAL_MIN_REQUEST_INTERVAL as MIN_REQUEST_INTERVAL, PORTAL_CACHE_FILE
+except ImportError:
+    RENTCAST_API_KEY = os.environ.get("RENTCAST_API_KEY", "")
+    CACHE_TTL = int(os.environ.get("PORTAL_CACHE_TTL", "604800"))
+    MIN_REQUEST_INTERVAL = int(os.environ.get("PORTAL_MIN_REQUEST_INTERVAL", "5"))
+    PORTAL_CACHE_FILE = os.environ.get("PORTAL_CACHE_FILE", "")
+
+API_KEY = RENTCAST_API_KEY.strip()
 BASE_URL = "https://api.rentcast.io/v1"
-# 7-day default cache to minimize API calls (50/month budget)
-CACHE_TTL = int(os.environ.get("PORTAL_CACHE_TTL", "604800"))
-MIN_REQUEST_INTERVAL = int(os.environ.get("PORTAL_MIN_REQUEST_INTERVAL", "5"))  # Reduced from 120s to 5s
 REQUEST_TIMEOUT = 25
 MAX_RESULTS = 100
 MAX_MONTHLY_CALLS = 50
 
 # Persistent cache path (survives restarts so deploys don't burn calls)
-_CACHE_FILE = os.environ.get("PORTAL_CACHE_FILE", "").strip() or (Path(__file__).resolve().parent / "data" / "portal_listings_cache.json")
+_CACHE_FILE = PORTAL_CACHE_FILE.strip() or (Path(__file__).resolve().parent / "data" / "portal_listings_cache.json")
 
 # Optional: static map image URL for card thumbnails. Use {lat} and {lon} placeholders.
 # Example (Mapbox): https://api.mapbox.com/styles/v1/mapbox/streets-v11/static/pin-l+ff0000({lon},{lat})/{lon},{lat},14,0/400x200@2x?access_token=YOUR_TOKEN
@@ -44,6 +54,7 @@ STATIC_MAP_URL_TEMPLATE = os.environ.get("STATIC_MAP_URL_TEMPLATE", "").strip()
 # Initialize cache structures BEFORE loading persistent cache
 _cache: dict[str, tuple[list[dict], float]] = {}
 _cache_lock = threading.Lock()
+_cache_file_lock = threading.Lock()  # serializes background writers of _CACHE_FILE
 _last_request: dict[str, float] = {}
 _request_lock = threading.Lock()
 # Cache API count for 5 seconds to avoid repeated DB queries
@@ -64,8 +75,8 @@ def _load_persistent_cache() -> None:
     if not path.exists():
         return
     try:
-        with open(path, "r") as f:
-            data = json.load(f)
+        raw = path.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
         if not isinstance(data, dict):
             return
         with _cache_lock:
@@ -88,8 +99,12 @@ def _save_persistent_cache() -> None:
             path.parent.mkdir(parents=True, exist_ok=True)
             with _cache_lock:
                 data = {k: {"entries": entries, "ts": ts} for k, (entries, ts) in _cache.items()}
-            with open(path, "w") as f:
-                json.dump(data, f, separators=(",", ":"))
+            raw = orjson.dumps(data) if orjson is not None else json.dumps(data, separators=(",", ":")).encode()
+            # Write-then-rename so a crash or concurrent load never sees a partial file
+            tmp = path.with_name(path.name + ".tmp")
+            with _cache_file_lock:
+                tmp.write_bytes(raw)
+                tmp.replace(path)
         except Exception as e:
             logger.warning("Could not save portal cache file %s: %s", path, e)
     
@@ -640,7 +655,7 @@ def _fetch(city: str, state: str, min_price: int, max_price: int, limit: int) ->
         return []
     
     try:
-        r = requests.get(
+        r = HTTP.get(
             f"{BASE_URL}/listings/rental/long-term",
             params={
                 "city": city,
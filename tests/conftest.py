@@ -0,0 +1,15 @@
+"""
+Offline test setup: repo root on sys.path, caches in a temp dir, no Anthropic client at import.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_tmp = tempfile.mkdtemp(prefix="dash-tests-")
+os.environ["ANALYSIS_CACHE_FILE"] = os.path.join(_tmp, "analysis_cache.db")
+os.environ["DATABASE_FILE"] = os.path.join(_tmp, "market_dashboard.db")
+os.environ["ANTHROPIC_API_KEY"] = ""  # load_dotenv won't override; modules fall back to placeholder text
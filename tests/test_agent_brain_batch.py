@@ -0,0 +1,61 @@
+"""Batched Claude calls: answers come back as a JSON array, anything else falls back to one call per prompt."""
+
+import pytest
+
+import agent_brain as brain
+
+
+@pytest.fixture
+def fake_claude(monkeypatch):
+    calls = []
+
+    def fake(user, max_tokens=300):
+        calls.append(user)
+        if user.startswith("Answer each"):
+            return fake.batch_reply
+        return f"single:{user}"
+
+    monkeypatch.setattr(brain, "_call_claude", fake)
+    fake.calls = calls
+    return fake
+
+
+@pytest.mark.parametrize(
+    "reply, expected",
+    [
+        ('["first", "second"]', ["first", "second"]),
+        # Prose and code fences around the array are ignored; "N:" inside answers is just text
+        ('Here you go:\n```json\n["Opens 10:30 ET", "1: support at $40"]\n```', ["Opens 10:30 ET", "1: support at $40"]),
+        ('["first", "  "]', ["first", None]),
+    ],
+)
+def test_batch_reads_json_array(fake_claude, reply, expected):
+    fake_claude.batch_reply = reply
+    assert brain._call_claude_batch(["p1", "p2"]) == expected
+    assert len(fake_claude.calls) == 1
+
+
+@pytest.mark.parametrize(
+    "reply",
+    [
+        "1. first\n\n2. second",  # numbered text instead of JSON
+        "1: first\n\n2: second",
+        '["only one"]',  # wrong count
+        '["first", 2]',  # non-string entry
+        "[not json",
+    ],
+)
+def test_batch_falls_back_to_single_calls(fake_claude, reply):
+    fake_claude.batch_reply = reply
+    assert brain._call_claude_batch(["p1", "p2"]) == ["single:p1", "single:p2"]
+    assert len(fake_claude.calls) == 3
+
+
+def test_single_call_failure_is_none(monkeypatch):
+    def fake(user, max_tokens=300):
+        if user == "bad":
+            raise RuntimeError("boom")
+        return "garbled" if user.startswith("Answer each") else "ok"
+
+    monkeypatch.setattr(brain, "_call_claude", fake)
+    assert brain._call_claude_batch(["good", "bad"]) == ["ok", None]
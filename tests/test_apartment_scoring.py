@@ -0,0 +1,94 @@
+"""Column-wise apartment scoring (NumPy and numba-loop paths) must match the original per-listing formula."""
+
+import copy
+
+import pytest
+
+import craigslist_scraper as cs
+
+NAN = float("nan")
+
+
+def _baseline_score(apt, rate_index):
+    """The scalar scoring the column-wise code replaced, kept verbatim as the reference."""
+    if not apt.get("price"):
+        return 0, None
+    bedrooms = apt.get("bedrooms")
+    if bedrooms is None:
+        return 40, None
+    market_rate = cs._lookup_market_rate(rate_index, apt.get("neighborhood") or "", bedrooms)
+    discount_pct = round((market_rate - apt["price"]) / market_rate * 100, 1) if market_rate else 0
+    base = 50 + int(discount_pct)
+    if apt.get("laundry_type") == "in_unit":
+        base += 6
+    elif apt.get("laundry_type") == "in_building":
+        base += 2
+    if apt.get("parking"):
+        base += 4
+    baths = apt.get("bathrooms")
+    if baths is not None and bedrooms is not None and bedrooms > 0:
+        if baths / bedrooms >= 1.0:
+            base += 3
+        elif baths / bedrooms >= 0.75:
+            base += 1
+    sqft = apt.get("sqft")
+    if sqft and bedrooms and bedrooms > 0:
+        sqft_per_bed = sqft / bedrooms
+        if sqft_per_bed >= 600:
+            base += 2
+        elif sqft_per_bed >= 500:
+            base += 1
+    return min(100, max(0, base)), discount_pct
+
+
+LISTINGS = [
+    {"price": 3000, "bedrooms": 1, "bathrooms": 1, "sqft": 650, "neighborhood": "Mission", "laundry_type": "in_unit", "parking": True},
+    {"price": 2100, "bedrooms": 0, "bathrooms": 1, "sqft": 450, "neighborhood": "SOMA"},  # studio: no ratio/sqft bonus
+    {"price": 3900, "bedrooms": 2, "bathrooms": NAN, "sqft": NAN, "neighborhood": "Nob Hill"},  # NaN baths/sqft
+    {"price": 3900, "bedrooms": 2, "bathrooms": None, "sqft": None, "neighborhood": "nob-hill"},
+    {"price": 4400, "bedrooms": 4, "bathrooms": 3, "sqft": 2000, "neighborhood": "Castro", "laundry_type": "in_building"},
+    {"price": 4100, "bedrooms": 2, "bathrooms": 1.5, "sqft": 1000, "neighborhood": "Somewhere New"},  # default row
+    {"price": 12000, "bedrooms": 1, "neighborhood": "Marina"},  # far above market: clipped at 0
+    {"price": 600, "bedrooms": 3, "bathrooms": 3, "sqft": 1900, "neighborhood": "Sunset", "parking": True},  # clipped at 100
+    {"price": 2899, "bedrooms": 1, "neighborhood": "Mission"},  # tiny discount, int() truncation toward zero
+    {"price": 2902, "bedrooms": 1, "neighborhood": "Mission"},  # small negative discount
+    {"price": None, "bedrooms": 2},  # missing price
+    {"price": 2500, "bedrooms": None, "neighborhood": "Haight"},  # missing bedrooms
+    {"price": 2500, "bedrooms": 1, "bathrooms": 0, "sqft": 0},  # zero sqft/baths, no neighborhood
+]
+# Rounding ties: a $2000 Sunset studio puts every odd-dollar price on an x.x5 discount,
+# where Python's round() and np.round() disagree for about half the values
+LISTINGS += [{"price": p, "bedrooms": 0, "neighborhood": "Sunset"} for p in range(1980, 2021)]
+LISTINGS += [{"price": p, "bedrooms": 1, "neighborhood": "Mission"} for p in range(2880, 2921)]
+
+
+@pytest.fixture(params=["numpy", "loop"])
+def score_columns(request, monkeypatch):
+    fn = cs._score_columns_np if request.param == "numpy" else cs._score_columns_loop
+    monkeypatch.setattr(cs, "_score_columns", fn)
+    return fn
+
+
+@pytest.mark.parametrize(
+    "rates",
+    [
+        cs.get_neighborhood_market_rates(),
+        {"mission": {"1br": 2900}},  # no default row: unknown neighborhoods have no market rate
+    ],
+    ids=["sf", "missing-rate"],
+)
+def test_score_all_matches_baseline(score_columns, rates):
+    rate_index = cs._market_rate_index(rates)
+    apartments = copy.deepcopy(LISTINGS)
+    cs._score_all(apartments, rate_index)
+    for apt, original in zip(apartments, LISTINGS):
+        score, discount = _baseline_score(original, rate_index)
+        assert (apt["deal_score"], apt["discount_pct"]) == (score, discount), original
+        assert type(apt["deal_score"]) is int
+
+
+def test_score_all_returns_only_scorable(score_columns):
+    apartments = copy.deepcopy(LISTINGS)
+    valid = cs._score_all(apartments, cs._market_rate_index(cs.get_neighborhood_market_rates()))
+    assert len(valid) == len(LISTINGS) - 2
+    assert all(apt["deal_analysis"] is None for apt in valid)
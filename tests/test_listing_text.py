@@ -0,0 +1,44 @@
+"""Bedroom / bathroom / sqft extraction on listing titles as they appear on Craigslist."""
+
+import pytest
+
+import craigslist_scraper as cs
+
+
+@pytest.mark.parametrize(
+    "title, bedrooms, bathrooms, sqft",
+    [
+        ("$2,450 / Studio - Sunny Studio in Nob Hill, 400ft²", 0, None, 400),
+        ("$3,200 / 1br - Bright 1BR/1BA w/ In-Unit W/D", 1, 1.0, None),
+        ("$4,100 2br - 950 sq ft - Remodeled 2 bed 2 bath flat, garage parking", 2, 2.0, 950),
+        ("$5,800 / 3br - 1400ft² - Victorian 3BR/2BA Pac Heights", 3, 2.0, 1400),
+        ("Spacious 4-bedroom house, 2.5 baths, 1800 sf", 4, 2.5, 1800),
+        ("Junior 1 bd with city views", 1, None, None),
+        ("0 BR loft, 1 ba, 500 sq. ft.", 0, 1.0, 500),
+        ("Room in 5br house - share bath", 5, None, None),
+        ("Unit 12br? no, studio apartment", 0, None, None),
+        # "studio" only as a whole word; "studios" is not a bedroom count
+        ("Studios available now! Move-in special", None, None, None),
+        ("Beautiful home, call for details", None, None, None),
+        ("", None, None, None),
+    ],
+)
+def test_extract_from_title(title, bedrooms, bathrooms, sqft):
+    assert cs.extract_bedrooms(title) == bedrooms
+    assert cs.extract_bathrooms(title) == bathrooms
+    assert cs.extract_sqft(title) == sqft
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("cozy studio", 0),
+        ("bigstudio loft", None),  # no word boundary before "studio"
+        ("0 br", 0),
+        ("10 br", None),  # "0 br" inside "10 br" is not a studio, and 10 is out of range
+        ("near 3br", 3),
+        ("a13br", None),
+    ],
+)
+def test_bedroom_word_boundaries(text, expected):
+    assert cs.extract_bedrooms(text) == expected